@@ -8,12 +8,19 @@
 """
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.database.connection import get_db
 from app.services.chat_service import ChatService
 from app.services.chat_rest import ChatRestService  # 🍽️
+from app.services.chat_events import sse_stream
+from app.services.search import get_search_engine
+from app.services.speculation import speculation_stats
+from app.services.answer_cache import get_answer_cache
+from app.services.blurbs import blurb_stats
+from app.utils.openai_client import llm_latency_stats
 from app.schemas import ChatMessage
 from app.core.deps import get_current_user
 
@@ -24,8 +31,7 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 @router.post("/send")
 async def send_message(
     request: ChatMessage,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     GPT에게 메시지 전송 - 일반 방식 (기존)
@@ -45,8 +51,7 @@ async def send_message(
     }
     """
     try:
-        result = ChatService.send_message(
-            db=db,
+        result = await ChatService.send_message(
             user_id=current_user['user_id'],
             message=request.message,
             is_kcontent_mode=False
@@ -61,8 +66,7 @@ async def send_message(
 @router.post("/send/stream")
 async def send_message_streaming(
     request: ChatMessage,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     🌊 GPT에게 메시지 전송 - Streaming 방식 (기존)
@@ -81,14 +85,13 @@ async def send_message_streaming(
     """
     try:
         stream_generator = ChatService.send_message_streaming(
-            db=db,
             user_id=current_user['user_id'],
             message=request.message,
             is_kcontent_mode=False
         )
         
         return StreamingResponse(
-            stream_generator,
+            sse_stream(stream_generator),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -106,8 +109,7 @@ async def send_message_streaming(
 @router.post("/restaurant/send")
 async def send_restaurant_message(
     request: ChatMessage,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     🍽️ 레스토랑 메시지 전송 - 일반 방식
@@ -123,8 +125,9 @@ async def send_restaurant_message(
     }
     """
     try:
-        result = ChatRestService.send_message(
-            db=db,
+        # 동기 검색/GPT 호출은 스레드풀에서 (이벤트 루프 블로킹 방지, DB 세션 없이 - 저장은 write-behind)
+        result = await run_in_threadpool(
+            ChatRestService.send_message,
             user_id=current_user['user_id'],
             message=request.message
         )
@@ -138,8 +141,7 @@ async def send_restaurant_message(
 @router.post("/restaurant/send/stream")
 async def send_restaurant_message_streaming(
     request: ChatMessage,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     🌊🍽️ 레스토랑 메시지 전송 - Streaming 방식
@@ -155,13 +157,12 @@ async def send_restaurant_message_streaming(
     """
     try:
         stream_generator = ChatRestService.send_message_streaming(
-            db=db,
             user_id=current_user['user_id'],
             message=request.message
         )
         
         return StreamingResponse(
-            stream_generator,
+            sse_stream(stream_generator),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -179,8 +180,7 @@ async def send_restaurant_message_streaming(
 @router.post("/kcontents/send")
 async def send_kcontent_message(
     request: ChatMessage,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     🎬 K-Drama/K-Content 메시지 전송 - 일반 방식
@@ -196,8 +196,7 @@ async def send_kcontent_message(
     }
     """
     try:
-        result = ChatService.send_message(
-            db=db,
+        result = await ChatService.send_message(
             user_id=current_user['user_id'],
             message=request.message,
             is_kcontent_mode=True
@@ -212,8 +211,7 @@ async def send_kcontent_message(
 @router.post("/kcontents/send/stream")
 async def send_kcontent_message_streaming(
     request: ChatMessage,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     🌊🎬 K-Drama/K-Content 메시지 전송 - Streaming 방식
@@ -229,14 +227,13 @@ async def send_kcontent_message_streaming(
     """
     try:
         stream_generator = ChatService.send_message_streaming(
-            db=db,
             user_id=current_user['user_id'],
             message=request.message,
             is_kcontent_mode=True
         )
         
         return StreamingResponse(
-            stream_generator,
+            sse_stream(stream_generator),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -249,6 +246,25 @@ async def send_kcontent_message_streaming(
         raise HTTPException(status_code=500, detail=f"K-Content 스트리밍 오류: {str(e)}")
 
 
+# ===== 검색 / 생성 지표 (튜닝용) =====
+
+@router.get("/stats")
+async def get_chat_stats(current_user: dict = Depends(get_current_user)):
+    """
+    프로세스 단위 검색 / 추측 생성 / 답변 캐시 / 저장된 소개 / GPT 지연 지표
+    (변형 예산 조기 종료 / 시간 초과 횟수, 변형 종류별 채택 횟수, 추측 생성 적중률, 답변 캐시 적중률,
+    모델별 TTFT / 전체 지연 히스토그램 등)
+    """
+    answer_cache = get_answer_cache()
+    return {
+        "search": get_search_engine().stats(),
+        "speculation": speculation_stats(),
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "place_blurbs": blurb_stats(),
+        "llm": llm_latency_stats(),
+    }
+
+
 # ===== 대화 히스토리 조회 (공통) =====
 
 @router.get("/history")
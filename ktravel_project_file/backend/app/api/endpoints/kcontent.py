@@ -6,7 +6,10 @@ from typing import List, Dict, Any
 from app.schemas.kcontent_schema import KContentCreate, KContentEdit, KContentResponse
 from app.models.kcontent import KContent
 from app.database.connection import get_db
-from app.services.kcontent_data_transform import get_frontend_data_list, transform_kcontent_to_frontend_schema
+from app.services.kcontent_data_transform import get_frontend_data_list
+from app.services.entity_index import notify_catalog_changed
+from app.services.place_cards import invalidate_place_cards, kcontent_card
+from app.schemas.bookmarkschema import PlaceType
 
 router = APIRouter(
     prefix="/kcontents",
@@ -36,10 +39,11 @@ def read_kcontent(content_id: int, db: Session = Depends(get_db)):
     특정 K-콘텐츠 항목 조회 및 프론트엔드 형식으로 반환
     """
     try:
-        content_orm = db.query(KContent).filter(KContent.content_id == content_id).first()
-        if not content_orm:
+        # 카드 캐시 우선 (없으면 DB 조회 후 저장)
+        card = kcontent_card(db, content_id)
+        if card is None:
             raise HTTPException(status_code=404, detail="K-Content not found")
-        return transform_kcontent_to_frontend_schema(content_orm)
+        return card
     except HTTPException:
         raise
     except Exception as e:
@@ -101,6 +105,8 @@ def create_kcontent(item: KContentCreate, db: Session = Depends(get_db)):
     db.add(new_content)
     db.commit()
     db.refresh(new_content)
+    notify_catalog_changed()
+    invalidate_place_cards(PlaceType.KCONTENT, [new_content.content_id])
     return new_content
 
 
@@ -113,6 +119,8 @@ def update_kcontent(content_id: int, item: KContentEdit, db: Session = Depends(g
         setattr(content, key, value)
     db.commit()
     db.refresh(content)
+    notify_catalog_changed()
+    invalidate_place_cards(PlaceType.KCONTENT, [content_id])
     return content
 
 
@@ -123,6 +131,8 @@ def delete_kcontent(content_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="K-Content not found")
     db.delete(content)
     db.commit()
+    notify_catalog_changed()
+    invalidate_place_cards(PlaceType.KCONTENT, [content_id])
     return None
 
 
@@ -2,22 +2,23 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.database.connection import get_db
+from app.database.connection import SessionLocal, get_db
 from app.models.bookmark import Bookmark
-from app.core.qdrant_client import get_qdrant_client
+from app.core.qdrant_client import arecommend_batch
 from app.schemas.recommend_schema import (
     BookmarkBasedRecommendRequest,
     BookmarkBasedRecommendResponse,
     RecommendedItem,
 )
 from app.schemas.bookmarkschema import PlaceType
-
-# ✅ 원본 테이블 모델 import
-from app.models.kcontent import KContent
-from app.models.restaurant import Restaurant
-# from app.models.attraction import Attraction  # 필요시 주석 해제
-from app.models.festival import Festival
+from app.services.place_cards import hydrate_places
+from app.services.user_recommendations import (
+    acurrent_version,
+    aload_recommendations,
+    astore_recommendations,
+)
 
 router = APIRouter(prefix="/recommand", tags=["recommand"])
 
@@ -30,132 +31,79 @@ PLACE_TYPE_COLLECTION_MAP = {
 
 
 ############################################################
-# 🔧 Helper Function: 원본 테이블에서 데이터 가져오기
+# 🔧 Helper Function: 북마크 조회 / 북마크 기반 Qdrant 추천 (배치)
 ############################################################
-def fetch_original_data(db: Session, place_type: int, reference_id: int):
+def _load_recent_bookmarks(db: Session, req: BookmarkBasedRecommendRequest, limit: int) -> list[Bookmark]:
+    """유저의 최근 북마크 조회 (place_type 필터 선택)"""
+    query = db.query(Bookmark).filter(Bookmark.user_id == req.user_id)
+    if req.place_type is not None:
+        query = query.filter(Bookmark.place_type == req.place_type)
+
+    return (
+        query
+        .order_by(Bookmark.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+async def recommend_for_bookmarks(
+    bookmarks: list[Bookmark],
+    limit: int,
+    collection_map: dict = PLACE_TYPE_COLLECTION_MAP,
+    mode: str = "per_bookmark",
+) -> list[tuple]:
     """
-    place_type과 reference_id로 원본 테이블에서 완전한 데이터 조회
-    
+    북마크들의 Qdrant 추천 - 컬렉션별 recommend_batch 1회 (북마크 10개여도 왕복 1~3회)
+
+    mode:
+        per_bookmark: 북마크마다 positive 1개짜리 추천 (북마크당 limit개)
+        centroid: 컬렉션의 북마크 전체를 positive로 추천 1번 (Qdrant average_vector 전략, limit × 북마크 수개)
+                  → 이웃이 촘촘한 북마크 하나에 결과가 쏠리지 않음, 이미 북마크한 장소는 결과에서 빠짐
+
     Returns:
-        dict: 원본 데이터 (name, address, image_url, latitude, longitude 등)
+        [(place_type, reference_id, point), ...]
+        - 여러 북마크에서 나온 같은 장소는 점수가 가장 높은 것만 남김
+        - 점수 내림차순 (컬렉션이 없거나 실패한 북마크는 제외)
     """
-    try:
-        if place_type == PlaceType.KCONTENT:
-            # ✅ K-콘텐츠 테이블 (정확한 컬럼명 사용)
-            item = db.query(KContent).filter(KContent.content_id == reference_id).first()
-            if item:
-                # ✅ 실제 컬럼명 확인
-                # drama_name_en, location_name_en, address_en, category_en, keyword_en, trip_tip_en
-                
-                # 이미지 URL 처리
-                image_url = None
-                if hasattr(item, 'thumbnail') and item.thumbnail:
-                    image_url = item.thumbnail
-                elif hasattr(item, 'image_url') and item.image_url:
-                    image_url = item.image_url
-                elif hasattr(item, 'image_url_list') and item.image_url_list:
-                    # image_url_list가 리스트나 JSON 형태인 경우
-                    if isinstance(item.image_url_list, list) and len(item.image_url_list) > 0:
-                        image_url = item.image_url_list[0]
-                    elif isinstance(item.image_url_list, str):
-                        # JSON 문자열인 경우 파싱 시도
-                        import json
-                        try:
-                            url_list = json.loads(item.image_url_list)
-                            if url_list and len(url_list) > 0:
-                                image_url = url_list[0]
-                        except:
-                            pass
-                
-                return {
-                    "name": item.location_name_en or item.location_name or item.drama_name_en or "Unknown",
-                    "address": item.address_en or item.address or "",
-                    "image_url": image_url,
-                    "latitude": float(item.latitude) if item.latitude else None,
-                    "longitude": float(item.longitude) if item.longitude else None,
-                    "category": item.category_en or item.category or "",
-                    "extra": {
-                        "content_id": item.content_id,
-                        "drama_name_en": item.drama_name_en,
-                        "location_name_en": item.location_name_en,
-                        "address_en": item.address_en,
-                        "category_en": item.category_en,
-                        "keyword_en": item.keyword_en,
-                        "trip_tip_en": item.trip_tip_en,
-                        "latitude": float(item.latitude) if item.latitude else None,
-                        "longitude": float(item.longitude) if item.longitude else None,
-                    }
-                }
-        
-        elif place_type == PlaceType.RESTAURANT:
-            # ✅ 음식점 테이블
-            item = db.query(Restaurant).filter(Restaurant.restaurant_id == reference_id).first()
-            if item:
-                return {
-                    "name": item.restaurant_name or item.name or "Unknown",
-                    "address": item.address or "",
-                    "image_url": item.image_url,
-                    "latitude": float(item.latitude) if item.latitude else None,
-                    "longitude": float(item.longitude) if item.longitude else None,
-                    "category": getattr(item, 'category', None) or "",
-                    "extra": {
-                        "restaurant_id": item.restaurant_id,
-                        "restaurant_name": item.restaurant_name,
-                        "cuisine_type": getattr(item, 'cuisine_type', None),
-                        "address": item.address,
-                    }
-                }
-        
-        # elif place_type == PlaceType.ATTRACTION:
-        #     # ✅ 명소 테이블 (필요시 활성화)
-        #     item = db.query(Attraction).filter(Attraction.attraction_id == reference_id).first()
-        #     if item:
-        #         return {
-        #             "name": item.name or item.title or "Unknown",
-        #             "address": item.address or "",
-        #             "image_url": item.image_url,
-        #             "latitude": float(item.latitude) if item.latitude else None,
-        #             "longitude": float(item.longitude) if item.longitude else None,
-        #             "category": getattr(item, 'category', None) or "",
-        #             "extra": {
-        #                 "attraction_id": item.attraction_id,
-        #                 "name": item.name,
-        #             }
-        #         }
-        
-        elif place_type == PlaceType.FESTIVAL:
-            # ✅ 축제 테이블
-            item = db.query(Festival).filter(Festival.festival_id == reference_id).first()
-            if item:
-                return {
-                    "name": item.festival_name or getattr(item, 'title', None) or "Unknown",
-                    "address": getattr(item, 'address', None) or "",
-                    "image_url": getattr(item, 'image_url', None),
-                    "latitude": float(item.latitude) if hasattr(item, 'latitude') and item.latitude else None,
-                    "longitude": float(item.longitude) if hasattr(item, 'longitude') and item.longitude else None,
-                    "category": "festival",
-                    "extra": {
-                        "festival_id": item.festival_id,
-                        "festival_name": item.festival_name,
-                        "start_date": str(item.start_date) if hasattr(item, 'start_date') and item.start_date else None,
-                        "end_date": str(item.end_date) if hasattr(item, 'end_date') and item.end_date else None,
-                    }
-                }
-        
-        return None
-    
-    except Exception as e:
-        print(f"❌ 원본 데이터 조회 실패 (place_type={place_type}, reference_id={reference_id}): {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    targets = [
+        (b, collection_map.get(b.place_type))
+        for b in bookmarks
+    ]
+    targets = [(b, collection_name) for b, collection_name in targets if collection_name]
+
+    if mode == "centroid":
+        grouped: dict[str, list[Bookmark]] = {}
+        for b, collection_name in targets:
+            grouped.setdefault(collection_name, []).append(b)
+        targets = [(group[0], collection_name) for collection_name, group in grouped.items()]
+        results_list = await arecommend_batch(
+            [(collection_name, [b.reference_id for b in group]) for collection_name, group in grouped.items()],
+            limits=[limit * len(group) for group in grouped.values()],
+        )
+    else:
+        results_list = await arecommend_batch(
+            [(collection_name, [b.reference_id]) for b, collection_name in targets],
+            limit=limit,
+        )
+
+    merged: dict[str, tuple] = {}
+    for (b, _), results in zip(targets, results_list):
+        for r in results or []:
+            payload = r.payload or {}
+            rec_reference_id = payload.get("content_id") or payload.get("id") or r.id
+            unique_key = f"{b.place_type}_{rec_reference_id}"
+            if unique_key not in merged or r.score > merged[unique_key][2].score:
+                merged[unique_key] = (b.place_type, rec_reference_id, r)
+
+    return sorted(merged.values(), key=lambda item: item[2].score, reverse=True)
 
 
 ############################################################
 # 1️⃣ 취향 추천 (원본 테이블 데이터 포함)
 ############################################################
 @router.post("/from-bookmarks", response_model=BookmarkBasedRecommendResponse)
-def recommend_from_bookmarks(
+async def recommend_from_bookmarks(
     req: BookmarkBasedRecommendRequest,
     db: Session = Depends(get_db),
 ):
@@ -164,91 +112,30 @@ def recommend_from_bookmarks(
     - Qdrant로 유사 콘텐츠 찾기
     - 원본 테이블에서 완전한 데이터 가져오기
     """
-    # 1) 유저 북마크 가져오기
-    query = db.query(Bookmark).filter(Bookmark.user_id == req.user_id)
-    if req.place_type is not None:
-        query = query.filter(Bookmark.place_type == req.place_type)
-
-    bookmarks = (
-        query
-        .order_by(Bookmark.created_at.desc())
-        .limit(10)
-        .all()
+    # 0) 북마크가 바뀔 때 미리 계산해 둔 목록 (없거나 버전이 다르면 아래에서 계산 후 저장)
+    stored, version = await aload_recommendations(
+        req.user_id, "from-bookmarks", req.place_type, req.top_k_per_bookmark, req.mode
     )
+    if stored is not None:
+        return BookmarkBasedRecommendResponse(user_id=req.user_id, total_count=len(stored), items=stored)
+
+    # 1) 유저 북마크 가져오기 (DB 작업은 스레드풀에서)
+    bookmarks = await run_in_threadpool(_load_recent_bookmarks, db, req, 10)
 
     if not bookmarks:
         raise HTTPException(status_code=404, detail="해당 사용자의 북마크가 없습니다.")
 
-    client = get_qdrant_client()
-    recommended_items: list[RecommendedItem] = []
-    seen_ids = set()  # 중복 제거용
-
-    for b in bookmarks:
-        collection_name = PLACE_TYPE_COLLECTION_MAP.get(b.place_type)
-        if not collection_name:
-            continue
-
-        # 2) Qdrant에서 유사 콘텐츠 추천
-        try:
-            results = client.recommend(
-                collection_name=collection_name,
-                positive=[b.reference_id],
-                limit=req.top_k_per_bookmark,
-            )
-        except Exception as e:
-            print(f"Qdrant recommend 실패 (bookmark_id={b.bookmark_id}): {e}")
-            continue
+    # 2) Qdrant에서 유사 콘텐츠 추천 (컬렉션별 배치 요청, 중복 제거 + 점수순)
+    recommend_results = await recommend_for_bookmarks(bookmarks, req.top_k_per_bookmark, mode=req.mode)
 
-        # 3) 각 추천 결과에 대해 원본 테이블에서 데이터 가져오기
-        for r in results:
-            payload = r.payload or {}
-            rec_reference_id = payload.get("content_id") or payload.get("id") or r.id
-            
-            # 중복 체크
-            unique_key = f"{b.place_type}_{rec_reference_id}"
-            if unique_key in seen_ids:
-                continue
-            seen_ids.add(unique_key)
-            
-            # ✅ 원본 테이블에서 완전한 데이터 조회
-            original_data = fetch_original_data(db, b.place_type, rec_reference_id)
-            
-            if original_data:
-                # ✅ 원본 데이터 사용 (모든 필드 포함)
-                item = RecommendedItem(
-                    place_type=b.place_type,
-                    reference_id=rec_reference_id,
-                    name=original_data["name"],
-                    address=original_data.get("address"),
-                    image_url=original_data.get("image_url"),
-                    latitude=original_data.get("latitude"),
-                    longitude=original_data.get("longitude"),
-                    score=r.score,
-                    extra=original_data.get("extra", {}),  # ✅ 모든 영어 필드 포함!
-                )
-                print(f"✅ 원본 데이터 사용: {original_data['name']} (extra 필드 개수: {len(original_data.get('extra', {}))})")
-            else:
-                # 원본 데이터 없으면 Qdrant payload 사용
-                item = RecommendedItem(
-                    place_type=b.place_type,
-                    reference_id=rec_reference_id,
-                    name=payload.get("location_name_en") or payload.get("location_name") or payload.get("name") or "Unknown",
-                    address=payload.get("address_en") or payload.get("address"),
-                    image_url=payload.get("image_url") or payload.get("thumbnail") or payload.get("image"),
-                    latitude=payload.get("latitude"),
-                    longitude=payload.get("longitude"),
-                    score=r.score,
-                    extra=payload,
-                )
-                print(f"⚠️ Qdrant payload 사용: {item.name}")
-            
-            recommended_items.append(item)
+    recommended_items = await run_in_threadpool(_build_items_from_bookmarks, db, recommend_results)
 
     if not recommended_items:
         raise HTTPException(status_code=404, detail="추천 결과를 찾지 못했습니다.")
 
-    # 점수순 정렬
-    recommended_items.sort(key=lambda x: x.score, reverse=True)
+    await astore_recommendations(
+        req.user_id, "from-bookmarks", req.place_type, req.top_k_per_bookmark, version, recommended_items, req.mode
+    )
 
     print(f"✅ 총 추천 개수: {len(recommended_items)}")
     return BookmarkBasedRecommendResponse(
@@ -258,11 +145,55 @@ def recommend_from_bookmarks(
     )
 
 
+def _build_items_from_bookmarks(db: Session, recommend_results: list[tuple]) -> list[RecommendedItem]:
+    """3) 각 추천 결과에 대해 원본 테이블에서 데이터 가져오기"""
+    recommended_items: list[RecommendedItem] = []
+
+    # ✅ 원본 테이블 데이터는 타입별 IN 쿼리 1번씩 (순위 순서 그대로)
+    cards = hydrate_places(db, [(place_type, rec_reference_id) for place_type, rec_reference_id, _ in recommend_results])
+
+    for (place_type, rec_reference_id, r), original_data in zip(recommend_results, cards):
+        payload = r.payload or {}
+        
+        if original_data:
+            # ✅ 원본 데이터 사용 (모든 필드 포함)
+            item = RecommendedItem(
+                place_type=place_type,
+                reference_id=rec_reference_id,
+                name=original_data["name"],
+                address=original_data.get("address"),
+                image_url=original_data.get("image_url"),
+                latitude=original_data.get("latitude"),
+                longitude=original_data.get("longitude"),
+                score=r.score,
+                extra=original_data.get("extra", {}),  # ✅ 모든 영어 필드 포함!
+            )
+            print(f"✅ 원본 데이터 사용: {original_data['name']} (extra 필드 개수: {len(original_data.get('extra', {}))})")
+        else:
+            # 원본 데이터 없으면 Qdrant payload 사용
+            item = RecommendedItem(
+                place_type=place_type,
+                reference_id=rec_reference_id,
+                name=payload.get("location_name_en") or payload.get("location_name") or payload.get("name") or "Unknown",
+                address=payload.get("address_en") or payload.get("address"),
+                image_url=payload.get("image_url") or payload.get("thumbnail") or payload.get("image"),
+                latitude=payload.get("latitude"),
+                longitude=payload.get("longitude"),
+                score=r.score,
+                extra=payload,
+            )
+            print(f"⚠️ Qdrant payload 사용: {item.name}")
+        
+        recommended_items.append(item)
+
+    return recommended_items
+
+
 ############################################################
 # 2️⃣ 최근 북마크 기반 추천 (원본 테이블 데이터 포함)
 ############################################################
 @router.post("/from-bookmarks_atleast", response_model=BookmarkBasedRecommendResponse)
-def recommend_from_bookmarks_atleast(
+async def recommend_from_bookmarks_atleast(
     req: BookmarkBasedRecommendRequest,
     db: Session = Depends(get_db),
 ):
@@ -270,86 +201,103 @@ def recommend_from_bookmarks_atleast(
     최근 5개 북마크 기반 추천
     - 원본 테이블에서 완전한 데이터 가져오기
     """
-    # 1) 최근 5개 북마크 가져오기
-    query = db.query(Bookmark).filter(Bookmark.user_id == req.user_id)
-    if req.place_type is not None:
-        query = query.filter(Bookmark.place_type == req.place_type)
-
-    bookmarks = (
-        query
-        .order_by(Bookmark.created_at.desc())
-        .limit(5)
-        .all()
+    stored, version = await aload_recommendations(
+        req.user_id, "from-bookmarks_atleast", req.place_type, req.top_k_per_bookmark, req.mode
     )
+    if stored is not None:
+        return BookmarkBasedRecommendResponse(user_id=req.user_id, total_count=len(stored), items=stored)
+
+    # 1) 최근 5개 북마크 가져오기
+    bookmarks = await run_in_threadpool(_load_recent_bookmarks, db, req, 5)
 
     if not bookmarks:
         raise HTTPException(status_code=404, detail="해당 사용자의 북마크가 없습니다.")
 
-    client = get_qdrant_client()
-    recommended_items: list[RecommendedItem] = []
-    seen_ids = set()
-
-    for b in bookmarks:
-        collection_name = PLACE_TYPE_COLLECTION_MAP.get(b.place_type)
-        if not collection_name:
-            continue
-
-        try:
-            results = client.recommend(
-                collection_name=collection_name,
-                positive=[b.reference_id],
-                limit=req.top_k_per_bookmark,
-            )
-        except Exception as e:
-            print(f"Qdrant recommend 실패 (bookmark_id={b.bookmark_id}): {e}")
-            continue
+    recommend_results = await recommend_for_bookmarks(bookmarks, req.top_k_per_bookmark, mode=req.mode)
 
-        for r in results:
-            payload = r.payload or {}
-            rec_reference_id = payload.get("content_id") or payload.get("id") or r.id
-            
-            unique_key = f"{b.place_type}_{rec_reference_id}"
-            if unique_key in seen_ids:
-                continue
-            seen_ids.add(unique_key)
-            
-            # ✅ 원본 테이블에서 데이터 조회
-            original_data = fetch_original_data(db, b.place_type, rec_reference_id)
-            
-            if original_data:
-                item = RecommendedItem(
-                    place_type=b.place_type,
-                    reference_id=rec_reference_id,
-                    name=original_data["name"],
-                    address=original_data.get("address"),
-                    image_url=original_data.get("image_url"),
-                    latitude=original_data.get("latitude"),
-                    longitude=original_data.get("longitude"),
-                    score=r.score,
-                    extra=original_data.get("extra", {}),
-                )
-            else:
-                item = RecommendedItem(
-                    place_type=b.place_type,
-                    reference_id=rec_reference_id,
-                    name=payload.get("location_name_en") or payload.get("name") or "Unknown",
-                    address=payload.get("address_en") or payload.get("address"),
-                    image_url=payload.get("image_url") or payload.get("thumbnail"),
-                    latitude=payload.get("latitude"),
-                    longitude=payload.get("longitude"),
-                    score=r.score,
-                    extra=payload,
-                )
-            
-            recommended_items.append(item)
+    recommended_items = await run_in_threadpool(_build_items_from_recent_bookmarks, db, recommend_results)
 
     if not recommended_items:
         raise HTTPException(status_code=404, detail="추천 결과를 찾지 못했습니다.")
 
-    recommended_items.sort(key=lambda x: x.score, reverse=True)
+    await astore_recommendations(
+        req.user_id, "from-bookmarks_atleast", req.place_type, req.top_k_per_bookmark, version, recommended_items, req.mode
+    )
 
     return BookmarkBasedRecommendResponse(
         user_id=req.user_id,
         total_count=len(recommended_items),
         items=recommended_items,
-    )
\ No newline at end of file
+    )
+
+
+def _build_items_from_recent_bookmarks(db: Session, recommend_results: list[tuple]) -> list[RecommendedItem]:
+    """추천 결과 → RecommendedItem (원본 테이블 우선, 없으면 payload)"""
+    recommended_items: list[RecommendedItem] = []
+
+    # ✅ 원본 테이블 데이터는 타입별 IN 쿼리 1번씩 (순위 순서 그대로)
+    cards = hydrate_places(db, [(place_type, rec_reference_id) for place_type, rec_reference_id, _ in recommend_results])
+
+    for (place_type, rec_reference_id, r), original_data in zip(recommend_results, cards):
+        payload = r.payload or {}
+        
+        if original_data:
+            item = RecommendedItem(
+                place_type=place_type,
+                reference_id=rec_reference_id,
+                name=original_data["name"],
+                address=original_data.get("address"),
+                image_url=original_data.get("image_url"),
+                latitude=original_data.get("latitude"),
+                longitude=original_data.get("longitude"),
+                score=r.score,
+                extra=original_data.get("extra", {}),
+            )
+        else:
+            item = RecommendedItem(
+                place_type=place_type,
+                reference_id=rec_reference_id,
+                name=payload.get("location_name_en") or payload.get("name") or "Unknown",
+                address=payload.get("address_en") or payload.get("address"),
+                image_url=payload.get("image_url") or payload.get("thumbnail"),
+                latitude=payload.get("latitude"),
+                longitude=payload.get("longitude"),
+                score=r.score,
+                extra=payload,
+            )
+        
+        recommended_items.append(item)
+
+    return recommended_items
+
+
+############################################################
+# ⭐ 북마크가 바뀐 유저의 추천 목록 미리 계산 (user_recommendations 백그라운드 task가 호출)
+############################################################
+# 엔드포인트 → (북마크 개수, 카드 함수) - 기본 요청 형태(place_type 없음, top_k 기본값)만 미리 계산
+MATERIALIZED_ENDPOINTS = {
+    "from-bookmarks": (10, _build_items_from_bookmarks),
+    "from-bookmarks_atleast": (5, _build_items_from_recent_bookmarks),
+}
+
+
+async def materialize_recommendations(user_id: int):
+    """유저의 기본 요청 추천 목록을 다시 계산해서 저장 (계산 시작 전 버전으로 도장)"""
+    version = await acurrent_version(user_id)
+    if version is None:
+        return
+
+    req = BookmarkBasedRecommendRequest(user_id=user_id)
+    db = SessionLocal()
+    try:
+        for endpoint, (bookmark_limit, build_items) in MATERIALIZED_ENDPOINTS.items():
+            bookmarks = await run_in_threadpool(_load_recent_bookmarks, db, req, bookmark_limit)
+            if not bookmarks:
+                continue
+            recommend_results = await recommend_for_bookmarks(bookmarks, req.top_k_per_bookmark, mode=req.mode)
+            recommended_items = await run_in_threadpool(build_items, db, recommend_results)
+            await astore_recommendations(
+                user_id, endpoint, req.place_type, req.top_k_per_bookmark, version, recommended_items, req.mode
+            )
+    finally:
+        db.close()
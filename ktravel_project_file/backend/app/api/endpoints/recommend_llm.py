@@ -7,22 +7,19 @@ LLM 강화 추천 엔드포인트
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 
 from app.database.connection import get_db
 from app.models.bookmark import Bookmark
-from app.core.qdrant_client import get_qdrant_client
+from app.api.endpoints.recommend import recommend_for_bookmarks
 from app.services.llm_recommend_service import LLMRecommendService, generate_simple_reason
 from app.schemas.recommend_schema import (
     BookmarkBasedRecommendRequest,
     RecommendedItem,
 )
 from app.schemas.bookmarkschema import PlaceType
-
-# ✅ 원본 테이블
-from app.models.kcontent import KContent
-from app.models.restaurant import Restaurant
-from app.models.festival import Festival
+from app.services.place_cards import hydrate_places
 
 from pydantic import BaseModel
 
@@ -63,89 +60,10 @@ class LLMRecommendResponse(BaseModel):
     recommendations: list[LLMRecommendedItem]
 
 
-# ============================================================
-# Helper: 원본 데이터 조회
-# ============================================================
-
-def fetch_original_data(db: Session, place_type: int, reference_id: int):
-    """원본 테이블에서 데이터 조회 (recommend.py와 동일)"""
-    try:
-        if place_type == PlaceType.KCONTENT:
-            item = db.query(KContent).filter(KContent.content_id == reference_id).first()
-            if not item:
-                return None
-            
-            image_url = None
-            if hasattr(item, 'thumbnail') and item.thumbnail:
-                image_url = item.thumbnail
-            elif hasattr(item, 'image_url') and item.image_url:
-                image_url = item.image_url
-            
-            return {
-                "name": item.location_name_en or item.location_name or item.drama_name_en or "Unknown",
-                "address": item.address_en or item.address or "",
-                "image_url": image_url,
-                "latitude": float(item.latitude) if item.latitude else None,
-                "longitude": float(item.longitude) if item.longitude else None,
-                "category": item.category_en or item.category or "",
-                "extra": {
-                    "content_id": item.content_id,
-                    "drama_name_en": item.drama_name_en,
-                    "location_name_en": item.location_name_en,
-                    "address_en": item.address_en,
-                    "category_en": item.category_en,
-                    "keyword_en": item.keyword_en,
-                    "trip_tip_en": item.trip_tip_en,
-                }
-            }
-        
-        elif place_type == PlaceType.RESTAURANT:
-            item = db.query(Restaurant).filter(Restaurant.restaurant_id == reference_id).first()
-            if not item:
-                return None
-            
-            return {
-                "name": item.restaurant_name or "Unknown",
-                "address": item.address or "",
-                "image_url": item.image_url,
-                "latitude": float(item.latitude) if item.latitude else None,
-                "longitude": float(item.longitude) if item.longitude else None,
-                "category": getattr(item, 'category', None) or "",
-                "extra": {
-                    "restaurant_id": item.restaurant_id,
-                    "restaurant_name": item.restaurant_name,
-                }
-            }
-        
-        elif place_type == PlaceType.FESTIVAL:
-            item = db.query(Festival).filter(Festival.festival_id == reference_id).first()
-            if not item:
-                return None
-            
-            return {
-                "name": item.festival_name or "Unknown",
-                "address": getattr(item, 'address', None) or "",
-                "image_url": getattr(item, 'image_url', None),
-                "latitude": float(item.latitude) if hasattr(item, 'latitude') and item.latitude else None,
-                "longitude": float(item.longitude) if hasattr(item, 'longitude') and item.longitude else None,
-                "category": "festival",
-                "extra": {
-                    "festival_id": item.festival_id,
-                    "festival_name": item.festival_name,
-                }
-            }
-        
-        return None
-    
-    except Exception as e:
-        print(f"❌ 원본 데이터 조회 실패: {e}")
-        return None
-
-
 PLACE_TYPE_COLLECTION_MAP = {
     PlaceType.RESTAURANT: "seoul-restaurant",
     PlaceType.FESTIVAL: "seoul-festival",
-    PlaceType.KCONTENT: "seoul-kcontent",
+    PlaceType.KCONTENT: "seoul-kcontents",
 }
 
 
@@ -154,7 +72,7 @@ PLACE_TYPE_COLLECTION_MAP = {
 # ============================================================
 
 @router.post("/enhanced", response_model=LLMRecommendResponse)
-def get_llm_enhanced_recommendations(
+async def get_llm_enhanced_recommendations(
     req: BookmarkBasedRecommendRequest,
     use_llm: bool = True,  # LLM 사용 여부 (비용 절약 옵션)
     db: Session = Depends(get_db),
@@ -171,122 +89,28 @@ def get_llm_enhanced_recommendations(
                         False면 간단한 규칙 기반 이유만 생성
     """
     
-    # 1️⃣ 사용자 북마크 가져오기
-    query = db.query(Bookmark).filter(Bookmark.user_id == req.user_id)
-    if req.place_type is not None:
-        query = query.filter(Bookmark.place_type == req.place_type)
-    
-    bookmarks = query.order_by(Bookmark.created_at.desc()).limit(10).all()
+    # 1️⃣ 사용자 북마크 + 상세 정보 (DB 작업은 스레드풀에서)
+    bookmarks, bookmark_details = await run_in_threadpool(_load_bookmarks_with_details, db, req)
     
     if not bookmarks:
         raise HTTPException(status_code=404, detail="해당 사용자의 북마크가 없습니다.")
     
-    # 북마크 상세 정보 조회 (LLM에 전달용)
-    bookmark_details = []
-    for bm in bookmarks:
-        details = fetch_original_data(db, bm.place_type, bm.reference_id)
-        if details:
-            bookmark_details.append({
-                "bookmark_id": bm.bookmark_id,
-                "place_type": bm.place_type,
-                "reference_id": bm.reference_id,
-                **details
-            })
+    # 2️⃣ Qdrant로 벡터 기반 추천 (컬렉션별 recommend_batch, 중복 제거 + 점수순)
+    recommend_results = await recommend_for_bookmarks(
+        bookmarks, req.top_k_per_bookmark, collection_map=PLACE_TYPE_COLLECTION_MAP, mode=req.mode
+    )
     
-    # 2️⃣ Qdrant로 벡터 기반 추천
-    client = get_qdrant_client()
-    qdrant_recommendations = []
-    seen_ids = set()
+    qdrant_recommendations = await run_in_threadpool(_build_qdrant_recommendations, db, recommend_results)
     
-    for bm in bookmarks:
-        collection_name = PLACE_TYPE_COLLECTION_MAP.get(bm.place_type)
-        if not collection_name:
-            continue
-            
-          
-        try:
-          
-            # 2. 실제 포인트 몇 개 가져와서 ID 형식 확인
-            points = client.scroll(collection_name=collection_name, limit=3)
-            print(f"🔍 실제 포인트 ID들: {[p.id for p in points[0]]}")
-            print(f"🔍 북마크 reference_id: {bm.reference_id} (타입: {type(bm.reference_id)})")
-            
-            # 3. 기존 recommend 코드
-            results = client.recommend(
-                collection_name=collection_name,
-                positive=[bm.reference_id],
-                limit=req.top_k_per_bookmark,
-            )
-        except Exception as e:
-            print(f"Qdrant 추천 실패: {e}")
-            continue
-        
-        try:
-            results = client.recommend(
-                collection_name=collection_name,
-                positive=[bm.reference_id],
-                limit=req.top_k_per_bookmark,
-            )
-        except Exception as e:
-            print(f"Qdrant 추천 실패: {e}")
-            continue
-        
-        for r in results:
-            payload = r.payload or {}
-            rec_reference_id = payload.get("content_id") or payload.get("id") or r.id
-            
-            unique_key = f"{bm.place_type}_{rec_reference_id}"
-            if unique_key in seen_ids:
-                continue
-            seen_ids.add(unique_key)
-            
-            # 원본 데이터 조회
-            original_data = fetch_original_data(db, bm.place_type, rec_reference_id)
-            
-            if original_data:
-                qdrant_recommendations.append({
-                    "place_type": bm.place_type,
-                    "reference_id": rec_reference_id,
-                    "name": original_data["name"],
-                    "address": original_data.get("address"),
-                    "image_url": original_data.get("image_url"),
-                    "latitude": original_data.get("latitude"),
-                    "longitude": original_data.get("longitude"),
-                    "category": original_data.get("category"),
-                    "score": r.score,
-                    "extra": original_data.get("extra", {}),
-                })
-            else:
-                # ✅ recommend.py와 동일한 fallback 추가
-                qdrant_recommendations.append({
-                    "place_type": bm.place_type,
-                    "reference_id": rec_reference_id,
-                    "name": (
-                        payload.get("location_name_en")
-                        or payload.get("location_name")
-                        or payload.get("name")
-                        or "Unknown"
-                    ),
-                    "address": payload.get("address_en") or payload.get("address"),
-                    "image_url": (
-                        payload.get("image_url")
-                        or payload.get("thumbnail")
-                        or payload.get("image")
-                    ),
-                    "latitude": payload.get("latitude"),
-                    "longitude": payload.get("longitude"),
-                    "category": payload.get("category_en") or payload.get("category"),
-                    "score": r.score,
-                    "extra": payload,
-                })
     if not qdrant_recommendations:
         raise HTTPException(status_code=404, detail="추천 결과를 찾지 못했습니다.")
     
-    # 3️⃣ LLM으로 강화 (선택적)
+    # 3️⃣ LLM으로 강화 (선택적, 동기 OpenAI 호출은 스레드풀에서)
     if use_llm:
         try:
             llm_service = LLMRecommendService()
-            enhanced_result = llm_service.enhance_recommendations(
+            enhanced_result = await run_in_threadpool(
+                llm_service.enhance_recommendations,
                 user_bookmarks=bookmark_details,
                 recommended_items=qdrant_recommendations,
                 top_n=10
@@ -350,4 +174,75 @@ def get_llm_enhanced_recommendations(
             total_count=len(recommendations),
             user_taste_summary="Based on your bookmarked places",
             recommendations=recommendations
-        )
\ No newline at end of file
+        )
+
+
+def _load_bookmarks_with_details(db: Session, req: BookmarkBasedRecommendRequest):
+    """사용자 북마크 + 북마크 상세 정보 (LLM에 전달용)"""
+    query = db.query(Bookmark).filter(Bookmark.user_id == req.user_id)
+    if req.place_type is not None:
+        query = query.filter(Bookmark.place_type == req.place_type)
+    
+    bookmarks = query.order_by(Bookmark.created_at.desc()).limit(10).all()
+    
+    bookmark_details = []
+    cards = hydrate_places(db, [(bm.place_type, bm.reference_id) for bm in bookmarks])
+    for bm, details in zip(bookmarks, cards):
+        if details:
+            bookmark_details.append({
+                "bookmark_id": bm.bookmark_id,
+                "place_type": bm.place_type,
+                "reference_id": bm.reference_id,
+                **details
+            })
+    
+    return bookmarks, bookmark_details
+
+
+def _build_qdrant_recommendations(db: Session, recommend_results: list) -> list[dict]:
+    """병합된 추천 결과 → 원본 데이터가 채워진 추천 목록 (점수순 유지)"""
+    qdrant_recommendations = []
+    
+    cards = hydrate_places(db, [(place_type, rec_reference_id) for place_type, rec_reference_id, _ in recommend_results])
+    
+    for (place_type, rec_reference_id, r), original_data in zip(recommend_results, cards):
+        payload = r.payload or {}
+        
+        if original_data:
+            qdrant_recommendations.append({
+                "place_type": place_type,
+                "reference_id": rec_reference_id,
+                "name": original_data["name"],
+                "address": original_data.get("address"),
+                "image_url": original_data.get("image_url"),
+                "latitude": original_data.get("latitude"),
+                "longitude": original_data.get("longitude"),
+                "category": original_data.get("category"),
+                "score": r.score,
+                "extra": original_data.get("extra", {}),
+            })
+        else:
+            # ✅ recommend.py와 동일한 fallback 추가
+            qdrant_recommendations.append({
+                "place_type": place_type,
+                "reference_id": rec_reference_id,
+                "name": (
+                    payload.get("location_name_en")
+                    or payload.get("location_name")
+                    or payload.get("name")
+                    or "Unknown"
+                ),
+                "address": payload.get("address_en") or payload.get("address"),
+                "image_url": (
+                    payload.get("image_url")
+                    or payload.get("thumbnail")
+                    or payload.get("image")
+                ),
+                "latitude": payload.get("latitude"),
+                "longitude": payload.get("longitude"),
+                "category": payload.get("category_en") or payload.get("category"),
+                "score": r.score,
+                "extra": payload,
+            })
+    
+    return qdrant_recommendations
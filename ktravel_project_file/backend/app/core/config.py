@@ -20,7 +20,82 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4o-mini"
-    
+
+    # OpenAI async 스트리밍 클라이언트 (공유 커넥션 풀)
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    OPENAI_READ_TIMEOUT_SECONDS: float = 20.0  # 청크 사이 최대 대기
+    OPENAI_MAX_CONNECTIONS: int = 500
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 100
+    OPENAI_MAX_RETRIES: int = 1
+    # 헤지 요청: 첫 토큰이 이 시간(ms, TTFT p95 근처) 안에 안 오거나 요청이 실패하면 두 번째 요청 → 먼저 시작한 스트림 사용 (0이면 끔)
+    OPENAI_HEDGE_AFTER_MS: int = 1500
+    OPENAI_FALLBACK_MODEL: str = ""  # 두 번째 요청 모델 (비우면 같은 모델)
+
+    # SSE 청크 묶음 전송 (시간 창 / 바이트 예산)
+    SSE_COALESCE_WINDOW_MS: int = 40
+    SSE_COALESCE_MAX_BYTES: int = 512
+
+    # 임베딩 캐시 (프로세스 LRU → Redis)
+    EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    EMBEDDING_CACHE_SIZE: int = 2048
+    EMBEDDING_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # 조언 / 비교 답변 의미 캐시 (질문 임베딩 유사도가 이 값 이상이면 GPT 대신 저장된 답변 재생)
+    ANSWER_CACHE: bool = True
+    ANSWER_CACHE_SIMILARITY: float = 0.95  # ada-002 는 관계없는 문장도 0.7~0.8 이라 높게
+    ANSWER_CACHE_MAX_ENTRIES: int = 256  # 프롬프트 템플릿별
+    ANSWER_CACHE_TTL_SECONDS: int = 24 * 3600
+    ANSWER_CACHE_REPLAY_CHARS_PER_SECOND: int = 600  # 재생 속도 (GPT 스트리밍과 비슷하게)
+    ANSWER_CACHE_LOOKUP_TIMEOUT_MS: int = 250  # 질문 임베딩이 이보다 늦으면 캐시 건너뛰고 GPT
+
+    # 장소 카드 캐시 (프로세스 LRU → Redis, 직렬화된 카드) - CRUD 쓰기 시 invalidate_place_cards로 무효화
+    PLACE_CARD_CACHE: bool = True
+    PLACE_CARD_CACHE_SIZE: int = 5000
+    PLACE_CARD_CACHE_TTL_SECONDS: int = 24 * 3600  # DB 직접 수정 대비
+    PLACE_CARD_VERSION_CHECK_SECONDS: int = 5  # 다른 워커의 무효화를 확인하는 주기 (프로세스 LRU)
+
+    # 유저별 북마크 추천 목록 미리 계산 (Redis, 북마크가 바뀌면 버전 증가 + 백그라운드에서 다시 계산)
+    USER_RECOMMENDATIONS_MATERIALIZED: bool = True
+    USER_RECOMMENDATIONS_TTL_SECONDS: int = 24 * 3600  # 카탈로그 / Qdrant 변경 반영
+    USER_RECOMMENDATIONS_REFRESH_DELAY_MS: int = 500  # 연달아 바뀌는 북마크를 모으는 시간
+
+    # 미리 생성한 장소 소개 (python -m app.services.blurbs) - "소개해줘" 수준 질문이면 GPT 대신 바로 스트리밍
+    PLACE_BLURBS: bool = True
+
+    # 대화 저장 write-behind (convers_id는 Redis 시퀀스로 미리 발급, 행은 배치 INSERT)
+    CONVERSATION_WRITE_BEHIND: bool = True
+    CONVERSATION_BATCH_SIZE: int = 100
+    CONVERSATION_FLUSH_INTERVAL_MS: int = 200
+    CONVERSATION_SPILL_PATH: str = "conversation_spill.jsonl"  # 종료 시 저장 못 한 행 보관
+
+    # 장소 검색 결과를 컬렉션이 끝나는 대로 전송 / 유사도가 이 값 이상이면 나머지를 기다리지 않고 생성 시작 (0이면 끔)
+    SEARCH_EARLY_START_SCORE: float = 0.9
+
+    # 추측 생성: 선두 후보 유사도가 이 값 이상이면 나머지 검색을 기다리는 동안 GPT 스트림 미리 시작 (빗나가면 취소, 기본 끔)
+    SPECULATIVE_GENERATION: bool = False
+    SPECULATIVE_START_SCORE: float = 0.85
+
+    # 변형 검색 예산 (요청 1개): 타입별 변형은 기대 수확 순으로 최대 N개, 첫 변형 결과가 확실하면(결합 점수) 나머지 변형은 임베딩 / 검색 안 함,
+    # 나머지 변형은 요청 시작부터 BUDGET_MS 안에 끝난 것만 사용 (0이면 각각 끔)
+    SEARCH_MAX_VARIANTS: int = 4
+    SEARCH_FIRST_STAGE_VARIANTS: int = 1
+    SEARCH_CERTAIN_SCORE: float = 0.8
+    SEARCH_BUDGET_MS: int = 1500
+
+    # 엔티티 바로가기 (이름이 정확히 나오면 임베딩 / Qdrant 생략)
+    ENTITY_FASTPATH: bool = True
+    ENTITY_FASTPATH_MIN_COVERAGE: float = 0.8  # 키워드 중 별칭이 차지하는 최소 비율
+    ENTITY_INDEX_CHECK_SECONDS: int = 30  # Redis 버전 키 확인 주기
+    ENTITY_INDEX_MAX_AGE_SECONDS: int = 3600  # 버전 변화 없어도 다시 로드 (DB 직접 수정 대비)
+
+    # 드라마 촬영지 목록 (payload 필터 scroll)
+    KCONTENT_DRAMA_MAX_LOCATIONS: int = 100  # 개수를 말하지 않았을 때 최대
+    KCONTENT_DRAMA_PAGE_SIZE: int = 12  # 'location_cards' 이벤트 1개당 카드 수
+
+    # 랜덤 추천 저장소 (ID + 최소 필드를 메모리에, 주기적으로 다시 로드)
+    RANDOM_RESERVOIR: bool = True
+    RANDOM_RESERVOIR_REFRESH_SECONDS: int = 600
+
     # Kakao API
     KAKAO_REST_API_KEY: str = ""
     
@@ -55,6 +55,10 @@ async def get_current_user(
     
     user = db.query(User).filter(User.user_id == user_id).first()
     
+    # 커넥션 바로 반납 - yield 의존성(get_db)은 응답이 끝나야 닫히므로
+    # 그대로 두면 SSE 스트림 / 긴 GPT 호출 동안 풀 커넥션을 잡고 있음 (세션은 다음 쿼리 때 다시 연결)
+    db.close()
+    
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
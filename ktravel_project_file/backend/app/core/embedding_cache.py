@@ -0,0 +1,239 @@
+# app/core/embedding_cache.py
+"""
+🚀 임베딩 캐시 (프로세스 LRU → Redis 2단계)
+
+- 같은 검색어("namsan tower" 등)를 매번 OpenAI에 보내지 않도록 벡터를 재사용
+- 키: 모델명 + 정규화된 텍스트 (소문자, 공백 정리)
+- 1단계: 프로세스 내 LRU (크기/TTL 제한)
+- 2단계: Redis (app.core.session.redis_client, TTL 제한) - 워커 간 공유
+- aembed_documents / aembed_query: async 경로 (redis.asyncio + OpenAI aembed_documents)
+- ChatService / ChatRestService / ChatKContentsService 가 모두 같은 인스턴스 사용
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+
+class EmbeddingCache:
+    """임베딩 모델 래퍼 - embed_query / embed_documents 인터페이스 그대로 제공"""
+
+    KEY_PREFIX = "emb"
+
+    def __init__(self, embeddings, model_name: str, max_size: int = 2048, ttl_seconds: int = 86400, redis=None, async_redis=None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis
+        self.async_redis = async_redis
+
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "evictions": 0}
+
+    # ===== 키 생성 =====
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """캐시 키용 텍스트 정규화"""
+        return " ".join(text.lower().split())
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha1(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{self.model_name}:{digest}"
+
+    # ===== 1단계: 프로세스 LRU =====
+
+    def _local_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, vector = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return vector
+
+    def _local_set(self, key: str, vector: List[float]):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl_seconds, vector)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # ===== 2단계: Redis =====
+
+    def _redis_get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        if self.redis is None or not keys:
+            return [None] * len(keys)
+        try:
+            raw_values = self.redis.mget(keys)
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 Redis 조회 실패: {e}")
+            return [None] * len(keys)
+        return [json.loads(raw) if raw else None for raw in raw_values]
+
+    def _redis_set_many(self, items: Dict[str, List[float]]):
+        if self.redis is None or not items:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, vector in items.items():
+                pipe.setex(key, self.ttl_seconds, json.dumps(vector))
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 Redis 저장 실패: {e}")
+
+    async def _aredis_get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        if self.async_redis is None or not keys:
+            return [None] * len(keys)
+        try:
+            raw_values = await self.async_redis.mget(keys)
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 Redis 조회 실패: {e}")
+            return [None] * len(keys)
+        return [json.loads(raw) if raw else None for raw in raw_values]
+
+    async def _aredis_set_many(self, items: Dict[str, List[float]]):
+        if self.async_redis is None or not items:
+            return
+        try:
+            pipe = self.async_redis.pipeline(transaction=False)
+            for key, vector in items.items():
+                pipe.setex(key, self.ttl_seconds, json.dumps(vector))
+            await pipe.execute()
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 Redis 저장 실패: {e}")
+
+    # ===== 조회 단계 (sync/async 공통) =====
+
+    def _lookup_local(self, keys: List[str]) -> Dict[str, List[float]]:
+        vectors: Dict[str, List[float]] = {}
+        for key in keys:
+            if key in vectors:
+                continue
+            vector = self._local_get(key)
+            if vector is not None:
+                vectors[key] = vector
+                self._stats["local_hits"] += 1
+        return vectors
+
+    def _apply_redis(self, pending: List[str], values: List[Optional[List[float]]], vectors: Dict[str, List[float]]):
+        for key, vector in zip(pending, values):
+            if vector is not None:
+                vectors[key] = vector
+                self._local_set(key, vector)
+                self._stats["redis_hits"] += 1
+
+    def _collect_missing(self, texts: List[str], keys: List[str], vectors: Dict[str, List[float]]) -> Dict[str, str]:
+        missing = {}
+        for text, key in zip(texts, keys):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        self._stats["misses"] += len(missing)
+        return missing
+
+    def _apply_fresh(self, missing: Dict[str, str], fresh: List[List[float]], vectors: Dict[str, List[float]]) -> Dict[str, List[float]]:
+        fresh_items = dict(zip(missing.keys(), fresh))
+        for key, vector in fresh_items.items():
+            vectors[key] = vector
+            self._local_set(key, vector)
+        return fresh_items
+
+    # ===== 공개 API (OpenAIEmbeddings 호환) =====
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트 임베딩 - 캐시 미스만 한 번의 배치로 OpenAI 호출"""
+        keys = [self._key(text) for text in texts]
+
+        # 1) 프로세스 LRU
+        vectors = self._lookup_local(keys)
+
+        # 2) Redis
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        self._apply_redis(pending, self._redis_get_many(pending), vectors)
+
+        # 3) OpenAI (미스만 배치로)
+        missing = self._collect_missing(texts, keys, vectors)
+        if missing:
+            fresh = self.embeddings.embed_documents(list(missing.values()))
+            self._redis_set_many(self._apply_fresh(missing, fresh, vectors))
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """단일 텍스트 임베딩 (캐시 우선)"""
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """embed_documents의 async 버전 - 이벤트 루프를 막지 않음"""
+        keys = [self._key(text) for text in texts]
+
+        # 1) 프로세스 LRU
+        vectors = self._lookup_local(keys)
+
+        # 2) Redis (async 클라이언트 없으면 건너뜀)
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        self._apply_redis(pending, await self._aredis_get_many(pending), vectors)
+
+        # 3) OpenAI (미스만 배치로)
+        missing = self._collect_missing(texts, keys, vectors)
+        if missing:
+            fresh = await self.embeddings.aembed_documents(list(missing.values()))
+            await self._aredis_set_many(self._apply_fresh(missing, fresh, vectors))
+
+        return [vectors[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """단일 텍스트 임베딩 (async, 캐시 우선)"""
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> Dict[str, float]:
+        """히트/미스 카운터"""
+        with self._lock:
+            local_size = len(self._local)
+        hits = self._stats["local_hits"] + self._stats["redis_hits"]
+        total = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "local_size": local_size,
+            "hit_rate": hits / total if total > 0 else 0.0,
+        }
+
+    def clear(self):
+        """프로세스 LRU 비우기 (Redis는 TTL로 만료)"""
+        with self._lock:
+            self._local.clear()
+
+
+# 🚀 프로세스 전역 싱글톤
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """공유 임베딩 캐시 싱글톤 반환"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                from langchain_openai import OpenAIEmbeddings
+                from app.core.session import async_redis_client, redis_client
+
+                _embedding_cache = EmbeddingCache(
+                    embeddings=OpenAIEmbeddings(model=settings.EMBEDDING_MODEL),
+                    model_name=settings.EMBEDDING_MODEL,
+                    max_size=settings.EMBEDDING_CACHE_SIZE,
+                    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+                    redis=redis_client,
+                    async_redis=async_redis_client,
+                )
+    return _embedding_cache
@@ -1,6 +1,8 @@
 # app/core/qdrant_client.py
 
-from qdrant_client import QdrantClient
+import asyncio
+
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 from typing import Optional
 
 from dotenv import load_dotenv
@@ -28,13 +30,8 @@ def _get_env(name: str, default: Optional[str] = None) -> Optional[str]:
     return os.getenv(name, default)
 
 
-def get_qdrant_client() -> QdrantClient:
-    """
-    Qdrant Cloud에 연결된 QdrantClient 인스턴스를 반환하는 함수.
-
-    - URL: QDRANT_HOST
-    - API KEY: QDRANT_API_KEY
-    """
+def _get_connection_info() -> tuple[str, str]:
+    """QDRANT_URL / QDRANT_API_KEY 조회 (없으면 RuntimeError)"""
 
     # 예: https://xxxxxx.us-west-2-0.aws.cloud.qdrant.io:6333
     qdrant_url = _get_env("QDRANT_URL")
@@ -53,6 +50,18 @@ def get_qdrant_client() -> QdrantClient:
             "QDRANT_API_KEY가 설정되지 않았습니다. .env 또는 환경변수에 QDRANT_API_KEY를 추가해주세요."
         )
 
+    return qdrant_url, qdrant_api_key
+
+
+def get_qdrant_client() -> QdrantClient:
+    """
+    Qdrant Cloud에 연결된 QdrantClient 인스턴스를 반환하는 함수.
+
+    - URL: QDRANT_HOST
+    - API KEY: QDRANT_API_KEY
+    """
+    qdrant_url, qdrant_api_key = _get_connection_info()
+
     # prefer_grpc=False: HTTP로 통신 (Cloud 환경에서 많이 사용)
     client = QdrantClient(
         url=qdrant_url,
@@ -62,6 +71,36 @@ def get_qdrant_client() -> QdrantClient:
 
     return client
 
+
+# async 엔드포인트용 클라이언트 (프로세스당 1개, 커넥션 풀 재사용)
+_async_client: Optional[AsyncQdrantClient] = None
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """
+    AsyncQdrantClient 싱글톤을 반환하는 함수.
+
+    get_qdrant_client()와 같은 설정을 사용하며, 첫 호출 시 한 번만 생성한다.
+    """
+    global _async_client
+    if _async_client is None:
+        qdrant_url, qdrant_api_key = _get_connection_info()
+        _async_client = AsyncQdrantClient(
+            url=qdrant_url,
+            api_key=qdrant_api_key,
+            prefer_grpc=False,
+        )
+    return _async_client
+
+
+async def close_async_qdrant_client():
+    """앱 종료 시 async 커넥션 풀 정리"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+
 def recommend(
     collection_name: str,
     positive: list[str],
@@ -85,3 +124,99 @@ def recommend(
         limit=limit,
     )
     return results
+
+
+async def arecommend(
+    collection_name: str,
+    positive: list,
+    limit: int = 10,
+) -> list:
+    """
+    recommend()의 async 버전 (AsyncQdrantClient 사용).
+
+    Args:
+        collection_name (str): Qdrant 컬렉션 이름
+        positive (list): 기준 포인트 ID 리스트
+        limit (int): 추천 결과 개수
+
+    Returns:
+        list: 추천 결과 리스트
+    """
+    client = get_async_qdrant_client()
+    return await client.recommend(
+        collection_name=collection_name,
+        positive=positive,
+        limit=limit,
+    )
+
+
+async def arecommend_many(
+    queries: list[tuple[str, list]],
+    limit: int = 10,
+    limits: Optional[list[int]] = None,
+) -> list:
+    """
+    여러 추천 요청을 asyncio.gather로 동시에 실행하는 함수.
+
+    호출한 요청이 취소되면 진행 중인 추천도 함께 취소된다.
+
+    Args:
+        queries (list[tuple[str, list]]): (컬렉션 이름, 기준 포인트 ID 리스트) 목록
+        limit (int): 요청당 추천 결과 개수
+        limits (list[int], optional): 요청별 추천 결과 개수 (있으면 limit 대신)
+
+    Returns:
+        list: queries와 같은 순서의 결과 리스트 (실패한 요청은 None)
+    """
+    async def _one(collection_name: str, positive: list, query_limit: int):
+        try:
+            return await arecommend(collection_name, positive, query_limit)
+        except Exception as e:
+            print(f"Qdrant recommend 실패 (collection={collection_name}, positive={positive}): {e}")
+            return None
+
+    limits = limits or [limit] * len(queries)
+    return await asyncio.gather(*(_one(c, p, n) for (c, p), n in zip(queries, limits)))
+
+
+async def arecommend_batch(
+    queries: list[tuple[str, list]],
+    limit: int = 10,
+    limits: Optional[list[int]] = None,
+) -> list:
+    """
+    여러 추천 요청을 컬렉션별 recommend_batch 한 번으로 묶어 실행하는 함수.
+
+    컬렉션끼리는 asyncio.gather로 동시에 보내므로 왕복 횟수 = 컬렉션 수.
+    배치 하나가 실패하면 (예: 컬렉션에 없는 포인트 ID가 섞임) 그 컬렉션만 요청별로 다시 보낸다.
+
+    Args:
+        queries (list[tuple[str, list]]): (컬렉션 이름, 기준 포인트 ID 리스트) 목록
+        limit (int): 요청당 추천 결과 개수
+        limits (list[int], optional): 요청별 추천 결과 개수 (있으면 limit 대신)
+
+    Returns:
+        list: queries와 같은 순서의 결과 리스트 (실패한 요청은 None)
+    """
+    client = get_async_qdrant_client()
+    limits = limits or [limit] * len(queries)
+    grouped: dict[str, list[int]] = {}
+    for index, (collection_name, _) in enumerate(queries):
+        grouped.setdefault(collection_name, []).append(index)
+
+    async def _collection(collection_name: str, indexes: list[int]):
+        requests = [
+            models.RecommendRequest(positive=queries[i][1], limit=limits[i], with_payload=True)
+            for i in indexes
+        ]
+        try:
+            return indexes, await client.recommend_batch(collection_name=collection_name, requests=requests)
+        except Exception as e:
+            print(f"⚠️ Qdrant recommend_batch 실패 (collection={collection_name}), 요청별로 재시도: {e}")
+            return indexes, await arecommend_many([queries[i] for i in indexes], limits=[limits[i] for i in indexes])
+
+    results: list = [None] * len(queries)
+    for indexes, responses in await asyncio.gather(*(_collection(c, i) for c, i in grouped.items())):
+        for index, response in zip(indexes, responses):
+            results[index] = response
+    return results
@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 import json
 import secrets
 from datetime import datetime
@@ -7,6 +8,9 @@ from app.core.config import settings
 # Redis 클라이언트
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
+# async 경로용 Redis 클라이언트 (연결은 첫 사용 시 생성)
+async_redis_client = redis.asyncio.from_url(settings.REDIS_URL, decode_responses=True)
+
 class SessionManager:
     """세션 관리 클래스"""
     
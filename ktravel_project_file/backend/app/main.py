@@ -3,6 +3,7 @@
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 
 # ✅ 기존 엔드포인트 라우터
@@ -85,4 +86,67 @@ async def startup_event():
     print("🌐 CORS 설정 확인:")
     print(f"  - localhost:3000 허용됨")
     print(f"  - Credentials: True")
-    print("=" * 50)
\ No newline at end of file
+    print("=" * 50)
+
+    # 💾 대화 write-behind 준비 (convers_id 시퀀스 + writer 스레드)
+    if settings.CONVERSATION_WRITE_BEHIND:
+        from app.services.conversation_store import get_conversation_writer, seed_convers_id_sequence
+        try:
+            await run_in_threadpool(seed_convers_id_sequence)
+        except Exception as e:
+            print(f"⚠️ convers_id 시퀀스 준비 실패 (첫 저장 때 다시 시도): {e}")
+        get_conversation_writer()
+
+    # 🎯 엔티티 별칭 인덱스 (MySQL 카탈로그 별칭 + Qdrant payload → 메모리, 변경되면 백그라운드에서 다시 로드)
+    from app.services.search import get_search_engine
+    search_engine = get_search_engine()
+    client_factory = lambda: search_engine.client
+    entities = search_engine.entities
+    if entities is not None:
+        try:
+            await run_in_threadpool(entities.load, client_factory())
+        except Exception as e:
+            print(f"⚠️ 엔티티 인덱스 로드 실패 (다음 갱신 때 다시 시도, 그동안 벡터 검색): {e}")
+        entities.start(client_factory, settings.ENTITY_INDEX_CHECK_SECONDS, settings.ENTITY_INDEX_MAX_AGE_SECONDS)
+
+    # 🎬 드라마 이름 payload 인덱스 (촬영지 목록 필터 scroll 용)
+    await run_in_threadpool(search_engine.ensure_payload_indexes)
+
+    # 🎲 랜덤 추천 저장소 (첫 로드 후 주기적으로 다시 로드)
+    if search_engine.reservoirs is not None:
+        await run_in_threadpool(search_engine.reservoirs.load_all, client_factory)
+        search_engine.reservoirs.start(client_factory, settings.RANDOM_RESERVOIR_REFRESH_SECONDS)
+
+    # ⭐ 북마크가 바뀐 유저의 추천 목록 다시 계산 task
+    if settings.USER_RECOMMENDATIONS_MATERIALIZED:
+        from app.services.user_recommendations import get_recommendation_refresher
+        get_recommendation_refresher().start()
+# -------------------------------
+# Shutdown 이벤트
+# -------------------------------
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 🚀 async OpenAI 커넥션 풀 정리
+    from app.utils.openai_client import close_async_client
+    await close_async_client()
+
+    # 💾 대기 중인 대화 모두 저장
+    from app.services.conversation_store import stop_conversation_writer
+    await run_in_threadpool(stop_conversation_writer)
+
+    # 🎯 엔티티 인덱스 / 🎲 랜덤 추천 저장소 갱신 스레드 정리
+    from app.services.search import get_search_engine
+    search_engine = get_search_engine()
+    if search_engine.entities is not None:
+        search_engine.entities.stop()
+    if search_engine.reservoirs is not None:
+        search_engine.reservoirs.stop()
+
+    # ⭐ 추천 목록 다시 계산 task 정리
+    from app.services.user_recommendations import get_recommendation_refresher
+    await get_recommendation_refresher().stop()
+
+    # 🔍 AsyncQdrantClient 커넥션 풀 정리 (추천 싱글톤 + 검색 엔진, 위 task 들이 끝난 뒤)
+    from app.core.qdrant_client import close_async_qdrant_client
+    await close_async_qdrant_client()
+    await search_engine.aclose()
@@ -0,0 +1,28 @@
+# app/models/attraction.py
+from sqlalchemy import Column, Integer, String, Text, DECIMAL
+from app.database.connection import Base
+
+
+class Attraction(Base):
+    __tablename__ = "attraction"  # 실제 테이블명 (db/init.sql)
+
+    attr_id = Column(Integer, primary_key=True, index=True)
+    title = Column(String(255), nullable=True)  # 관광지/명소 이름
+    data_url = Column(String(512), nullable=True)
+    attrdescription = Column(Text, nullable=True)
+
+    # 이용 정보
+    tel = Column(String(50), nullable=True)
+    operatinghour = Column(String(255), nullable=True)
+    holiday = Column(String(255), nullable=True)
+    address = Column(String(512), nullable=True)
+    nearsubway = Column(String(255), nullable=True)
+
+    # 이미지 / 위치
+    image_url = Column(String(512), nullable=True)
+    image_latitude = Column(DECIMAL(10, 6), nullable=True)
+    longitude = Column(DECIMAL(10, 6), nullable=True)
+    attr_code = Column(String(50), nullable=True)
+
+    def __repr__(self):
+        return f"<Attraction(attr_id={self.attr_id}, title='{self.title}')>"
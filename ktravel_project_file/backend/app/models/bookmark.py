@@ -83,6 +83,7 @@ class Bookmark(Base):
         db.add(new_bm)
         db.commit()
         db.refresh(new_bm)
+        cls._bookmarks_changed(user_id)
         return new_bm
 
     @classmethod
@@ -100,6 +101,14 @@ class Bookmark(Base):
 
         db.delete(obj)
         db.commit()
+        cls._bookmarks_changed(user_id)
+
+    @staticmethod
+    def _bookmarks_changed(user_id: int) -> None:
+        """저장된 추천 목록 무효화 + 백그라운드에서 다시 계산"""
+        from app.services.user_recommendations import notify_bookmarks_changed
+
+        notify_bookmarks_changed(user_id)
 
     def to_dict(self):
         """
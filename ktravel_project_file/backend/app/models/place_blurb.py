@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+class PlaceBlurb(Base):
+    """장소 1개의 미리 생성한 소개 답변 (페르소나별) - app.services.blurbs 배치 작업이 채움"""
+    __tablename__ = "place_blurbs"
+
+    persona = Column(String(20), primary_key=True)        # lumi / guide
+    search_type = Column(String(20), primary_key=True)    # festival / attraction / restaurant / kcontent
+    entity_id = Column(String(64), primary_key=True)      # festival_id / attr_id / restaurant id / content_id
+
+    source_hash = Column(String(40), nullable=False)      # 생성에 쓴 프롬프트 해시 (행 / 템플릿이 바뀌면 달라짐)
+    blurb = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<PlaceBlurb({self.persona}:{self.search_type}:{self.entity_id})>"
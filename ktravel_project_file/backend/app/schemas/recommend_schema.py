@@ -1,12 +1,14 @@
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 # ===== 요청 스키마 ===== 기존 정보 고객의 요청 
 class BookmarkBasedRecommendRequest(BaseModel):
     user_id: int
     place_type: Optional[int] = None
     top_k_per_bookmark: int = 5
+    # per_bookmark: 북마크마다 추천 후 점수순 병합 / centroid: 컬렉션의 북마크 전체를 positive로 한 번 (평균 벡터)
+    mode: Literal["per_bookmark", "centroid"] = "per_bookmark"
 
 
 # ===== 추천 아이템 스키마 ===== 추천 아이템 정보
@@ -0,0 +1,237 @@
+# app/services/answer_cache.py
+"""
+💬 조언 / 비교 답변 의미 캐시 (프로세스 메모리)
+
+- "tips for the subway in Seoul" / "subway tips seoul?" 처럼 뜻이 같은 질문은 답도 같음
+  → (프롬프트 템플릿, 질문 임베딩) 기준으로 가장 가까운 저장 답변이 유사도 기준 이상이면 GPT 호출 없이 재생
+- 키: 프롬프트 템플릿 문자열의 해시 (템플릿이 바뀌면 자연히 새 캐시) + 질문 임베딩 (공유 임베딩 캐시 사용)
+- 템플릿별 최대 개수 (가장 오래 안 쓴 것부터 제거) + TTL
+- 재생은 단어 단위로 GPT 스트리밍과 비슷한 속도 (ChunkWriter / SSE 흐름 그대로)
+- 워커 프로세스마다 따로 채워짐 (Redis에는 최근접 검색이 없어서 공유 안 함)
+"""
+import asyncio
+import hashlib
+import math
+import re
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.embedding_cache import get_embedding_cache
+from app.utils.openai_client import achat_with_gpt_stream
+
+try:
+    import numpy as np
+except ImportError:  # numpy 없으면 순수 파이썬 내적
+    np = None
+
+_WORDS = re.compile(r"\S+\s*|\s+")
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class _Bucket:
+    """템플릿 1개의 저장 답변들 (단위 벡터 행렬 + 답변 + 만료 / 마지막 사용 시각)"""
+
+    def __init__(self):
+        self.vectors: List[List[float]] = []
+        self.answers: List[str] = []
+        self.expires_at: List[float] = []
+        self.used_at: List[float] = []
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.answers)
+
+    def remove(self, index: int):
+        for column in (self.vectors, self.answers, self.expires_at, self.used_at):
+            del column[index]
+        self._matrix = None
+
+    def append(self, vector: List[float], answer: str, expires_at: float, now: float):
+        self.vectors.append(vector)
+        self.answers.append(answer)
+        self.expires_at.append(expires_at)
+        self.used_at.append(now)
+        self._matrix = None
+
+    def nearest(self, vector: List[float]):
+        """(가장 가까운 인덱스, 코사인 유사도) - 비어 있으면 (None, 0.0)"""
+        if not self.vectors:
+            return None, 0.0
+        if np is not None:
+            if self._matrix is None:
+                self._matrix = np.asarray(self.vectors, dtype=np.float32)
+            scores = self._matrix @ np.asarray(vector, dtype=np.float32)
+            index = int(scores.argmax())
+            return index, float(scores[index])
+        scores = [sum(a * b for a, b in zip(row, vector)) for row in self.vectors]
+        index = max(range(len(scores)), key=scores.__getitem__)
+        return index, scores[index]
+
+
+class SemanticAnswerCache:
+    """
+    템플릿별 최근접 답변 캐시
+
+    사용법:
+        cache = SemanticAnswerCache(threshold=0.95)
+        answer = cache.lookup(ADVICE_PROMPT, vector)     # 없으면 None
+        cache.store(ADVICE_PROMPT, vector, full_response)
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 256, ttl_seconds: int = 86400):
+        """
+        Args:
+            threshold: 코사인 유사도 하한 (이 이상이면 같은 질문으로 봄)
+            max_entries: 템플릿별 최대 답변 수 (넘으면 가장 오래 안 쓴 것 제거)
+            ttl_seconds: 답변 유효 시간
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def template_key(template: str) -> str:
+        return hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
+
+    def lookup(self, template: str, vector: List[float]) -> Optional[str]:
+        """가장 가까운 저장 답변 (유사도 기준 미만이면 None)"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(self.template_key(template))
+            if bucket is None:
+                self._stats["misses"] += 1
+                return None
+            self._drop_expired(bucket, now)
+            index, similarity = bucket.nearest(_unit(vector))
+            if index is None or similarity < self.threshold:
+                self._stats["misses"] += 1
+                return None
+            bucket.used_at[index] = now
+            self._stats["hits"] += 1
+            print(f"💬 답변 캐시 적중 (유사도 {similarity:.3f})")
+            return bucket.answers[index]
+
+    def store(self, template: str, vector: List[float], answer: str):
+        """답변 저장 (거의 같은 질문이 이미 있으면 교체, 가득 차면 가장 오래 안 쓴 것 제거)"""
+        if not answer:
+            return
+        now = time.monotonic()
+        vector = _unit(vector)
+        with self._lock:
+            bucket = self._buckets.setdefault(self.template_key(template), _Bucket())
+            self._drop_expired(bucket, now)
+            index, similarity = bucket.nearest(vector)
+            if index is not None and similarity >= self.threshold:
+                bucket.remove(index)
+            bucket.append(vector, answer, now + self.ttl_seconds, now)
+            while len(bucket) > self.max_entries:
+                bucket.remove(min(range(len(bucket)), key=bucket.used_at.__getitem__))
+                self._stats["evictions"] += 1
+            self._stats["stores"] += 1
+
+    def _drop_expired(self, bucket: _Bucket, now: float):
+        for index in range(len(bucket) - 1, -1, -1):
+            if bucket.expires_at[index] < now:
+                bucket.remove(index)
+                self._stats["expired"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size = sum(len(bucket) for bucket in self._buckets.values())
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": size,
+            "templates": len(self._buckets),
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
+async def areplay(text: str, chars_per_second: Optional[int] = None) -> AsyncIterator[str]:
+    """저장된 답변을 단어 단위로 GPT 스트리밍 속도처럼 yield"""
+    chars_per_second = chars_per_second or settings.ANSWER_CACHE_REPLAY_CHARS_PER_SECOND
+    for piece in _WORDS.findall(text):
+        yield piece
+        await asyncio.sleep(len(piece) / chars_per_second)
+
+
+async def _aembed(message: str) -> Optional[List[float]]:
+    try:
+        return await get_embedding_cache().aembed_query(message.strip())
+    except Exception as e:
+        print(f"⚠️ 답변 캐시 임베딩 실패 (GPT 호출): {e}")
+        return None
+
+
+async def acached_gpt_stream(template: str, message: str, max_tokens: int = 350, temperature: float = 0.7) -> AsyncIterator[str]:
+    """
+    template.format(message=message) 의 GPT 스트림 - 비슷한 질문의 답이 캐시에 있으면 재생
+
+    캐시 조회가 먼저, GPT는 못 찾았을 때만 호출 (적중하면 토큰 비용 0).
+    질문 임베딩이 ANSWER_CACHE_LOOKUP_TIMEOUT_MS 안에 안 끝나면 기다리지 않고 GPT 호출
+    (임베딩은 계속 진행 → 끝나면 답변 저장에만 사용, 공유 임베딩 캐시에도 남아 다음 질문은 빠름).
+    끝까지 받은 답변만 저장 (중간에 연결이 끊기면 저장 안 함).
+    임베딩이 실패하면 캐시 없이 GPT 호출.
+    """
+    cache = get_answer_cache()
+    embedding = None
+    if cache is not None:
+        embedding = asyncio.ensure_future(_aembed(message))
+        await asyncio.wait({embedding}, timeout=settings.ANSWER_CACHE_LOOKUP_TIMEOUT_MS / 1000)
+        if embedding.done():
+            vector = embedding.result()
+            answer = cache.lookup(template, vector) if vector is not None else None
+            if answer is not None:
+                async for piece in areplay(answer):
+                    yield piece
+                return
+        else:
+            print(f"⏱️ 답변 캐시 임베딩 {settings.ANSWER_CACHE_LOOKUP_TIMEOUT_MS}ms 초과 (조회 없이 GPT 호출)")
+
+    prompt = template.format(message=message)
+    stream = achat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=max_tokens, temperature=temperature)
+    try:
+        parts = []
+        async for chunk in stream:
+            parts.append(chunk)
+            yield chunk
+        if embedding is not None:
+            # 임베딩이 아직이면 끝날 때 저장 (마지막 청크 / done 이벤트를 기다리게 하지 않음)
+            answer = "".join(parts)
+
+            def _store(task: "asyncio.Future"):
+                if not task.cancelled() and task.result() is not None:
+                    cache.store(template, task.result(), answer)
+
+            embedding.add_done_callback(_store)
+            embedding = None
+    finally:
+        # 중간에 끊겼을 때 (클라이언트 연결 종료 등) 남은 임베딩 / 스트림 정리
+        if embedding is not None and not embedding.done():
+            embedding.cancel()
+        await stream.aclose()
+
+
+# 🚀 프로세스 전역 캐시
+_answer_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """공유 답변 캐시 싱글톤 (ANSWER_CACHE 꺼져 있으면 None)"""
+    global _answer_cache
+    if _answer_cache is None and settings.ANSWER_CACHE:
+        _answer_cache = SemanticAnswerCache(
+            threshold=settings.ANSWER_CACHE_SIMILARITY,
+            max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+        )
+    return _answer_cache
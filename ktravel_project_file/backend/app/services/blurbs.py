@@ -0,0 +1,292 @@
+# app/services/blurbs.py
+"""
+📝 장소 소개 답변 미리 생성 (오프라인 배치) + 채팅 경로 조회
+
+- 단일 장소 답변(place_search / kcontent_search)은 대부분 행 1개를 GPT가 다시 말하는 것
+  → 모든 축제 / 관광명소 / 레스토랑 / K-Content 에 대해 페르소나별 짧은 소개를 미리 만들어 place_blurbs 테이블에 저장
+- 채팅 경로: 질문이 "장소 이름 + 소개해줘" 수준이면 저장된 소개를 바로 스트리밍 (GPT 호출 없음)
+  질문에 다른 내용(가는 법, 시간, 가격 등)이 있으면 기존처럼 GPT
+- 증분 / 재개: 행마다 생성에 쓴 프롬프트의 해시를 같이 저장 → 다시 돌리면 해시가 같은 행은 건너뜀
+  (행 내용이나 프롬프트 템플릿이 바뀐 행만 다시 생성, 중간에 멈춰도 저장된 페이지까지는 그대로)
+- 채팅 경로에서도 현재 결과로 만든 프롬프트 해시가 저장된 해시와 다르면 (행이 바뀜) 저장된 소개를 쓰지 않음
+  (이름이 정확히 나온 질문의 결과도 Qdrant payload 그대로라 배치와 같은 프롬프트 → 해시가 같음)
+- 페르소나: lumi (ChatService - /chat/send, /chat/kcontents/send 의 장소 / 레스토랑 / 촬영지 답변),
+  guide (ChatRestService - /chat/restaurant/send)
+- place_blurbs 테이블은 db/init.sql 에 있음 (배치 작업도 없으면 생성)
+
+실행:
+    python -m app.services.blurbs                       # 모든 페르소나, 바뀐 행만
+    python -m app.services.blurbs --persona lumi --types kcontent --limit 20
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.entity_index import normalize_name
+
+# 이름 외에 이 단어들만 있으면 "소개해줘" 질문으로 봄
+GENERIC_ASK_WORDS = frozenset({
+    "tell", "me", "about", "what", "whats", "is", "where", "introduce", "introduco", "show", "info",
+    "information", "explain", "describe", "know", "do", "you", "can", "could", "please", "pls",
+    "the", "a", "an", "this", "that", "it", "of", "in", "seoul", "korea", "place", "spot",
+    "drama", "kdrama", "k-drama", "filming", "location", "restaurant", "festival",
+    "알려줘", "알려주세요", "알려", "소개", "소개해줘", "소개해주세요", "설명", "설명해줘", "뭐야", "어디야",
+    "대해", "대해서", "정보", "좀", "해줘", "궁금해",
+})
+
+# 이름 뒤에 붙는 짧은 조사 ("경복궁에", "남산타워는")
+MAX_PARTICLE_LENGTH = 2
+
+# result 의 이름 필드 (타입 상관없이 있는 것만)
+NAME_FIELDS = ("title", "restaurant_name", "location_name", "location_name_en", "drama_name", "drama_name_en")
+
+# 결과 dict 의 ID 필드
+ENTITY_ID_FIELDS = {
+    "festival": "festival_id",
+    "attraction": "attr_id",
+    "restaurant": "id",
+    "kcontent": "content_id",
+}
+
+_stats = {"hits": 0, "misses": 0, "stale": 0, "bespoke": 0}
+
+
+def blurb_stats() -> Dict[str, int]:
+    return dict(_stats)
+
+
+# ===== 질문 / 결과 판별 =====
+
+def _name_tokens(result: Dict[str, Any]) -> set:
+    tokens = set()
+    for field in NAME_FIELDS:
+        value = result.get(field)
+        if value:
+            tokens.update(normalize_name(str(value)).split())
+    return tokens
+
+
+def is_generic_question(message: str, result: Dict[str, Any]) -> bool:
+    """장소 이름과 GENERIC_ASK_WORDS 외에 다른 단어가 없으면 True (저장된 소개로 충분)"""
+    names = _name_tokens(result)
+    for token in normalize_name(message).split():
+        if token in GENERIC_ASK_WORDS or token in names:
+            continue
+        if any(token.startswith(name) and len(token) - len(name) <= MAX_PARTICLE_LENGTH for name in names):
+            continue
+        return False
+    return True
+
+
+def generic_question(result: Dict[str, Any]) -> str:
+    """배치 생성에 쓰는 질문 (채팅 경로의 해시 확인에도 같은 문장 사용)"""
+    name = next((result[field] for field in NAME_FIELDS if result.get(field)), "")
+    return f"Tell me about {name}"
+
+
+def entity_id(result: Dict[str, Any]) -> Optional[str]:
+    value = result.get(ENTITY_ID_FIELDS.get(result.get("type", ""), ""))
+    return str(value) if value not in (None, "") else None
+
+
+def source_hash(prompt: str) -> str:
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
+
+# ===== 채팅 경로 =====
+
+def _load_blurb(persona: str, search_type: str, key: str):
+    from app.database.connection import SessionLocal
+    from app.models.place_blurb import PlaceBlurb
+
+    db = SessionLocal()
+    try:
+        return db.get(PlaceBlurb, (persona, search_type, key))
+    finally:
+        db.close()
+
+
+async def astored_blurb(
+    persona: str, result: Dict[str, Any], message: str, build_prompt: Callable[[Dict[str, Any], str], str]
+) -> Optional[str]:
+    """
+    저장된 소개 (질문이 따로 답이 필요하거나, 없거나, 행이 바뀌었으면 None → GPT)
+
+    Args:
+        persona: 'lumi' / 'guide'
+        result: 포맷된 검색 결과
+        build_prompt: 그 서비스의 (result, message) → 프롬프트 (배치 작업과 같은 함수)
+    """
+    if not settings.PLACE_BLURBS:
+        return None
+    if not is_generic_question(message, result):
+        _stats["bespoke"] += 1
+        return None
+    key = entity_id(result)
+    if key is None:
+        return None
+
+    try:
+        row = await run_in_threadpool(_load_blurb, persona, result.get("type", ""), key)
+    except Exception as e:
+        print(f"⚠️ 저장된 소개 조회 실패 (GPT 호출): {e}")
+        return None
+    if row is None:
+        _stats["misses"] += 1
+        return None
+    if row.source_hash != source_hash(build_prompt(result, generic_question(result))):
+        _stats["stale"] += 1
+        return None
+
+    _stats["hits"] += 1
+    print(f"📝 저장된 소개 사용: {persona}:{result.get('type')}:{key}")
+    return row.blurb
+
+
+# ===== 배치 작업 =====
+
+class BlurbPersona:
+    """페르소나 1개: 검색 함수(결과 포맷) + 프롬프트 함수 + 대상 타입"""
+
+    def __init__(self, name: str, searchers: Dict[str, Callable], build_prompt: Callable[[Dict[str, Any], str], str]):
+        self.name = name
+        self.searchers = searchers
+        self.build_prompt = build_prompt
+
+
+def _personas() -> Dict[str, BlurbPersona]:
+    from app.services.chat_rest import ChatRestService
+    from app.services.chat_service import ChatService
+
+    return {
+        "lumi": BlurbPersona("lumi", {
+            "festival": ChatService._search_best_festival,
+            "attraction": ChatService._search_best_attraction,
+            "restaurant": ChatService._search_best_restaurant,
+            "kcontent": ChatService._search_best_kcontent,
+        }, ChatService._build_quick_prompt),
+        "guide": BlurbPersona("guide", ChatRestService._searchers(), ChatRestService._build_quick_prompt),
+    }
+
+
+def _format_point(engine, persona: BlurbPersona, search_type: str, point) -> Optional[Dict[str, Any]]:
+    """scroll 한 포인트 → 채팅 경로와 똑같은 결과 dict (검색 함수에 포인트를 고정한 context를 넘김)"""
+    from app.services.entity_index import EntityHit
+
+    context = engine.context("", [search_type], exact=False)
+    context.pin(EntityHit(search_type, point.id, "", point.payload or {}))
+    with contextlib.redirect_stdout(io.StringIO()):  # 검색 함수 로그는 배치에서 생략
+        return persona.searchers[search_type]("", context)
+
+
+def _generate(prompt: str) -> Optional[str]:
+    from app.utils.openai_client import chat_with_gpt
+
+    try:
+        return chat_with_gpt([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6)
+    except Exception as e:
+        print(f"⚠️ 소개 생성 실패 (다음 실행 때 다시): {e}")
+        return None
+
+
+def generate_blurbs(
+    personas: Optional[List[str]] = None,
+    search_types: Optional[List[str]] = None,
+    workers: int = 4,
+    limit: Optional[int] = None,
+    page_size: int = 64,
+) -> Dict[str, int]:
+    """
+    바뀐 행만 소개 생성 후 place_blurbs에 저장 (페이지마다 커밋 → 중간에 멈춰도 이어서 실행 가능)
+
+    Args:
+        personas: 대상 페르소나 (기본: 전부)
+        search_types: 대상 타입 (기본: 페르소나의 전부)
+        workers: GPT 동시 호출 수
+        limit: 새로 생성할 최대 개수 (시험 실행용)
+    """
+    from app.database.connection import SessionLocal, engine as db_engine
+    from app.models.place_blurb import PlaceBlurb
+    from app.services.search import get_search_engine
+
+    PlaceBlurb.__table__.create(bind=db_engine, checkfirst=True)
+    search_engine = get_search_engine()
+    registry = _personas()
+    counts = {"generated": 0, "skipped": 0, "failed": 0}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for persona in [registry[name] for name in (personas or registry)]:
+            for search_type in persona.searchers:
+                if search_types and search_type not in search_types:
+                    continue
+
+                db = SessionLocal()
+                try:
+                    done = dict(
+                        db.query(PlaceBlurb.entity_id, PlaceBlurb.source_hash)
+                        .filter(PlaceBlurb.persona == persona.name, PlaceBlurb.search_type == search_type)
+                        .all()
+                    )
+                    offset = None
+                    while limit is None or counts["generated"] < limit:
+                        points, offset = search_engine.client.scroll(
+                            collection_name=search_engine.collection_name(search_type),
+                            limit=page_size,
+                            offset=offset,
+                            with_payload=True,
+                            with_vectors=False,
+                        )
+
+                        pending = []
+                        for point in points:
+                            result = _format_point(search_engine, persona, search_type, point)
+                            key = entity_id(result) if result else None
+                            if key is None:
+                                continue
+                            prompt = persona.build_prompt(result, generic_question(result))
+                            prompt_hash = source_hash(prompt)
+                            if done.get(key) == prompt_hash:
+                                counts["skipped"] += 1
+                                continue
+                            pending.append((key, prompt, prompt_hash))
+                        if limit is not None:
+                            pending = pending[:limit - counts["generated"]]
+
+                        for (key, _, prompt_hash), blurb in zip(pending, executor.map(_generate, [p[1] for p in pending])):
+                            if not blurb:
+                                counts["failed"] += 1
+                                continue
+                            db.merge(PlaceBlurb(
+                                persona=persona.name, search_type=search_type, entity_id=key,
+                                source_hash=prompt_hash, blurb=blurb,
+                            ))
+                            done[key] = prompt_hash
+                            counts["generated"] += 1
+                        db.commit()
+
+                        if offset is None or not points:
+                            break
+                    print(f"✅ 소개 생성 {persona.name}:{search_type} - 누적 {counts}")
+                finally:
+                    db.close()
+
+    print(f"🏁 소개 배치 완료: {counts} ({time.perf_counter() - start:.0f}s)")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="장소 소개 답변 미리 생성 (바뀐 행만)")
+    parser.add_argument("--persona", nargs="*", choices=["lumi", "guide"])
+    parser.add_argument("--types", nargs="*", choices=list(ENTITY_ID_FIELDS))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+    generate_blurbs(args.persona, args.types, workers=args.workers, limit=args.limit)
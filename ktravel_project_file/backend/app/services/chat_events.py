@@ -0,0 +1,85 @@
+# app/services/chat_events.py
+"""
+💬 채팅 파이프라인 이벤트
+
+- 채팅 서비스의 send_message_streaming 은 SSE 문자열 대신 ChatEvent 를 yield 한다.
+- SSE 엔드포인트는 sse_stream 으로 직렬화하고,
+  일반 엔드포인트(/chat/send)는 final_event 로 같은 파이프라인의 마지막 이벤트를 받는다.
+  → 문자열 재파싱 / 중첩 이벤트 루프 없음
+"""
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.utils.sse import sse_event
+
+# 파이프라인을 끝내는 이벤트 타입
+FINAL_EVENT_TYPES = ("done", "multiple_locations", "error")
+
+
+class ChatEvent:
+    """
+    채팅 파이프라인 이벤트 1개
+
+    Args:
+        type: 'searching' / 'found' / 'generating' / 'chunk' / 'done' / 'multiple_locations' / 'error' ...
+        data: type 외의 필드 (프론트엔드로 그대로 전달)
+    """
+
+    __slots__ = ("type", "data", "_frame")
+
+    def __init__(self, type: str, data: Optional[Dict[str, Any]] = None):
+        self.type = type
+        self.data = data or {}
+        self._frame: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "ChatEvent":
+        """{'type': ..., ...} 형태의 dict → ChatEvent"""
+        data = dict(payload)
+        return cls(data.pop("type"), data)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def status(type: str, message: str) -> "ChatEvent":
+        """고정 상태 이벤트 ({'type', 'message'}) - 같은 객체를 재사용해서 인코딩도 한 번만"""
+        return ChatEvent(type, {"message": message})
+
+    @classmethod
+    def chunk(cls, content: str) -> "ChatEvent":
+        """GPT 응답 청크"""
+        return cls("chunk", {"content": content})
+
+    @property
+    def is_final(self) -> bool:
+        return self.type in FINAL_EVENT_TYPES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, **self.data}
+
+    def to_sse(self) -> str:
+        """SSE data 프레임 (처음 한 번만 인코딩)"""
+        if self._frame is None:
+            self._frame = sse_event(self.to_dict())
+        return self._frame
+
+    def __repr__(self):
+        return f"<ChatEvent(type={self.type!r})>"
+
+
+async def sse_stream(events: AsyncIterator[ChatEvent]) -> AsyncIterator[str]:
+    """ChatEvent 스트림 → SSE 프레임 스트림 (StreamingResponse 용)"""
+    async for event in events:
+        yield event.to_sse()
+
+
+async def final_event(events: AsyncIterator[ChatEvent]) -> Optional[ChatEvent]:
+    """파이프라인을 끝까지 돌리고 마지막 이벤트(done / multiple_locations / error) 반환"""
+    try:
+        async for event in events:
+            if event.is_final:
+                return event
+        return None
+    finally:
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -5,19 +5,19 @@
 - Festival/Attraction/Restaurant 검색 안함
 - prompt3.py 사용 (열정적인 K-Drama 팬 가이드 톤)
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional
 from sqlalchemy.orm import Session
-import json
-import os
 import random
 import re
-import asyncio
-from langchain_openai import OpenAIEmbeddings
-from qdrant_client import QdrantClient
-from concurrent.futures import ThreadPoolExecutor
 
 from app.models.conversation import Conversation  
-from app.utils.openai_client import chat_with_gpt, chat_with_gpt_stream
+from app.services.conversation_store import asave_conversation, queue_conversation
+from app.services.search import SearchQueryContext, get_search_engine
+from app.services.answer_cache import acached_gpt_stream
+from app.utils.openai_client import achat_with_gpt_stream, chat_with_gpt
+from app.services.chat_events import ChatEvent
+from app.utils.sse import ChunkWriter
+from app.utils.patterns import KCONTENT_PATTERNS, extract_count
 from app.utils.prompt3 import (
     KCONTENT_QUICK_PROMPT,
     KCONTENT_COMPARISON_PROMPT,
@@ -28,207 +28,18 @@ from app.utils.prompt3 import (
 
 class ChatKContentsService:
     
-    # 🎯 Qdrant 설정 (KContents만)
-    #QDRANT_URL = "http://172.17.0.1:6333"
-    QDRANT_URL = os.getenv("QDRANT_URL", "http://172.17.0.1:6333")
-    QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-    
-    
-    KCONTENT_COLLECTION = "seoul-kcontents"
-    
-    # 🚀 임베딩 모델 캐싱 (재사용)
-    _embedding_model = None
-    
-    # 🚀 Qdrant 클라이언트 캐싱 (재사용)
-    _qdrant_client = None
-    
-    @staticmethod
-    def _get_embedding_model():
-        """임베딩 모델 싱글톤 패턴으로 재사용"""
-        if ChatKContentsService._embedding_model is None:
-            ChatKContentsService._embedding_model = OpenAIEmbeddings(model="text-embedding-ada-002")
-        return ChatKContentsService._embedding_model
-        
-    @staticmethod
-    def _get_qdrant_client():
-        """Qdrant 클라이언트 싱글톤 패턴으로 재사용 - 클라우드/로컬 자동 선택"""
-        if ChatKContentsService._qdrant_client is None:
-            # API 키 있으면 클라우드 모드
-            if ChatKContentsService.QDRANT_API_KEY:
-                ChatKContentsService._qdrant_client = QdrantClient(
-                    url=ChatKContentsService.QDRANT_URL,
-                    api_key=ChatKContentsService.QDRANT_API_KEY,
-                    timeout=60,
-                    prefer_grpc=False
-                )
-                print(f"✅ Qdrant Cloud 연결 (KContents): {ChatKContentsService.QDRANT_URL}")
-            else:
-                ChatKContentsService._qdrant_client = QdrantClient(
-                    url=ChatKContentsService.QDRANT_URL,
-                    timeout=60,
-                    prefer_grpc=False
-                )
-                print(f"✅ Qdrant Local 연결 (KContents): {ChatKContentsService.QDRANT_URL}")
-        return ChatKContentsService._qdrant_client
-    
-    # ===== 🔧 검색어 개선 기능 =====
-    
-    @staticmethod
-    def _preprocess_query(query: str) -> str:
-        """검색 전 쿼리 정리"""
-        
-        # 1. 불용어 제거
-        stopwords = {"a", "an", "the", "in", "at", "on", "me", "to", "introduce", "tell", "show", "explain", "describe"}
-        words = [w for w in query.lower().split() if w not in stopwords]
-        
-        # 2. 재조합
-        cleaned_query = " ".join(words)
-        
-        print(f"🔧 쿼리 정리: '{query}' → '{cleaned_query}'")
-        return cleaned_query if cleaned_query else query
-    
-    @staticmethod
-    def _normalize_query(query: str) -> str:
-        """검색어를 정규화하여 더 정확한 매칭 (K-Drama용)"""
-        
-        # K-Drama/K-Content 특화 보정 규칙
-        corrections = {
-            # 드라마 제목 영어 → 한글
-            "crash landing on you": "사랑의 불시착",
-            "itaewon class": "이태원 클라쓰",
-            "kingdom": "킹덤",
-            "goblin": "도깨비",
-            "descendants of the sun": "태양의 후예",
-            "my love from the star": "별에서 온 그대",
-            
-            # 일반 용어
-            "filming location": "촬영지",
-            "drama location": "드라마 촬영지",
-            "kdrama": "한국 드라마",
-            "k-drama": "한국 드라마",
-        }
-        
-        query_lower = query.lower()
-        
-        for eng, kor in corrections.items():
-            if eng in query_lower:
-                query = query.replace(eng, kor)
-                print(f"🔧 검색어 보정: '{eng}' → '{kor}'")
-        
-        return query
-    
-    @staticmethod
-    def _expand_search_terms(query: str) -> List[str]:
-        """검색어를 자동으로 확장 (K-Drama용)"""
-        
-        variants = [query]
-        
-        # 자동 변형 규칙들
-        query_lower = query.lower()
-        
-        # 촬영지 관련 변형
-        if "filming" in query_lower or "location" in query_lower:
-            variants.append(query.replace("filming location", "촬영지"))
-            variants.append(query.replace("location", "장소"))
-        
-        # 드라마 관련 변형
-        if "drama" in query_lower:
-            variants.append(query.replace("drama", "드라마"))
-        
-        return list(set(variants))  # 중복 제거
-    
-    @staticmethod
-    def _calculate_keyword_overlap(query: str, title: str) -> float:
-        """키워드 겹치는 정도 계산"""
-        query_words = set(query.lower().split())
-        title_words = set(title.lower().split())
-        
-        overlap = len(query_words & title_words)
-        total = len(query_words | title_words)
-        
-        return overlap / total if total > 0 else 0
-    
-    @staticmethod
-    def _improved_search(query: str) -> Dict[str, Any]:
-        """🔧 현실적으로 개선된 K-Content 검색"""
-        
-        try:
-            print(f"🔍 K-Content 검색 시작: '{query}'")
-            
-            # 1. 쿼리 전처리 (불용어 제거)
-            cleaned_query = ChatKContentsService._preprocess_query(query)
-            
-            # 2. 검색어 정규화
-            normalized_query = ChatKContentsService._normalize_query(cleaned_query)
-            
-            # 3. 검색어 확장
-            search_variants = ChatKContentsService._expand_search_terms(normalized_query)
-            print(f"🔧 검색 변형들: {search_variants}")
-            
-            # 4. 모든 변형으로 검색
-            best_result = None
-            best_score = 0
-            
-            qdrant_client = ChatKContentsService._get_qdrant_client()
-            embedding_model = ChatKContentsService._get_embedding_model()
-            
-            for variant in search_variants:
-                try:
-                    query_embedding = embedding_model.embed_query(variant)
-                    
-                    search_results = qdrant_client.search(
-                        collection_name=ChatKContentsService.KCONTENT_COLLECTION,
-                        query_vector=query_embedding,
-                        limit=5,
-                        score_threshold=0.3,  # 낮은 임계값으로 더 많은 결과
-                        with_payload=True,
-                        with_vectors=False
-                    )
-                    
-                    for result in search_results:
-                        # Vector 유사도 + 키워드 매칭 점수
-                        vector_score = result.score
-                        
-                        # 🎯 metadata에서 drama_name으로 제목 추출
-                        metadata = result.payload.get("metadata", {})
-                        drama_name = metadata.get("drama_name", "")
-                        location_name = metadata.get("location_name", "")
-                        combined_title = f"{drama_name} {location_name}"
-                        
-                        keyword_score = ChatKContentsService._calculate_keyword_overlap(cleaned_query, combined_title)
-                        combined_score = vector_score * 0.8 + keyword_score * 0.2
-                        
-                        if combined_score > best_score:
-                            best_score = combined_score
-                            best_result = result
-                            print(f"✅ 더 좋은 결과: '{variant}' → 점수: {combined_score:.3f}")
-                
-                except Exception as e:
-                    print(f"⚠️ 변형 '{variant}' 검색 실패: {e}")
-                    continue
-            
-            # 5. 결과 반환 (임계값 0.4로 낮춤)
-            if best_result and best_score > 0.4:
-                return best_result
-            else:
-                print(f"❌ 유효한 결과 없음 (최고 점수: {best_score:.3f})")
-                return None
-                
-        except Exception as e:
-            print(f"❌ K-Content 검색 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+    # 🔍 검색은 공용 엔진 (클라이언트 / 임베딩 캐시 / 컬렉션 프로필 공유, KContents만 사용)
+    search = get_search_engine()
     
     # ===== 🎬 K-Content 검색 함수 =====
     
     @staticmethod
-    def _search_best_kcontent(keyword: str) -> Dict[str, Any]:
+    def _search_best_kcontent(keyword: str, context: Optional[SearchQueryContext] = None) -> Dict[str, Any]:
         """🎬 K-Content 벡터 검색"""
         try:
             print(f"🎬 K-Content 검색: '{keyword}'")
             
-            result = ChatKContentsService._improved_search(keyword)
+            result = ChatKContentsService.search.best_match(keyword, "kcontent", context)
             
             if not result:
                 print(f"🔍 K-Content 검색 결과 없음: '{keyword}'")
@@ -271,7 +82,7 @@ class ChatKContentsService:
     # ===== 메인 메시지 처리 함수 =====
     
     @staticmethod
-    def send_message(db: Session, user_id: int, message: str) -> Dict[str, Any]:
+    def send_message(user_id: int, message: str) -> Dict[str, Any]:
         """
         🚀 K-Content 메시지 처리
         """
@@ -305,20 +116,13 @@ class ChatKContentsService:
                     temperature=0.7
                 )
                 
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
                 
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "kcontents": [],
                     "has_kcontents": False,
                     "map_markers": []
@@ -336,20 +140,13 @@ class ChatKContentsService:
                     temperature=0.7
                 )
                 
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
                 
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "kcontents": [],
                     "has_kcontents": False,
                     "map_markers": []
@@ -364,20 +161,13 @@ class ChatKContentsService:
                 
                 ai_response = ChatKContentsService._generate_random_response(random_kcontents)
                 
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
                 
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "results": random_kcontents,
                     "kcontents": random_kcontents,
                     "has_kcontents": len(random_kcontents) > 0,
@@ -405,14 +195,7 @@ class ChatKContentsService:
                 
                 # 4. DB 저장
                 step_start = time.time()
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 print(f"⏱️ 4. DB 저장: {time.time() - step_start:.3f}초")
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
@@ -425,7 +208,7 @@ class ChatKContentsService:
                 # 5. 응답 구성
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "results": best_result,
                     "kcontents": best_result,
                     "has_kcontents": len(best_result) > 0,
@@ -436,7 +219,7 @@ class ChatKContentsService:
             raise Exception(f"K-Content 채팅 처리 중 오류 발생: {str(e)}")
     
     @staticmethod
-    async def send_message_streaming(db: Session, user_id: int, message: str):
+    async def send_message_streaming(user_id: int, message: str) -> AsyncIterator[ChatEvent]:
         """
         🌊 K-Content 스트리밍 메시지 처리 - 제너레이터 반환
         """
@@ -453,109 +236,83 @@ class ChatKContentsService:
             
             # 🤔 비교 질문 처리
             if question_type == "comparison":
-                yield f"data: {json.dumps({'type': 'generating', 'message': '🤔 Comparing K-Drama locations...'}, ensure_ascii=False)}\n\n"
-                
-                prompt = KCONTENT_COMPARISON_PROMPT.format(message=message)
+                yield ChatEvent.status('generating', '🤔 Comparing K-Drama locations...')
                 
                 # 스트리밍 응답
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=300, temperature=0.7):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                chunk_writer = ChunkWriter()
+                async for content in chunk_writer.stream(acached_gpt_stream(KCONTENT_COMPARISON_PROMPT, message, max_tokens=300, temperature=0.7)):
+                    yield ChatEvent.chunk(content)
+                full_response = chunk_writer.text
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'kcontents': [], 'has_kcontents': False}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'kcontents': [], 'has_kcontents': False})
                 return
             
             # 💡 일반 조언/팁 질문 처리
             elif question_type == "general_advice":
-                yield f"data: {json.dumps({'type': 'generating', 'message': '💡 Preparing K-Drama tips...'}, ensure_ascii=False)}\n\n"
-                
-                prompt = KCONTENT_ADVICE_PROMPT.format(message=message)
+                yield ChatEvent.status('generating', '💡 Preparing K-Drama tips...')
                 
                 # 스트리밍 응답
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=350, temperature=0.7):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                chunk_writer = ChunkWriter()
+                async for content in chunk_writer.stream(acached_gpt_stream(KCONTENT_ADVICE_PROMPT, message, max_tokens=350, temperature=0.7)):
+                    yield ChatEvent.chunk(content)
+                full_response = chunk_writer.text
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'kcontents': [], 'has_kcontents': False}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'kcontents': [], 'has_kcontents': False})
                 return
             
             # 🎯 랜덤 추천 처리
             elif is_random or question_type == "random_recommendation":
-                yield f"data: {json.dumps({'type': 'random', 'message': '🎲 Finding amazing K-Drama locations...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('random', '🎲 Finding amazing K-Drama locations...')
                 
-                random_kcontents = ChatKContentsService._get_random_kcontents(count=10)
+                random_kcontents = await ChatKContentsService._aget_random_kcontents(count=10)
                 ai_response = ChatKContentsService._generate_random_response(random_kcontents)
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=ai_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, ai_response)
                 
                 # 🗺️ 랜덤 추천 마커 디버깅
                 print(f"🗺️ 랜덤 마커 생성 시작: kcontents 개수={len(random_kcontents)}")
                 map_markers = ChatKContentsService._create_map_markers(random_kcontents)
                 print(f"🗺️ 랜덤 생성된 마커: {len(map_markers)}개")
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': ai_response, 'results': random_kcontents, 'kcontents': random_kcontents, 'convers_id': conversation.convers_id, 'has_kcontents': True, 'map_markers': map_markers}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': ai_response, 'results': random_kcontents, 'kcontents': random_kcontents, 'convers_id': convers_id, 'has_kcontents': True, 'map_markers': map_markers})
                 return
             
             # 🚀 특정 K-Content 검색 (기본 동작)
             else:
-                yield f"data: {json.dumps({'type': 'searching', 'message': '🔍 Searching for K-Drama location...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('searching', '🔍 Searching for K-Drama location...')
                 
                 # K-Content 검색
-                kcontent = ChatKContentsService._search_best_kcontent(keyword)
+                context = await ChatKContentsService.search.aretrieve(keyword, ["kcontent"])
+                kcontent = ChatKContentsService._search_best_kcontent(keyword, context)
                 
                 if not kcontent:
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'Sorry, I could not find that K-Drama location. 😅'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('error', 'Sorry, I could not find that K-Drama location. 😅')
                     return
                 
                 kcontent['type'] = 'kcontent'
                 
                 title = f"{kcontent['drama_name']} - {kcontent['location_name']}"
-                yield f"data: {json.dumps({'type': 'found', 'title': title, 'result': kcontent}, ensure_ascii=False)}\n\n"
-                
-                yield f"data: {json.dumps({'type': 'generating', 'message': '🎬 Preparing K-Drama info...'}, ensure_ascii=False)}\n\n"
-                
-                # 프롬프트 생성
-                prompt = KCONTENT_QUICK_PROMPT.format(
-                    drama_name=kcontent.get('drama_name', ''),
-                    location_name=kcontent.get('location_name', ''),
-                    address=kcontent.get('address', ''),
-                    trip_tip=kcontent.get('trip_tip', '')[:500],
-                    keyword=kcontent.get('keyword', ''),
-                    message=message
-                )
+                yield ChatEvent('found', {'title': title, 'result': kcontent})
+                
+                yield ChatEvent.status('generating', '🎬 Preparing K-Drama info...')
+                
+                prompt = ChatKContentsService._build_quick_prompt(kcontent, message)
                 
                 # 스트리밍 응답
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                chunk_writer = ChunkWriter()
+                async for content in chunk_writer.stream(achat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6)):
+                    yield ChatEvent.chunk(content)
+                full_response = chunk_writer.text
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
                 # 🗺️ 지도 마커 생성 - 디버깅 로그 추가!
                 print(f"🗺️ 마커 생성 시작: kcontent 데이터 확인")
@@ -574,7 +331,7 @@ class ChatKContentsService:
                 completion_data = {
                     'type': 'done',
                     'full_response': full_response,
-                    'convers_id': conversation.convers_id,
+                    'convers_id': convers_id,
                     'result': kcontent,
                     'results': [kcontent],
                     'kcontents': [kcontent],
@@ -583,13 +340,13 @@ class ChatKContentsService:
                 }
                 
                 print(f"🗺️ 완료 데이터 전송: map_markers={len(map_markers)}개")
-                yield f"data: {json.dumps(completion_data, ensure_ascii=False)}\n\n"
+                yield ChatEvent.from_dict(completion_data)
             
         except Exception as e:
             print(f"❌ K-Content Streaming 오류: {e}")
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+            yield ChatEvent('error', {'message': str(e)})
     
     # ===== 🔧 헬퍼 함수들 =====
     
@@ -604,50 +361,22 @@ class ChatKContentsService:
             print(f"\n🔍 K-Content 질문 분석 시작: '{message}'")
             
             # === 수량 추출 ===
-            import re
-            number_patterns = [
-                r'(\d+)곳', r'(\d+)개', r'(\d+)가지',
-                r'(\d+)\s*places?', r'(\d+)\s*spots?', r'(\d+)\s*locations?'
-            ]
-            
-            extracted_count = None
-            for pattern in number_patterns:
-                match = re.search(pattern, message_lower)
-                if match:
-                    extracted_count = int(match.group(1))
-                    print(f"   ✅ 수량 발견: {extracted_count}개")
-                    break
+            extracted_count = extract_count(message_lower)
+            
+            # 🚀 키워드 테이블 전체를 한 번에 스캔
+            hits = KCONTENT_PATTERNS.scan(message_lower)
             
             # === 비교 질문 감지 ===
-            comparison_patterns = [
-                ' vs ', 'vs.', ' versus ', 'which one', 'which is better', 'compare'
-            ]
-            for pattern in comparison_patterns:
-                if pattern in message_lower:
-                    return {
-                        "type": "comparison",
-                        "keyword": message,
-                        "count": extracted_count
-                    }
+            if "comparison" in hits:
+                return {
+                    "type": "comparison",
+                    "keyword": message,
+                    "count": extracted_count
+                }
             
             # === 일반 조언/팁 질문 감지 ===
-            advice_patterns = [
-                'tip', 'tips', 'advice', '팁', '조언',
-                'how to', '어떻게', '방법',
-                'what should i know', '알아야', '준비',
-                'etiquette', '에티켓', 'visit', '방문'
-            ]
-            
-            has_advice_keyword = any(kw in message_lower for kw in advice_patterns)
-            
             # K-Drama 관련 키워드가 없으면 조언 질문
-            drama_keywords = [
-                'drama', 'filming', 'location', 'scene',
-                '드라마', '촬영지', '장면', '장소'
-            ]
-            has_drama = any(kw in message_lower for kw in drama_keywords)
-            
-            if has_advice_keyword and not has_drama:
+            if "advice" in hits and "drama_scene" not in hits:
                 return {
                     "type": "general_advice",
                     "keyword": message,
@@ -655,14 +384,7 @@ class ChatKContentsService:
                 }
             
             # === 추천 질문 감지 ===
-            recommendation_patterns = [
-                'recommend', 'suggestion', 'suggest', '추천',
-                'best', 'top', 'popular', '인기'
-            ]
-            
-            has_recommendation = any(kw in message_lower for kw in recommendation_patterns)
-            
-            if has_recommendation or extracted_count:
+            if "recommendation" in hits or extracted_count:
                 return {
                     "type": "recommendation",
                     "keyword": message,
@@ -710,49 +432,31 @@ class ChatKContentsService:
         try:
             print(f"🎲 랜덤 K-Content {count}개 추천 시작...")
             
-            qdrant_client = ChatKContentsService._get_qdrant_client()
-            
-            fetch_count = min(count * 5, 100)
+            # 🎲 메모리 저장소에서 균등 샘플링 (로드 전이면 기존 scroll)
+            metadatas = ChatKContentsService.search.sample("kcontent", count)
+            if metadatas is None:
+                scroll_result = ChatKContentsService.search.client.scroll(**ChatKContentsService._random_scroll_args(count))
+                metadatas = ChatKContentsService._shuffle_metadata(scroll_result[0], count)
+            return ChatKContentsService._pick_random_kcontents(metadatas)
             
-            scroll_result = qdrant_client.scroll(
-                collection_name=ChatKContentsService.KCONTENT_COLLECTION,
-                limit=fetch_count,
-                offset=random.randint(0, 50),
-                with_payload=True,
-                with_vectors=False
-            )
-            
-            points = scroll_result[0]
-            
-            if not points:
-                print(f"❌ K-Content를 가져올 수 없습니다")
-                return []
-            
-            print(f"📊 가져온 K-Content: {len(points)}개")
-            
-            random.shuffle(points)
-            selected_points = points[:count]
-            
-            kcontents = []
-            for point in selected_points:
-                # 🎯 payload.metadata에서 데이터 추출
-                kcontent_metadata = point.payload.get("metadata", {})
-                
-                formatted_data = {
-                    "content_id": kcontent_metadata.get("content_id"),
-                    "drama_name": kcontent_metadata.get("drama_name"),
-                    "location_name": kcontent_metadata.get("location_name"),
-                    "thumbnail": kcontent_metadata.get("thumbnail", ""),
-                    "latitude": float(kcontent_metadata.get("latitude", 0)),
-                    "longitude": float(kcontent_metadata.get("longitude", 0)),
-                    "type": "kcontent"
-                }
-                
-                kcontents.append(formatted_data)
-                print(f"  ✅ {formatted_data['drama_name']} - {formatted_data['location_name']}")
+        except Exception as e:
+            print(f"❌ 랜덤 추천 오류: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+    
+    @staticmethod
+    async def _aget_random_kcontents(count: int = 10) -> List[Dict[str, Any]]:
+        """🎯 랜덤 K-Content 추천 (async 스크롤)"""
+        try:
+            print(f"🎲 랜덤 K-Content {count}개 추천 시작...")
             
-            print(f"🎲 랜덤 추천 완료: {len(kcontents)}개")
-            return kcontents
+            # 🎲 메모리 저장소에서 균등 샘플링 (로드 전이면 기존 scroll)
+            metadatas = ChatKContentsService.search.sample("kcontent", count)
+            if metadatas is None:
+                scroll_result = await ChatKContentsService.search.async_client.scroll(**ChatKContentsService._random_scroll_args(count))
+                metadatas = ChatKContentsService._shuffle_metadata(scroll_result[0], count)
+            return ChatKContentsService._pick_random_kcontents(metadatas)
             
         except Exception as e:
             print(f"❌ 랜덤 추천 오류: {e}")
@@ -760,6 +464,50 @@ class ChatKContentsService:
             traceback.print_exc()
             return []
     
+    @staticmethod
+    def _random_scroll_args(count: int) -> Dict[str, Any]:
+        """랜덤 추천용 scroll 인자 (저장소 로드 전 fallback - 넉넉히 가져와서 섞음)"""
+        return {
+            "collection_name": ChatKContentsService.search.collection_name("kcontent"),
+            "limit": min(count * 5, 100),
+            "offset": random.randint(0, 50),
+            "with_payload": True,
+            "with_vectors": False
+        }
+    
+    @staticmethod
+    def _shuffle_metadata(points: list, count: int) -> List[Dict[str, Any]]:
+        """스크롤 결과에서 count개 무작위 선택 → payload.metadata 목록"""
+        random.shuffle(points)
+        return [point.payload.get("metadata", {}) for point in points[:count]]
+    
+    @staticmethod
+    def _pick_random_kcontents(metadatas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """샘플링한 metadata 목록 → 카드 포맷팅"""
+        if not metadatas:
+            print(f"❌ K-Content를 가져올 수 없습니다")
+            return []
+        
+        print(f"📊 가져온 K-Content: {len(metadatas)}개")
+        
+        kcontents = []
+        for kcontent_metadata in metadatas:
+            formatted_data = {
+                "content_id": kcontent_metadata.get("content_id"),
+                "drama_name": kcontent_metadata.get("drama_name"),
+                "location_name": kcontent_metadata.get("location_name"),
+                "thumbnail": kcontent_metadata.get("thumbnail", ""),
+                "latitude": float(kcontent_metadata.get("latitude", 0)),
+                "longitude": float(kcontent_metadata.get("longitude", 0)),
+                "type": "kcontent"
+            }
+            
+            kcontents.append(formatted_data)
+            print(f"  ✅ {formatted_data['drama_name']} - {formatted_data['location_name']}")
+        
+        print(f"🎲 랜덤 추천 완료: {len(kcontents)}개")
+        return kcontents
+    
     @staticmethod
     def _generate_random_response(kcontents: List[Dict]) -> str:
         """🎯 랜덤 추천 응답 생성"""
@@ -832,9 +580,9 @@ class ChatKContentsService:
                 return "Hey K-Drama fan! 🎬 Ask me anything! 😊"
     
     @staticmethod
-    def _gpt_response(message: str, kcontent: Dict) -> str:
-        """🎬 K-Content GPT 응답"""
-        prompt = KCONTENT_QUICK_PROMPT.format(
+    def _build_quick_prompt(kcontent: Dict, message: str) -> str:
+        """🎬 K-Content 답변 프롬프트 (일반 / 스트리밍 / 소개 답변 배치 작업 공용)"""
+        return KCONTENT_QUICK_PROMPT.format(
             drama_name=kcontent.get('drama_name', ''),
             location_name=kcontent.get('location_name', ''),
             address=kcontent.get('address', ''),
@@ -842,6 +590,11 @@ class ChatKContentsService:
             keyword=kcontent.get('keyword', ''),
             message=message
         )
+    
+    @staticmethod
+    def _gpt_response(message: str, kcontent: Dict) -> str:
+        """🎬 K-Content GPT 응답"""
+        prompt = ChatKContentsService._build_quick_prompt(kcontent, message)
         
         response_messages = [{"role": "user", "content": prompt}]
         
@@ -852,7 +605,7 @@ class ChatKContentsService:
         """대화 히스토리 조회"""
         conversations = db.query(Conversation).filter(
             Conversation.user_id == user_id
-        ).order_by(Conversation.datetime.desc()).limit(limit).all()
+        ).order_by(Conversation.datetime.desc(), Conversation.convers_id.desc()).limit(limit).all()  # 같은 배치는 datetime이 같음
         
         return [
             {
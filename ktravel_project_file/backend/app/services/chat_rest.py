@@ -5,19 +5,22 @@
 - 3-way 병렬 검색
 - prompt2.py 사용 (영어, 전문가/친절 톤)
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional
 from sqlalchemy.orm import Session
-import json
-import os
 import random
 import re
-import asyncio
-from langchain_openai import OpenAIEmbeddings
-from qdrant_client import QdrantClient
-from concurrent.futures import ThreadPoolExecutor
 
 from app.models.conversation import Conversation  
-from app.utils.openai_client import chat_with_gpt, chat_with_gpt_stream
+from app.core.config import settings
+from app.services.conversation_store import asave_conversation, queue_conversation
+from app.services.search import SearchQueryContext, get_search_engine
+from app.services.speculation import Speculator
+from app.services.answer_cache import acached_gpt_stream, areplay
+from app.services.blurbs import astored_blurb
+from app.utils.openai_client import achat_with_gpt_stream, chat_with_gpt
+from app.services.chat_events import ChatEvent
+from app.utils.sse import ChunkWriter
+from app.utils.patterns import REST_PATTERNS, extract_count, has_restaurant_keyword
 from app.utils.prompt2 import (
     # Restaurant prompts (전문가 톤)
     RESTAURANT_QUICK_PROMPT,
@@ -38,255 +41,30 @@ from app.utils.prompt2 import (
 
 class ChatRestService:
     
-    # 🎯 Qdrant 설정 (3개 컬렉션 모두 사용)
-    #QDRANT_URL = "http://172.17.0.1:6333"
-    QDRANT_URL = os.getenv("QDRANT_URL", "http://172.17.0.1:6333")
-    QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+    # 🔍 검색은 공용 엔진 (클라이언트 / 임베딩 캐시 / 컬렉션 프로필 공유)
+    search = get_search_engine()
     
-    FESTIVAL_COLLECTION = "seoul-festival"
-    ATTRACTION_COLLECTION = "seoul-attraction"
-    RESTAURANT_COLLECTION = "seoul-restaurant"
+    # 3개 컬렉션 모두 사용
+    SEARCH_TYPES = ["festival", "attraction", "restaurant"]
     
-    # 🚀 임베딩 모델 캐싱 (재사용)
-    _embedding_model = None
-    
-    # 🚀 Qdrant 클라이언트 캐싱 (재사용)
-    _qdrant_client = None
-    
-    @staticmethod
-    def _get_embedding_model():
-        """임베딩 모델 싱글톤 패턴으로 재사용"""
-        if ChatRestService._embedding_model is None:
-            ChatRestService._embedding_model = OpenAIEmbeddings(model="text-embedding-ada-002")
-        return ChatRestService._embedding_model
-        
-    @staticmethod
-    def _get_qdrant_client():
-        """Qdrant 클라이언트 싱글톤 패턴으로 재사용 - 클라우드/로컬 자동 선택"""
-        if ChatRestService._qdrant_client is None:
-            # API 키 있으면 클라우드 모드
-            if ChatRestService.QDRANT_API_KEY:
-                ChatRestService._qdrant_client = QdrantClient(
-                    url=ChatRestService.QDRANT_URL,
-                    api_key=ChatRestService.QDRANT_API_KEY,
-                    timeout=60,
-                    prefer_grpc=False
-                )
-                print(f"✅ Qdrant Cloud 연결 (Restaurant): {ChatRestService.QDRANT_URL}")
-            else:
-                ChatRestService._qdrant_client = QdrantClient(
-                    url=ChatRestService.QDRANT_URL,
-                    timeout=60,
-                    prefer_grpc=False
-                )
-                print(f"✅ Qdrant Local 연결 (Restaurant): {ChatRestService.QDRANT_URL}")
-        return ChatRestService._qdrant_client        
-    
-    
-    
-    # ===== 🔧 검색어 개선 기능 =====
-    
-    @staticmethod
-    def _preprocess_query(query: str) -> str:
-        """검색 전 쿼리 정리"""
-        
-        # 1. 불용어 제거
-        stopwords = {"a", "an", "the", "in", "at", "on", "me", "to", "introduce", "tell", "show", "explain", "describe"}
-        words = [w for w in query.lower().split() if w not in stopwords]
-        
-        # 2. 재조합
-        cleaned_query = " ".join(words)
-        
-        print(f"🔧 쿼리 정리: '{query}' → '{cleaned_query}'")
-        return cleaned_query if cleaned_query else query
+    # ===== 🍽️📍🎭 검색 함수들 =====
     
     @staticmethod
-    def _normalize_query(query: str) -> str:
-        """검색어를 정규화하여 더 정확한 매칭 (통합 버전)"""
-        
-        # 통합 보정 규칙
-        corrections = {
-            # 일반 장소명
-            "namsan tower": "namsan seoul tower",
-            "n tower": "namsan seoul tower", 
-            "seoul tower": "namsan seoul tower",
-            "63 building": "63빌딩",
-            "lotte tower": "lotte world tower",
-            "dongdaemun": "dongdaemun design plaza",
-            "myeongdong": "myeongdong shopping street",
-            "gangnam": "gangnam district",
-            "hongdae": "hongik university area",
-            "bukchon": "bukchon hanok village",
-            "insadong": "insadong cultural street",
-            "itaewon": "itaewon global village",
-            
-            # 음식 종류
-            "korean bbq": "korean barbecue",
-            "korean food": "korean restaurant",
-            "chinese food": "chinese restaurant", 
-            "japanese food": "japanese restaurant",
-            "italian food": "italian restaurant",
-            
-            # 지역명 + 음식점
-            "hongdae food": "hongik university restaurant",
-            "hongdae food scene": "hongik university dining",
-            "gangnam food": "gangnam district restaurant", 
-            "gangnam korean bbq": "gangnam barbecue",
-            "myeongdong food": "myeongdong restaurant",
-            "itaewon food": "itaewon international restaurant",
-            "itaewon restaurants": "itaewon global dining",
-            "insadong food": "insadong traditional restaurant",
-            "yeouido food": "yeouido business district restaurant",
+    def _searchers() -> Dict[str, Any]:
+        """SEARCH_TYPES 순서의 {search_type: _search_best_*} (aprogressive_best 용)"""
+        return {
+            "festival": ChatRestService._search_best_festival,
+            "attraction": ChatRestService._search_best_attraction,
+            "restaurant": ChatRestService._search_best_restaurant,
         }
-        
-        query_lower = query.lower()
-        
-        for wrong, correct in corrections.items():
-            if wrong in query_lower:
-                query = query.replace(wrong, correct)
-                print(f"🔧 검색어 보정: '{wrong}' → '{correct}'")
-        
-        return query
-    
-    @staticmethod
-    def _expand_search_terms(query: str) -> List[str]:
-        """검색어를 자동으로 확장 (통합 버전)"""
-        
-        variants = [query]
-        
-        # 자동 변형 규칙들
-        query_lower = query.lower()
-        
-        # 서울 추가
-        if "seoul" not in query_lower and len(query.split()) <= 2:
-            variants.append(f"{query} seoul")
-            variants.append(f"seoul {query}")
-        
-        # 일반 장소 관련 변형
-        if "tower" in query_lower:
-            variants.append(query.replace("tower", "타워").replace("Tower", "타워"))
-        if "palace" in query_lower:
-            variants.append(query.replace("palace", "궁").replace("Palace", "궁"))
-        if "temple" in query_lower:
-            variants.append(query.replace("temple", "사").replace("Temple", "사"))
-        if "market" in query_lower:
-            variants.append(query.replace("market", "시장").replace("Market", "시장"))
-        if "park" in query_lower:
-            variants.append(query.replace("park", "공원").replace("Park", "공원"))
-        
-        # 음식점 관련 변형
-        if "restaurant" in query_lower:
-            variants.append(query.replace("restaurant", "맛집").replace("Restaurant", "맛집"))
-        if "food" in query_lower:
-            variants.append(query.replace("food", "음식").replace("Food", "음식"))
-        
-        return list(set(variants))  # 중복 제거
-    
-    @staticmethod
-    def _calculate_keyword_overlap(query: str, title: str) -> float:
-        """키워드 겹치는 정도 계산"""
-        query_words = set(query.lower().split())
-        title_words = set(title.lower().split())
-        
-        overlap = len(query_words & title_words)
-        total = len(query_words | title_words)
-        
-        return overlap / total if total > 0 else 0
-    
-    @staticmethod
-    def _improved_search(query: str, search_type: str = "attraction") -> Dict[str, Any]:
-        """🔧 현실적으로 개선된 검색 (통합 버전)"""
-        
-        try:
-            print(f"🔍 개선된 검색 시작: '{query}' (타입: {search_type})")
-            
-            # 1. 쿼리 전처리 (불용어 제거)
-            cleaned_query = ChatRestService._preprocess_query(query)
-            
-            # 2. 검색어 정규화
-            normalized_query = ChatRestService._normalize_query(cleaned_query)
-            
-            # 3. 검색어 확장
-            search_variants = ChatRestService._expand_search_terms(normalized_query)
-            print(f"🔧 검색 변형들: {search_variants}")
-            
-            # 4. 모든 변형으로 검색
-            best_result = None
-            best_score = 0
-            
-            qdrant_client = ChatRestService._get_qdrant_client()
-            embedding_model = ChatRestService._get_embedding_model()
-            
-            # 🎯 컬렉션 선택
-            if search_type == "restaurant":
-                collection_name = ChatRestService.RESTAURANT_COLLECTION
-            elif search_type == "festival":
-                collection_name = ChatRestService.FESTIVAL_COLLECTION
-            else:
-                collection_name = ChatRestService.ATTRACTION_COLLECTION
-            
-            for variant in search_variants:
-                try:
-                    query_embedding = embedding_model.embed_query(variant)
-                    
-                    search_results = qdrant_client.search(
-                        collection_name=collection_name,
-                        query_vector=query_embedding,
-                        limit=5,
-                        score_threshold=0.3,  # 낮은 임계값으로 더 많은 결과
-                        with_payload=True,
-                        with_vectors=False
-                    )
-                    
-                    for result in search_results:
-                        # Vector 유사도 + 키워드 매칭 점수
-                        vector_score = result.score
-                        
-                        # 타입별로 제목 추출
-                        if search_type == "restaurant":
-                            metadata = result.payload.get("metadata", {})
-                            title = metadata.get("name", "")
-                        elif search_type == "festival":
-                            metadata = result.payload.get("metadata", {})
-                            title = metadata.get("title", "")
-                        else:  # attraction
-                            metadata = result.payload.get("metadata", {})
-                            title = metadata.get("title", "")
-                            
-                        keyword_score = ChatRestService._calculate_keyword_overlap(cleaned_query, title)
-                        combined_score = vector_score * 0.8 + keyword_score * 0.2
-                        
-                        if combined_score > best_score:
-                            best_score = combined_score
-                            best_result = result
-                            print(f"✅ 더 좋은 결과: '{variant}' → 점수: {combined_score:.3f}")
-                
-                except Exception as e:
-                    print(f"⚠️ 변형 '{variant}' 검색 실패: {e}")
-                    continue
-            
-            # 5. 결과 반환 (임계값 0.5)
-            if best_result and best_score > 0.5:
-                return best_result
-            else:
-                print(f"❌ 유효한 결과 없음 (최고 점수: {best_score:.3f})")
-                return None
-                
-        except Exception as e:
-            print(f"❌ 개선된 검색 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-    
-    # ===== 🍽️📍🎭 검색 함수들 =====
     
     @staticmethod
-    def _search_best_restaurant(keyword: str) -> Dict[str, Any]:
+    def _search_best_restaurant(keyword: str, context: Optional[SearchQueryContext] = None) -> Dict[str, Any]:
         """🍽️ 레스토랑 벡터 검색"""
         try:
             print(f"🍽️ 레스토랑 검색: '{keyword}'")
             
-            result = ChatRestService._improved_search(keyword, search_type="restaurant")
+            result = ChatRestService.search.best_match(keyword, "restaurant", context)
             
             if not result:
                 print(f"🔍 레스토랑 검색 결과 없음: '{keyword}'")
@@ -319,12 +97,12 @@ class ChatRestService:
             return None
     
     @staticmethod
-    def _search_best_festival(keyword: str) -> Dict[str, Any]:
+    def _search_best_festival(keyword: str, context: Optional[SearchQueryContext] = None) -> Dict[str, Any]:
         """🎭 축제 벡터 검색"""
         try:
             print(f"🎭 축제 검색: '{keyword}'")
             
-            result = ChatRestService._improved_search(keyword, search_type="festival")
+            result = ChatRestService.search.best_match(keyword, "festival", context)
             
             if not result:
                 print(f"🔍 축제 검색 결과 없음: '{keyword}'")
@@ -357,12 +135,12 @@ class ChatRestService:
             return None
     
     @staticmethod
-    def _search_best_attraction(keyword: str) -> Dict[str, Any]:
+    def _search_best_attraction(keyword: str, context: Optional[SearchQueryContext] = None) -> Dict[str, Any]:
         """📍 관광명소 벡터 검색"""
         try:
             print(f"📍 관광명소 검색: '{keyword}'")
             
-            result = ChatRestService._improved_search(keyword, search_type="attraction")
+            result = ChatRestService.search.best_match(keyword, "attraction", context)
             
             if not result:
                 print(f"🔍 관광명소 검색 결과 없음: '{keyword}'")
@@ -401,7 +179,7 @@ class ChatRestService:
     # ===== 메인 메시지 처리 함수 =====
     
     @staticmethod
-    def send_message(db: Session, user_id: int, message: str) -> Dict[str, Any]:
+    def send_message(user_id: int, message: str) -> Dict[str, Any]:
         """
         🚀 통합 메시지 처리 - Festival + Attraction + Restaurant
         """
@@ -442,20 +220,13 @@ class ChatRestService:
                     temperature=0.7
                 )
                 
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
                 
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "restaurants": [],
                     "festivals": [],
                     "attractions": [],
@@ -481,20 +252,13 @@ class ChatRestService:
                     temperature=0.7
                 )
                 
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
                 
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "restaurants": [],
                     "festivals": [],
                     "attractions": [],
@@ -513,20 +277,13 @@ class ChatRestService:
                 
                 ai_response = ChatRestService._generate_random_response(random_attractions)
                 
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
                 
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "results": random_attractions,
                     "festivals": [],
                     "attractions": random_attractions,
@@ -542,14 +299,11 @@ class ChatRestService:
                 # 🚀 2. Festival + Attraction + Restaurant 3-way 병렬 검색
                 step_start = time.time()
                 
-                with ThreadPoolExecutor(max_workers=3) as executor:
-                    festival_future = executor.submit(ChatRestService._search_best_festival, keyword)
-                    attraction_future = executor.submit(ChatRestService._search_best_attraction, keyword)
-                    restaurant_future = executor.submit(ChatRestService._search_best_restaurant, keyword)
-                    
-                    festival = festival_future.result()
-                    attraction = attraction_future.result()
-                    restaurant = restaurant_future.result()
+                context = ChatRestService.search.retrieve(keyword, ChatRestService.SEARCH_TYPES)
+                
+                festival = ChatRestService._search_best_festival(keyword, context)
+                attraction = ChatRestService._search_best_attraction(keyword, context)
+                restaurant = ChatRestService._search_best_restaurant(keyword, context)
                 
                 print(f"⏱️ 2. 3-way 병렬 검색: {time.time() - step_start:.3f}초")
                 
@@ -579,14 +333,7 @@ class ChatRestService:
                 
                 # 4. DB 저장
                 step_start = time.time()
-                conversation = Conversation(
-                    user_id=user_id,
-                    question=message,
-                    response=ai_response
-                )
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = queue_conversation(user_id, message, ai_response)
                 print(f"⏱️ 4. DB 저장: {time.time() - step_start:.3f}초")
                 
                 print(f"⏱️ 총 소요 시간: {time.time() - total_start:.3f}초\n")
@@ -599,7 +346,7 @@ class ChatRestService:
                 # 5. 응답 구성
                 return {
                     "response": ai_response,
-                    "convers_id": conversation.convers_id,
+                    "convers_id": convers_id,
                     "results": best_result,
                     "festivals": [r for r in best_result if r.get('type') == 'festival'],
                     "attractions": [r for r in best_result if r.get('type') == 'attraction'],
@@ -614,7 +361,7 @@ class ChatRestService:
             raise Exception(f"통합 채팅 처리 중 오류 발생: {str(e)}")
     
     @staticmethod
-    async def send_message_streaming(db: Session, user_id: int, message: str):
+    async def send_message_streaming(user_id: int, message: str) -> AsyncIterator[ChatEvent]:
         """
         🌊 통합 스트리밍 메시지 처리 - 제너레이터 반환
         """
@@ -634,151 +381,94 @@ class ChatRestService:
             
             # 🤔 비교 질문 처리
             if question_type == "comparison":
-                yield f"data: {json.dumps({'type': 'generating', 'message': '🤔 Comparing options...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('generating', '🤔 Comparing options...')
                 
                 # 레스토랑 비교인지 일반 비교인지 구분
                 if is_restaurant_query:
-                    prompt = RESTAURANT_COMPARISON_PROMPT.format(message=message)
+                    template = RESTAURANT_COMPARISON_PROMPT
                 else:
-                    prompt = GENERAL_COMPARISON_PROMPT.format(message=message)
+                    template = GENERAL_COMPARISON_PROMPT
                 
-                # 스트리밍 응답
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=300, temperature=0.7):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                # 스트리밍 응답 (비슷한 질문의 답이 캐시에 있으면 재생)
+                chunk_writer = ChunkWriter()
+                async for content in chunk_writer.stream(acached_gpt_stream(template, message, max_tokens=300, temperature=0.7)):
+                    yield ChatEvent.chunk(content)
+                full_response = chunk_writer.text
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'restaurants': [], 'festivals': [], 'attractions': [], 'has_restaurants': False, 'has_festivals': False, 'has_attractions': False}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'restaurants': [], 'festivals': [], 'attractions': [], 'has_restaurants': False, 'has_festivals': False, 'has_attractions': False})
                 return
             
             # 💡 일반 조언/팁 질문 처리
             elif question_type == "general_advice":
-                yield f"data: {json.dumps({'type': 'generating', 'message': '💡 Preparing helpful tips...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('generating', '💡 Preparing helpful tips...')
                 
                 # 레스토랑 조언인지 일반 조언인지 구분
                 if is_restaurant_query:
-                    prompt = RESTAURANT_ADVICE_PROMPT.format(message=message)
+                    template = RESTAURANT_ADVICE_PROMPT
                 else:
-                    prompt = GENERAL_ADVICE_PROMPT.format(message=message)
+                    template = GENERAL_ADVICE_PROMPT
                 
-                # 스트리밍 응답
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=350, temperature=0.7):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                # 스트리밍 응답 (비슷한 질문의 답이 캐시에 있으면 재생)
+                chunk_writer = ChunkWriter()
+                async for content in chunk_writer.stream(acached_gpt_stream(template, message, max_tokens=350, temperature=0.7)):
+                    yield ChatEvent.chunk(content)
+                full_response = chunk_writer.text
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'restaurants': [], 'festivals': [], 'attractions': [], 'has_restaurants': False, 'has_festivals': False, 'has_attractions': False}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'restaurants': [], 'festivals': [], 'attractions': [], 'has_restaurants': False, 'has_festivals': False, 'has_attractions': False})
                 return
             
             # 🎯 랜덤 추천 처리
             elif is_random or question_type == "random_recommendation":
-                yield f"data: {json.dumps({'type': 'random', 'message': '🎲 Finding great places...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('random', '🎲 Finding great places...')
                 
-                random_attractions = ChatRestService._get_random_attractions(count=10)
+                random_attractions = await ChatRestService._aget_random_attractions(count=10)
                 ai_response = ChatRestService._generate_random_response(random_attractions)
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=ai_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, ai_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': ai_response, 'results': random_attractions, 'attractions': random_attractions, 'convers_id': conversation.convers_id, 'has_festivals': False, 'has_attractions': True, 'has_restaurants': False}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': ai_response, 'results': random_attractions, 'attractions': random_attractions, 'convers_id': convers_id, 'has_festivals': False, 'has_attractions': True, 'has_restaurants': False})
                 return
             
             # 🚀 특정 장소 검색 (기본 동작 - 3-way 병렬 검색)
             else:
-                yield f"data: {json.dumps({'type': 'searching', 'message': '🔍 Searching for information...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('searching', '🔍 Searching for information...')
                 
-                # 3-way 병렬 검색
-                with ThreadPoolExecutor(max_workers=3) as executor:
-                    festival_future = executor.submit(ChatRestService._search_best_festival, keyword)
-                    attraction_future = executor.submit(ChatRestService._search_best_attraction, keyword)
-                    restaurant_future = executor.submit(ChatRestService._search_best_restaurant, keyword)
+                # 3-way 병렬 검색 - 컬렉션이 끝나는 대로 지금까지 유사도 가장 높은 결과를 'found'로 (마지막 것이 최종)
+                # ⚡ 추측 생성이 켜져 있으면 유사도 높은 선두 후보로 GPT 스트림을 미리 시작 (더 좋은 결과가 오면 취소)
+                speculator = Speculator(lambda best: ChatRestService._quick_stream(best, message))
+                try:
+                    result = None
+                    async for result in ChatRestService.search.aprogressive_best(keyword, ChatRestService._searchers(), early_score=settings.SEARCH_EARLY_START_SCORE):
+                        title = result.get('title') or result.get('restaurant_name')
+                        speculator.offer(result)
+                        yield ChatEvent('found', {'title': title, 'result': result})
                     
-                    festival = festival_future.result()
-                    attraction = attraction_future.result()
-                    restaurant = restaurant_future.result()
-                
-                # 결과 수집
-                results = []
-                if festival:
-                    festival['type'] = 'festival'
-                    results.append(festival)
-                if attraction:
-                    attraction['type'] = 'attraction'
-                    results.append(attraction)
-                if restaurant:
-                    restaurant['type'] = 'restaurant'
-                    results.append(restaurant)
-                
-                if not results:
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'Sorry, I couldn not find any information about that. 😅'}, ensure_ascii=False)}\n\n"
-                    return
-                
-                # 유사도 높은 것 선택
-                results.sort(key=lambda x: x['similarity_score'], reverse=True)
-                result = results[0]
-                
-                title = result.get('title') or result.get('restaurant_name')
-                yield f"data: {json.dumps({'type': 'found', 'title': title, 'result': result}, ensure_ascii=False)}\n\n"
-                
-                yield f"data: {json.dumps({'type': 'generating', 'message': '💫 Preparing response...'}, ensure_ascii=False)}\n\n"
-                
-                # 프롬프트 생성 (타입별)
-                description = result.get('description', '')[:500]
-                result_type = result.get('type', 'attraction')
-                
-                if result_type == 'festival':
-                    prompt = FESTIVAL_QUICK_PROMPT.format(
-                        title=title,
-                        start_date=result.get('start_date', ''),
-                        end_date=result.get('end_date', ''),
-                        description=description,
-                        message=message
-                    )
-                elif result_type == 'restaurant':
-                    prompt = RESTAURANT_QUICK_PROMPT.format(
-                        restaurant_name=result.get('restaurant_name', ''),
-                        place=result.get('place', ''),
-                        description=description,
-                        message=message
-                    )
-                else:  # attraction
-                    prompt = ATTRACTION_QUICK_PROMPT.format(
-                        title=title,
-                        address=result.get('address', ''),
-                        hours_of_operation=result.get('hours_of_operation', 'Operating hours not available'),
-                        description=description,
-                        message=message
-                    )
-                
-                # 스트리밍 응답
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                    if not result:
+                        yield ChatEvent.status('error', 'Sorry, I couldn not find any information about that. 😅')
+                        return
+                    
+                    yield ChatEvent.status('generating', '💫 Preparing response...')
+                    
+                    # 📝 "소개해줘" 수준 질문이면 미리 만든 소개를 바로 (GPT 호출 없음)
+                    blurb = await astored_blurb("guide", result, message, ChatRestService._build_quick_prompt)
+                    
+                    # 스트리밍 응답 (미리 시작한 스트림이 최종 결과와 같으면 이어받기)
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(areplay(blurb) if blurb else speculator.take(result)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
+                finally:
+                    speculator.close()
                 
                 # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
                 # 지도 마커 생성
                 map_markers = ChatRestService._create_map_markers([result])
@@ -787,7 +477,7 @@ class ChatRestService:
                 completion_data = {
                     'type': 'done',
                     'full_response': full_response,
-                    'convers_id': conversation.convers_id,
+                    'convers_id': convers_id,
                     'result': result,
                     'results': [result],
                     'festivals': [r for r in [result] if r.get('type') == 'festival'],
@@ -799,26 +489,20 @@ class ChatRestService:
                     'map_markers': map_markers
                 }
                 
-                yield f"data: {json.dumps(completion_data, ensure_ascii=False)}\n\n"
+                yield ChatEvent.from_dict(completion_data)
             
         except Exception as e:
             print(f"❌ Streaming 오류: {e}")
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+            yield ChatEvent('error', {'message': str(e)})
     
     # ===== 🔧 헬퍼 함수들 =====
     
     @staticmethod
     def _is_restaurant_query(message: str) -> bool:
         """메시지가 레스토랑 관련 질문인지 판단"""
-        restaurant_keywords = [
-            'restaurant', 'food', 'eat', 'dining', 'meal', 'cuisine', 'dish',
-            '레스토랑', '음식', '먹', '식당', '맛집', '요리', '음식점'
-        ]
-        
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in restaurant_keywords)
+        return has_restaurant_keyword(message)
     
     @staticmethod
     def _analyze_message_fast(message: str) -> Dict[str, Any]:
@@ -831,50 +515,21 @@ class ChatRestService:
             print(f"\n🔍 질문 분석 시작: '{message}'")
             
             # === 수량 추출 ===
-            import re
-            number_patterns = [
-                r'(\d+)곳', r'(\d+)개', r'(\d+)가지',
-                r'(\d+)\s*places?', r'(\d+)\s*spots?'
-            ]
+            extracted_count = extract_count(message_lower)
             
-            extracted_count = None
-            for pattern in number_patterns:
-                match = re.search(pattern, message_lower)
-                if match:
-                    extracted_count = int(match.group(1))
-                    print(f"   ✅ 수량 발견: {extracted_count}개")
-                    break
+            # 🚀 키워드 테이블 전체를 한 번에 스캔
+            hits = REST_PATTERNS.scan(message_lower)
             
             # === 비교 질문 감지 ===
-            comparison_patterns = [
-                ' vs ', 'vs.', ' versus ', 'which one', 'which is better', 'compare'
-            ]
-            for pattern in comparison_patterns:
-                if pattern in message_lower:
-                    return {
-                        "type": "comparison",
-                        "keyword": message,
-                        "count": extracted_count
-                    }
+            if "comparison" in hits:
+                return {
+                    "type": "comparison",
+                    "keyword": message,
+                    "count": extracted_count
+                }
             
             # === 일반 조언/팁 질문 감지 ===
-            advice_patterns = [
-                'tip', 'tips', 'advice', '팁', '조언',
-                'how to', '어떻게', '방법',
-                'what should i know', '알아야', '준비',
-                'culture', '문화', 'etiquette', '에티켓'
-            ]
-            
-            has_advice_keyword = any(kw in message_lower for kw in advice_patterns)
-            
-            place_keywords = [
-                'palace', 'temple', 'tower', 'museum', 'park',
-                '궁', '사찰', '타워', '박물관', '공원',
-                'restaurant', 'food', '레스토랑', '음식', '맛집'
-            ]
-            has_place = any(place in message_lower for place in place_keywords)
-            
-            if has_advice_keyword and not has_place:
+            if "advice" in hits and "place" not in hits:
                 return {
                     "type": "general_advice",
                     "keyword": message,
@@ -882,15 +537,7 @@ class ChatRestService:
                 }
             
             # === 추천 질문 감지 ===
-            recommendation_patterns = [
-                'recommend', 'suggestion', 'suggest', '추천',
-                'places to visit', 'where to go', '가볼',
-                'best places', 'top places', '명소'
-            ]
-            
-            has_recommendation = any(kw in message_lower for kw in recommendation_patterns)
-            
-            if has_recommendation or extracted_count:
+            if "recommendation" in hits or extracted_count:
                 return {
                     "type": "recommendation",
                     "keyword": message,
@@ -938,44 +585,31 @@ class ChatRestService:
         try:
             print(f"🎲 랜덤 관광명소 {count}개 추천 시작...")
             
-            qdrant_client = ChatRestService._get_qdrant_client()
-            
-            fetch_count = min(count * 5, 100)
-            
-            scroll_result = qdrant_client.scroll(
-                collection_name=ChatRestService.ATTRACTION_COLLECTION,
-                limit=fetch_count,
-                offset=random.randint(0, 50),
-                with_payload=True,
-                with_vectors=False
-            )
-            
-            points = scroll_result[0]
-            
-            if not points:
-                print(f"❌ 관광명소를 가져올 수 없습니다")
-                return []
-            
-            print(f"📊 가져온 관광명소: {len(points)}개")
-            
-            random.shuffle(points)
-            selected_points = points[:count]
+            # 🎲 메모리 저장소에서 균등 샘플링 (로드 전이면 기존 scroll)
+            metadatas = ChatRestService.search.sample("attraction", count)
+            if metadatas is None:
+                scroll_result = ChatRestService.search.client.scroll(**ChatRestService._random_scroll_args(count))
+                metadatas = ChatRestService._shuffle_metadata(scroll_result[0], count)
+            return ChatRestService._pick_random_attractions(metadatas)
             
-            attractions = []
-            for point in selected_points:
-                attraction_data = point.payload.get("metadata", {})
-                
-                formatted_data = {
-                    "attr_id": attraction_data.get("attr_id"),
-                    "title": attraction_data.get("title"),
-                    "type": "attraction"
-                }
-                
-                attractions.append(formatted_data)
-                print(f"  ✅ {formatted_data['title']}")
+        except Exception as e:
+            print(f"❌ 랜덤 추천 오류: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+    
+    @staticmethod
+    async def _aget_random_attractions(count: int = 10) -> List[Dict[str, Any]]:
+        """🎯 랜덤 관광명소 추천 (async 스크롤)"""
+        try:
+            print(f"🎲 랜덤 관광명소 {count}개 추천 시작...")
             
-            print(f"🎲 랜덤 추천 완료: {len(attractions)}개")
-            return attractions
+            # 🎲 메모리 저장소에서 균등 샘플링 (로드 전이면 기존 scroll)
+            metadatas = ChatRestService.search.sample("attraction", count)
+            if metadatas is None:
+                scroll_result = await ChatRestService.search.async_client.scroll(**ChatRestService._random_scroll_args(count))
+                metadatas = ChatRestService._shuffle_metadata(scroll_result[0], count)
+            return ChatRestService._pick_random_attractions(metadatas)
             
         except Exception as e:
             print(f"❌ 랜덤 추천 오류: {e}")
@@ -983,6 +617,46 @@ class ChatRestService:
             traceback.print_exc()
             return []
     
+    @staticmethod
+    def _random_scroll_args(count: int) -> Dict[str, Any]:
+        """랜덤 추천용 scroll 인자 (저장소 로드 전 fallback - 넉넉히 가져와서 섞음)"""
+        return {
+            "collection_name": ChatRestService.search.collection_name("attraction"),
+            "limit": min(count * 5, 100),
+            "offset": random.randint(0, 50),
+            "with_payload": True,
+            "with_vectors": False
+        }
+    
+    @staticmethod
+    def _shuffle_metadata(points: list, count: int) -> List[Dict[str, Any]]:
+        """스크롤 결과에서 count개 무작위 선택 → payload.metadata 목록"""
+        random.shuffle(points)
+        return [point.payload.get("metadata", {}) for point in points[:count]]
+    
+    @staticmethod
+    def _pick_random_attractions(metadatas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """샘플링한 metadata 목록 → 카드 포맷팅"""
+        if not metadatas:
+            print(f"❌ 관광명소를 가져올 수 없습니다")
+            return []
+        
+        print(f"📊 가져온 관광명소: {len(metadatas)}개")
+        
+        attractions = []
+        for attraction_data in metadatas:
+            formatted_data = {
+                "attr_id": attraction_data.get("attr_id"),
+                "title": attraction_data.get("title"),
+                "type": "attraction"
+            }
+            
+            attractions.append(formatted_data)
+            print(f"  ✅ {formatted_data['title']}")
+        
+        print(f"🎲 랜덤 추천 완료: {len(attractions)}개")
+        return attractions
+    
     @staticmethod
     def _generate_random_response(attractions: List[Dict]) -> str:
         """🎯 랜덤 추천 응답 생성"""
@@ -1048,7 +722,7 @@ class ChatRestService:
             result_type = result.get('type', 'attraction')
             
             print(f"🎤 GPT 응답 생성 (타입: {result_type})")
-            return ChatRestService._gpt_response(message, result, result_type)
+            return ChatRestService._gpt_response(message, result)
                 
         except Exception as e:
             print(f"❌ 응답 생성 오류: {e}")
@@ -1062,35 +736,48 @@ class ChatRestService:
                 return "Hello! Feel free to ask me anything! 😊"
     
     @staticmethod
-    def _gpt_response(message: str, result: Dict, result_type: str) -> str:
-        """🎤 타입별 GPT 응답"""
-        title = result.get('title', '') or result.get('restaurant_name', '')
-        description = result.get('description', '')
+    def _build_quick_prompt(result: Dict, message: str) -> str:
+        """🎤 타입별 답변 프롬프트 (스트리밍 경로 / 소개 답변 배치 작업 공용)"""
+        title = result.get('title') or result.get('restaurant_name')
+        description = result.get('description', '')[:500]
+        result_type = result.get('type', 'attraction')
         
         if result_type == 'festival':
             prompt = FESTIVAL_QUICK_PROMPT.format(
                 title=title,
                 start_date=result.get('start_date', ''),
                 end_date=result.get('end_date', ''),
-                description=description[:500],
+                description=description,
                 message=message
             )
         elif result_type == 'restaurant':
             prompt = RESTAURANT_QUICK_PROMPT.format(
                 restaurant_name=result.get('restaurant_name', ''),
                 place=result.get('place', ''),
-                description=description[:500],
+                description=description,
                 message=message
             )
         else:  # attraction
             prompt = ATTRACTION_QUICK_PROMPT.format(
                 title=title,
                 address=result.get('address', ''),
-                hours_of_operation=result.get('hours_of_operation', ''),
-                description=description[:500],
+                hours_of_operation=result.get('hours_of_operation', 'Operating hours not available'),
+                description=description,
                 message=message
             )
         
+        return prompt
+    
+    @staticmethod
+    def _quick_stream(result: Dict, message: str) -> AsyncIterator[str]:
+        """🎤 타입별 GPT 스트림 (스트리밍 경로용)"""
+        prompt = ChatRestService._build_quick_prompt(result, message)
+        return achat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6)
+    
+    @staticmethod
+    def _gpt_response(message: str, result: Dict) -> str:
+        """🎤 타입별 GPT 응답 (프롬프트는 스트리밍 경로 / 소개 답변 배치와 같은 _build_quick_prompt)"""
+        prompt = ChatRestService._build_quick_prompt(result, message)
         response_messages = [{"role": "user", "content": prompt}]
         
         return chat_with_gpt(response_messages, max_tokens=250, temperature=0.6)
@@ -1100,7 +787,7 @@ class ChatRestService:
         """대화 히스토리 조회"""
         conversations = db.query(Conversation).filter(
             Conversation.user_id == user_id
-        ).order_by(Conversation.datetime.desc()).limit(limit).all()
+        ).order_by(Conversation.datetime.desc(), Conversation.convers_id.desc()).limit(limit).all()  # 같은 배치는 datetime이 같음
         
         return [
             {
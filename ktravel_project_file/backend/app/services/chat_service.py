@@ -1,21 +1,24 @@
 # app/services/chat_service.py - 다중 검색 패턴 확장 버전
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
 from sqlalchemy.orm import Session
-import json
-import os
 import random
-import re
 import asyncio
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from qdrant_client import QdrantClient
-from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
 from app.models.conversation import Conversation  
+from app.core.config import settings
+from app.services.conversation_store import asave_conversation
 from app.models.festival import Festival
-from app.utils.openai_client import chat_with_gpt, chat_with_gpt_stream
+from app.services.search import SearchQueryContext, get_search_engine
+from app.services.speculation import Speculator
+from app.services.answer_cache import acached_gpt_stream, areplay
+from app.services.blurbs import astored_blurb
+from app.utils.openai_client import achat_with_gpt_stream, chat_with_gpt
+from app.services.chat_events import ChatEvent, final_event
+from app.utils.sse import ChunkWriter
+from app.utils.patterns import CHAT_PATTERNS, extract_count, has_restaurant_keyword
 from app.utils.prompts import (
     KPOP_FESTIVAL_QUICK_PROMPT,
     KPOP_ATTRACTION_QUICK_PROMPT,
@@ -31,309 +34,26 @@ from app.utils.prompts import (
 
 class ChatService:
     
-    # 🎯 설정값들
-    QDRANT_URL = os.getenv("QDRANT_URL", "http://172.17.0.1:6333")
-    QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+    # 🔍 검색은 공용 엔진 (클라이언트 / 임베딩 캐시 / 컬렉션 프로필 공유)
+    search = get_search_engine()
     
-    COLLECTION_NAME = "seoul-festival"
-    ATTRACTION_COLLECTION = "seoul-attraction"
-    RESTAURANT_COLLECTION = "seoul-restaurant"
-    KCONTENT_COLLECTION = "seoul-kcontents"  # 🎬 K-Content 추가
-    
-    # 🚀 캐싱된 인스턴스들
-    _embedding_model = None
-    _qdrant_client = None
-    
-    @staticmethod
-    def _get_embedding_model():
-        """임베딩 모델 싱글톤"""
-        if ChatService._embedding_model is None:
-            ChatService._embedding_model = OpenAIEmbeddings(model="text-embedding-ada-002")
-        return ChatService._embedding_model
-    
-    @staticmethod
-    def _get_qdrant_client():
-        """Qdrant 클라이언트 싱글톤"""
-        if ChatService._qdrant_client is None:
-            if ChatService.QDRANT_API_KEY:
-                ChatService._qdrant_client = QdrantClient(
-                    url=ChatService.QDRANT_URL,
-                    api_key=ChatService.QDRANT_API_KEY,
-                    timeout=60,
-                    prefer_grpc=False
-                )
-                print(f"✅ Qdrant Cloud 연결: {ChatService.QDRANT_URL}")
-            else:
-                ChatService._qdrant_client = QdrantClient(
-                    url=ChatService.QDRANT_URL,
-                    timeout=60,
-                    prefer_grpc=False
-                )
-                print(f"✅ Qdrant Local 연결: {ChatService.QDRANT_URL}")
-        return ChatService._qdrant_client
-    
-    # ===== 통합된 검색어 처리 함수들 =====
-    
-    @staticmethod
-    def _process_search_query(query: str, search_type: str = "attraction") -> str:
-        """통합 검색어 처리 (전처리 + 정규화) - K-Content 포함"""
-        
-        # 1. 불용어 제거 (더 제한적으로)
-        stopwords = {"a", "an", "the", "me", "to", "introduce"}  # 🔧 줄임
-        words = [w for w in query.lower().split() if w not in stopwords]
-        cleaned_query = " ".join(words) if words else query
-        
-        # 2. 검색어 정규화 (타입별 보정 규칙)
-        if search_type == "kcontent":
-            # K-Drama/K-Content 특화 보정
-            corrections = {
-                "crash landing on you": "사랑의 불시착",
-                "itaewon class": "이태원 클라쓰",
-                "kingdom": "킹덤",
-                "goblin": "도깨비",
-                "descendants of the sun": "태양의 후예",
-                "my love from the star": "별에서 온 그대",
-                "mom's friend's son": "엄마친구아들",
-                "filming location": "촬영지",
-                "drama location": "드라마 촬영지",
-                "kdrama": "한국 드라마",
-                "k-drama": "한국 드라마",
-                "divorce insurance": "이혼보험",  # 🆕 추가
-            }
-        else:
-            # 일반 관광지/레스토랑 보정
-            corrections = {
-                "namsan tower": "namsan seoul tower",
-                "n tower": "namsan seoul tower", 
-                "seoul tower": "namsan seoul tower",
-                "63 building": "63빌딩",
-                "lotte tower": "lotte world tower",
-                "dongdaemun": "dongdaemun design plaza",
-                "myeongdong": "myeongdong shopping street",
-                "gangnam": "gangnam district",
-                "hongdae": "hongik university area",
-                "bukchon": "bukchon hanok village",
-                "insadong": "insadong cultural street",
-                "itaewon": "itaewon global village",
-                "korean bbq": "korean barbecue",
-                "korean food": "korean restaurant",
-                "chinese food": "chinese restaurant",
-                "japanese food": "japanese restaurant",
-                "hongdae food": "hongik university restaurant",
-                "gangnam food": "gangnam district restaurant",
-                "myeongdong food": "myeongdong restaurant",
-            }
-        
-        query_lower = cleaned_query.lower()
-        for wrong, correct in corrections.items():
-            if wrong in query_lower:
-                cleaned_query = cleaned_query.replace(wrong, correct)
-                print(f"🔧 검색어 보정: '{wrong}' → '{correct}'")
-        
-        return cleaned_query
-    
-    @staticmethod
-    def _expand_search_terms(query: str, search_type: str = "attraction") -> List[str]:
-        """검색어 확장 (타입별 변형)"""
-        variants = [query]
-        query_lower = query.lower()
-        
-        if search_type == "kcontent":
-            # K-Content 전용 확장
-            if "filming" in query_lower or "location" in query_lower:
-                variants.append(query.replace("filming location", "촬영지"))
-                variants.append(query.replace("location", "장소"))
-            if "drama" in query_lower:
-                variants.append(query.replace("drama", "드라마"))
-        else:
-            # 일반 관광지/레스토랑 확장
-            if "seoul" not in query_lower and len(query.split()) <= 2:
-                variants.extend([f"{query} seoul", f"seoul {query}"])
-            
-            translations = {
-                "tower": "타워", "palace": "궁", "temple": "사", 
-                "market": "시장", "park": "공원", "restaurant": "맛집", "food": "음식"
-            }
-            
-            for english, korean in translations.items():
-                if english in query_lower:
-                    variants.append(query.replace(english, korean).replace(english.title(), korean))
-        
-        return list(set(variants))
-    
-    @staticmethod
-    def _calculate_keyword_overlap(query: str, title: str) -> float:
-        """키워드 겹치는 정도 계산"""
-        query_words = set(query.lower().split())
-        title_words = set(title.lower().split())
-        
-        overlap = len(query_words & title_words)
-        total = len(query_words | title_words)
-        
-        return overlap / total if total > 0 else 0
-    
-    @staticmethod
-    def _improved_search(query: str, search_type: str = "attraction") -> Optional[Dict]:
-        """개선된 통합 검색 로직 (K-Content 포함)"""
-        try:
-            print(f"🔍 개선된 검색 시작: '{query}' (타입: {search_type})")
-            
-            # 1. 쿼리 처리 (타입별)
-            cleaned_query = ChatService._process_search_query(query, search_type)
-            
-            # 2. 검색어 확장 (타입별)
-            search_variants = ChatService._expand_search_terms(cleaned_query, search_type)
-            print(f"🔧 검색 변형들: {search_variants}")
-            
-            # 3. 모든 변형으로 검색
-            best_result = None
-            best_score = 0
-            
-            qdrant_client = ChatService._get_qdrant_client()
-            embedding_model = ChatService._get_embedding_model()
-            
-            # 컬렉션 선택
-            collections = {
-                "restaurant": ChatService.RESTAURANT_COLLECTION,
-                "attraction": ChatService.ATTRACTION_COLLECTION,
-                "festival": ChatService.COLLECTION_NAME,
-                "kcontent": ChatService.KCONTENT_COLLECTION  # 🎬 K-Content 추가
-            }
-            collection_name = collections.get(search_type, ChatService.COLLECTION_NAME)
-            
-            for variant in search_variants:
-                try:
-                    query_embedding = embedding_model.embed_query(variant)
-                    
-                    search_results = qdrant_client.search(
-                        collection_name=collection_name,
-                        query_vector=query_embedding,
-                        limit=5,
-                        score_threshold=0.3,
-                        with_payload=True,
-                        with_vectors=False
-                    )
-                    
-                    for result in search_results:
-                        vector_score = result.score
-                        
-                        # 타입별 제목 추출 (K-Content 필드명 매핑)
-                        if search_type == "restaurant":
-                            title = result.payload.get("metadata", {}).get("name", "")
-                        elif search_type == "kcontent":
-                            metadata = result.payload.get("metadata", {})
-                            drama_name = metadata.get("drama_name_ko", "")  # 🔄 변경
-                            location_name = metadata.get("location_name_en", "")  # 🔄 변경
-                            title = f"{drama_name} {location_name}"
-                        else:
-                            title = result.payload.get("metadata", {}).get("title", "")
-                            
-                        keyword_score = ChatService._calculate_keyword_overlap(cleaned_query, title)
-                        combined_score = vector_score * 0.8 + keyword_score * 0.2
-                        
-                        if combined_score > best_score:
-                            best_score = combined_score
-                            best_result = result
-                            print(f"✅ 더 좋은 결과: '{variant}' → 점수: {combined_score:.3f}")
-                
-                except Exception as e:
-                    print(f"⚠️ 변형 '{variant}' 검색 실패: {e}")
-                    continue
-            
-            # 결과 반환 (K-Content는 임계값 0.4, 나머지는 0.5)
-            threshold = 0.4 if search_type == "kcontent" else 0.5
-            if best_result and best_score > threshold:
-                return best_result
-            else:
-                print(f"❌ 유효한 결과 없음 (최고 점수: {best_score:.3f})")
-                return None
-                
-        except Exception as e:
-            print(f"❌ 개선된 검색 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-
     # ===== 🆕 다중 K-Content 검색 함수 =====
     
     @staticmethod
-    def _search_multiple_kcontent(keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
+    def _search_multiple_kcontent(keyword: str, limit: int = 20, context: Optional[SearchQueryContext] = None) -> List[Dict[str, Any]]:
         """🆕 K-Content 다중 검색 - 카드 형태 출력용"""
         try:
             print(f"🔍 다중 K-Content 검색 시작: '{keyword}' (최대 {limit}개)")
             
-            # 1. 쿼리 처리
-            cleaned_query = ChatService._process_search_query(keyword, "kcontent")
-            search_variants = ChatService._expand_search_terms(cleaned_query, "kcontent")
-            print(f"🔧 검색 변형들: {search_variants}")
-            
-            # 2. 모든 매칭 결과 수집
+            # 변형별 검색 결과 → 중복 제거 + 다중 임계값 + 점수순 (async 경로에서 받은 context 재사용)
             all_results = []
-            seen_content_ids = set()  # 중복 제거용
-            
-            qdrant_client = ChatService._get_qdrant_client()
-            embedding_model = ChatService._get_embedding_model()
-            
-            for variant in search_variants:
-                try:
-                    query_embedding = embedding_model.embed_query(variant)
-                    
-                    search_results = qdrant_client.search(
-                        collection_name=ChatService.KCONTENT_COLLECTION,
-                        query_vector=query_embedding,
-                        limit=30,  # 더 많이 가져와서 선별
-                        score_threshold=0.3,
-                        with_payload=True,
-                        with_vectors=False
-                    )
-                    
-                    for result in search_results:
-                        metadata = result.payload.get("metadata", {})
-                        content_id = metadata.get("content_id", "")
-                        
-                        # 중복 제거
-                        if content_id in seen_content_ids:
-                            continue
-                        seen_content_ids.add(content_id)
-                        
-                        # 드라마명 매칭 체크
-                        drama_name_ko = metadata.get("drama_name_ko", "")
-                        drama_name_en = metadata.get("drama_name_en", "")
-                        location_name = metadata.get("location_name_en", "")
-                        title = f"{drama_name_ko} {location_name}"
-                        
-                        vector_score = result.score
-                        keyword_score = ChatService._calculate_keyword_overlap(cleaned_query, title)
-                        combined_score = vector_score * 0.8 + keyword_score * 0.2
-                        
-                        # 임계값 통과한 결과만 포함
-                        if combined_score > 0.35:  # 다중 검색은 조금 낮은 임계값
-                            # 🎨 카드 형태 데이터 생성
-                            card_data = {
-                                "content_id": content_id,
-                                "location_name": location_name,
-                                "category": metadata.get("category_en", ""),
-                                "thumbnail": metadata.get("thumbnail", ""),
-                                "drama_name": drama_name_ko,
-                                "drama_name_en": drama_name_en,
-                                "latitude": float(metadata.get("latitude", 0)),
-                                "longitude": float(metadata.get("longitude", 0)),
-                                "similarity_score": combined_score,
-                                "type": "kcontent"
-                            }
-                            all_results.append(card_data)
-                            print(f"✅ 추가: {location_name} ({drama_name_ko}) - 점수: {combined_score:.3f}")
-                
-                except Exception as e:
-                    print(f"⚠️ 변형 '{variant}' 검색 실패: {e}")
-                    continue
+            for combined_score, result in ChatService.search.matches(keyword, "kcontent", context, limit=limit):
+                card_data = ChatService._kcontent_card(result.payload.get("metadata", {}), combined_score)
+                all_results.append(card_data)
+                print(f"✅ 추가: {card_data['location_name']} ({card_data['drama_name']}) - 점수: {combined_score:.3f}")
             
-            # 점수순 정렬 후 상위 limit개 반환
-            all_results.sort(key=lambda x: x['similarity_score'], reverse=True)
-            final_results = all_results[:limit]
-            
-            print(f"🎯 최종 {len(final_results)}개 장소 선별 완료")
-            return final_results
+            print(f"🎯 최종 {len(all_results)}개 장소 선별 완료")
+            return all_results
                 
         except Exception as e:
             print(f"❌ 다중 K-Content 검색 오류: {e}")
@@ -341,6 +61,114 @@ class ChatService:
             traceback.print_exc()
             return []
     
+    @staticmethod
+    def _kcontent_card(metadata: Dict[str, Any], score: float) -> Dict[str, Any]:
+        """🎨 K-Content 카드 형태 데이터 (payload.metadata 기준)"""
+        return {
+            "content_id": metadata.get("content_id", ""),
+            "location_name": metadata.get("location_name_en", ""),
+            "category": metadata.get("category_en", ""),
+            "thumbnail": metadata.get("thumbnail", ""),
+            "drama_name": metadata.get("drama_name_ko", ""),
+            "drama_name_en": metadata.get("drama_name_en", ""),
+            "latitude": float(metadata.get("latitude") or 0),
+            "longitude": float(metadata.get("longitude") or 0),
+            "similarity_score": score,
+            "type": "kcontent"
+        }
+    
+    @staticmethod
+    def _location_cards_and_markers(locations: List[Dict[str, Any]]):
+        """다중 촬영지 → (프론트 카드 목록, 지도 마커 목록)"""
+        location_cards = []
+        map_markers = []
+        for location in locations:
+            location_cards.append({
+                "content_id": location.get('content_id'),
+                "location_name": location.get('location_name'),      # 📍 장소명
+                "category": location.get('category'),                # 🏷️ 카테고리
+                "thumbnail": location.get('thumbnail'),              # 🖼️ 썸네일
+                "drama_name": location.get('drama_name'),
+                "clickable": True                                    # 클릭 가능 표시
+            })
+            if location.get('latitude') and location.get('longitude'):
+                map_markers.append({
+                    "id": location.get('content_id'),
+                    "latitude": location.get('latitude'),
+                    "longitude": location.get('longitude'),
+                    "title": location.get('location_name'),
+                    "category": location.get('category'),
+                    "type": "kcontent"
+                })
+        return location_cards, map_markers
+    
+    @staticmethod
+    async def _stream_multiple_kcontent(user_id: int, message: str, keyword: str, analysis: Dict[str, Any]) -> AsyncIterator[ChatEvent]:
+        """
+        🎬 드라마 촬영지 목록 (multiple_kcontent_search)
+        
+        드라마를 알아내면 payload 필터 scroll 한 번으로 전부 가져오고(벡터 검색 없음)
+        페이지가 도착할 때마다 'location_cards' 이벤트로 카드를 먼저 보낸다.
+        드라마를 모르면 기존 벡터 검색(30개 × 변형)으로.
+        """
+        yield ChatEvent.status('searching', '🔍 Finding all filming locations from this drama...')
+        
+        multiple_kcontents = []
+        drama = ChatService.search.resolve_drama(keyword)
+        if drama:
+            print(f"🎬 드라마 확인: {drama[0]} / {drama[1]}")
+            limit = analysis.get('requested_count') or settings.KCONTENT_DRAMA_MAX_LOCATIONS
+            seen = set()
+            try:
+                async for points in ChatService.search.ascroll_drama(drama, limit=limit, page_size=settings.KCONTENT_DRAMA_PAGE_SIZE):
+                    page = []
+                    for point in points:
+                        card_data = ChatService._kcontent_card((point.payload or {}).get("metadata", {}), 1.0)
+                        if card_data["content_id"] in seen:
+                            continue
+                        seen.add(card_data["content_id"])
+                        page.append(card_data)
+                    if not page:
+                        continue
+                    multiple_kcontents.extend(page)
+                    location_cards, map_markers = ChatService._location_cards_and_markers(page)
+                    yield ChatEvent('location_cards', {
+                        'location_cards': location_cards,
+                        'map_markers': map_markers,
+                        'drama_name': drama[0]
+                    })
+            except Exception as e:
+                print(f"⚠️ 드라마 필터 scroll 실패: {e}")
+        
+        if not multiple_kcontents:
+            count = analysis.get('count', 20)
+            context = await ChatService.search.aretrieve(keyword, ["kcontent"], limit=30, exact=False)  # 더 많이 가져와서 선별 (카드 목록)
+            multiple_kcontents = ChatService._search_multiple_kcontent(keyword, count, context)
+        
+        if not multiple_kcontents:
+            yield ChatEvent.status('error', 'Sorry, I could not find locations for this drama. 😅')
+            return
+        
+        # AI 응답 생성
+        ai_response = f"🎬 Amazing! I found {len(multiple_kcontents)} filming locations from this drama! Each place has its own special story. Tap any location card below for detailed information! 💕✨"
+        
+        # 대화 저장
+        convers_id = await asave_conversation(user_id, message, ai_response)
+        
+        location_cards, map_markers = ChatService._location_cards_and_markers(multiple_kcontents)
+        
+        # 🎯 최종 응답 (스트리밍한 카드까지 전부 포함)
+        yield ChatEvent.from_dict({
+            'type': 'multiple_locations',               # 🆕 새로운 응답 타입
+            'full_response': ai_response,
+            'convers_id': convers_id,
+            'location_cards': location_cards,           # 🎨 카드 데이터 배열
+            'total_count': len(multiple_kcontents),
+            'drama_name': multiple_kcontents[0].get('drama_name') if multiple_kcontents else '',
+            'has_kcontents': True,
+            'map_markers': map_markers
+        })
+    
     # ===== 검색 결과 포맷팅 (타입별) =====
     
     @staticmethod
@@ -422,27 +250,27 @@ class ChatService:
     # ===== 타입별 검색 함수들 =====
     
     @staticmethod
-    def _search_best_restaurant(keyword: str) -> Optional[Dict[str, Any]]:
+    def _search_best_restaurant(keyword: str, context: Optional[SearchQueryContext] = None) -> Optional[Dict[str, Any]]:
         """레스토랑 검색"""
-        result = ChatService._improved_search(keyword, "restaurant")
+        result = ChatService.search.best_match(keyword, "restaurant", context)
         return ChatService._format_search_result(result, "restaurant")
     
     @staticmethod
-    def _search_best_festival(keyword: str) -> Optional[Dict[str, Any]]:
+    def _search_best_festival(keyword: str, context: Optional[SearchQueryContext] = None) -> Optional[Dict[str, Any]]:
         """축제 검색"""
-        result = ChatService._improved_search(keyword, "festival")
+        result = ChatService.search.best_match(keyword, "festival", context)
         return ChatService._format_search_result(result, "festival")
     
     @staticmethod
-    def _search_best_attraction(keyword: str) -> Optional[Dict[str, Any]]:
+    def _search_best_attraction(keyword: str, context: Optional[SearchQueryContext] = None) -> Optional[Dict[str, Any]]:
         """관광명소 검색"""
-        result = ChatService._improved_search(keyword, "attraction")
+        result = ChatService.search.best_match(keyword, "attraction", context)
         return ChatService._format_search_result(result, "attraction")
     
     @staticmethod
-    def _search_best_kcontent(keyword: str) -> Optional[Dict[str, Any]]:
+    def _search_best_kcontent(keyword: str, context: Optional[SearchQueryContext] = None) -> Optional[Dict[str, Any]]:
         """🎬 K-Content 검색"""
-        result = ChatService._improved_search(keyword, "kcontent")
+        result = ChatService.search.best_match(keyword, "kcontent", context)
         return ChatService._format_search_result(result, "kcontent")
     
     # ===== 메시지 분석 =====
@@ -454,68 +282,28 @@ class ChatService:
         print(f"\n🔍 질문 분석 시작: '{message}' (K-Content모드: {is_kcontent_mode})")
         
         # 수량 추출
-        number_patterns = [r'(\d+)곳', r'(\d+)개', r'(\d+)가지', r'(\d+)\s*places?', r'(\d+)\s*spots?', r'(\d+)\s*locations?']
-        extracted_count = None
-        for pattern in number_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                extracted_count = int(match.group(1))
-                print(f"   ✅ 수량 발견: {extracted_count}개")
-                break
-        
-        # 🆕 더 넓은 다중 검색 패턴 감지
-        multiple_patterns = [
-            'places that appeared', 'locations that appeared', 'places from',
-            'all places', 'all locations', 'filming locations',
-            'places in', 'locations in', 'where', 'appeared',
-            'show me', 'tell me where', 'what are the places',
-            'places of', 'locations of', 'spots from', 'spots in',
-            '모든 장소', '전체 촬영지', '나온 장소', '등장한 장소', '촬영 장소들',
-            'drama', 'divorce insurance', 'places'  # 🔧 더 추가
-        ]
-        
-        has_multiple_intent = any(pattern in message_lower for pattern in multiple_patterns)
-        
-        # 🔧 드라마 관련 키워드 체크
-        drama_keywords = ['drama', 'divorce insurance', "mom's friend's son", 'appeared', 'filming', 'locations', 'places']
-        has_drama = any(kw in message_lower for kw in drama_keywords)
-        
+        extracted_count = extract_count(message_lower)
+
+        # 🚀 키워드 테이블 전체를 한 번에 스캔
+        hits = CHAT_PATTERNS.scan(message_lower)
+
         # 🎯 K-Content 모드이거나 드라마 관련이면 다중 검색 허용
-        if has_multiple_intent and (is_kcontent_mode or has_drama):
+        if "multiple" in hits and (is_kcontent_mode or "drama_context" in hits):
             keyword = ChatService._extract_keyword_simple(message)
             print(f"🎬 다중 검색 트리거! 키워드: '{keyword}'")
-            return {"type": "multiple_kcontent_search", "keyword": keyword, "count": extracted_count or 20}
-        
+            return {"type": "multiple_kcontent_search", "keyword": keyword, "count": extracted_count or 20, "requested_count": extracted_count}
+
         # 비교 질문 감지
-        comparison_patterns = [' vs ', 'vs.', ' versus ', 'which one', 'which is better', 'compare']
-        if any(p in message_lower for p in comparison_patterns):
+        if "comparison" in hits:
             return {"type": "comparison", "keyword": message, "count": extracted_count}
-        
-        # 조언/팁 질문 감지
-        advice_patterns = ['tip', 'tips', 'advice', '팁', '조언', 'how to', '어떻게', '방법', 'what should i know', '알아야', '준비', 'etiquette', '에티켓']
-        
-        if is_kcontent_mode:
-            # K-Content 모드: 드라마 관련 키워드 체크
-            drama_keywords = ['drama', 'filming', 'location', 'scene', '드라마', '촬영지', '장면', '장소']
-            has_drama = any(kw in message_lower for kw in drama_keywords)
-            has_advice = any(kw in message_lower for kw in advice_patterns)
-            
-            if has_advice and not has_drama:
-                return {"type": "general_advice", "keyword": message, "count": extracted_count}
-        else:
-            # 일반 모드: 장소 관련 키워드 체크
-            place_keywords = ['palace', 'temple', 'tower', 'museum', 'park', '궁', '사찰', '타워', '박물관', '공원', 'gangnam', 'hongdae', 'myeongdong', 'itaewon', 'culture', '문화', 'transportation', '교통', 'weather', '날씨']
-            has_advice = any(kw in message_lower for kw in advice_patterns)
-            has_place = any(place in message_lower for place in place_keywords)
-            
-            if has_advice and not has_place:
-                return {"type": "general_advice", "keyword": message, "count": extracted_count}
-        
+
+        # 조언/팁 질문 감지 (K-Content 모드: 드라마 얘기가 아니면 / 일반 모드: 장소 얘기가 아니면)
+        off_topic = "drama_scene" if is_kcontent_mode else "place"
+        if "advice" in hits and off_topic not in hits:
+            return {"type": "general_advice", "keyword": message, "count": extracted_count}
+
         # 추천 질문 감지
-        recommendation_patterns = ['recommend', 'suggestion', 'suggest', '추천', 'places to visit', 'where to go', '가볼', 'best places', 'top places', '명소', 'best', 'top', 'popular', '인기']
-        has_recommendation = any(kw in message_lower for kw in recommendation_patterns)
-        
-        if has_recommendation or extracted_count:
+        if "recommendation" in hits or extracted_count:
             return {"type": "recommendation", "keyword": message, "count": extracted_count or 10}
         
         # 기본 검색
@@ -539,8 +327,7 @@ class ChatService:
     @staticmethod
     def _is_restaurant_query(message: str) -> bool:
         """레스토랑 관련 질문 판단"""
-        restaurant_keywords = ['restaurant', 'food', 'eat', 'dining', 'meal', 'cuisine', 'dish', '레스토랑', '음식', '먹', '식당', '맛집', '요리', '음식점']
-        return any(keyword in message.lower() for keyword in restaurant_keywords)
+        return has_restaurant_keyword(message)
     
     # ===== 지도 마커 =====
     
@@ -609,37 +396,37 @@ class ChatService:
     # ===== 랜덤 추천 =====
     
     @staticmethod
-    def _get_random_attractions(count: int = 10) -> List[Dict[str, Any]]:
+    async def _scroll_random_metadata(search_type: str, count: int) -> List[Dict[str, Any]]:
+        """저장소 로드 전 fallback - 임의 offset부터 넉넉히 scroll 해서 섞음"""
+        scroll_result = await ChatService.search.async_client.scroll(
+            collection_name=ChatService.search.collection_name(search_type),
+            limit=min(count * 5, 100),
+            offset=random.randint(0, 50),
+            with_payload=True,
+            with_vectors=False
+        )
+        points = scroll_result[0]
+        random.shuffle(points)
+        return [point.payload.get("metadata", {}) for point in points[:count]]
+    
+    @staticmethod
+    async def _get_random_attractions(count: int = 10) -> List[Dict[str, Any]]:
         """랜덤 관광명소 추천"""
         try:
             print(f"🎲 랜덤 관광명소 {count}개 추천 시작...")
             
-            qdrant_client = ChatService._get_qdrant_client()
-            fetch_count = min(count * 5, 100)
-            
-            scroll_result = qdrant_client.scroll(
-                collection_name=ChatService.ATTRACTION_COLLECTION,
-                limit=fetch_count,
-                offset=random.randint(0, 50),
-                with_payload=True,
-                with_vectors=False
-            )
-            
-            points = scroll_result[0]
-            if not points:
-                return []
-            
-            random.shuffle(points)
-            selected_points = points[:count]
+            # 🎲 메모리 저장소에서 균등 샘플링 (로드 전이면 기존 scroll)
+            metadatas = ChatService.search.sample("attraction", count)
+            if metadatas is None:
+                metadatas = await ChatService._scroll_random_metadata("attraction", count)
             
             attractions = []
-            for point in selected_points:
-                attraction_data = point.payload.get("metadata", {})
+            for attraction_data in metadatas:
                 formatted_data = {
                     "attr_id": attraction_data.get("attr_id"),
                     "title": attraction_data.get("title"),
-                    "latitude": float(attraction_data.get("latitude", 0)),
-                    "longitude": float(attraction_data.get("longitude", 0)),
+                    "latitude": float(attraction_data.get("latitude") or 0),
+                    "longitude": float(attraction_data.get("longitude") or 0),
                     "type": "attraction"
                 }
                 attractions.append(formatted_data)
@@ -651,39 +438,25 @@ class ChatService:
             return []
     
     @staticmethod
-    def _get_random_kcontents(count: int = 10) -> List[Dict[str, Any]]:
+    async def _get_random_kcontents(count: int = 10) -> List[Dict[str, Any]]:
         """🎬 랜덤 K-Content 추천"""
         try:
             print(f"🎲 랜덤 K-Content {count}개 추천 시작...")
             
-            qdrant_client = ChatService._get_qdrant_client()
-            fetch_count = min(count * 5, 100)
-            
-            scroll_result = qdrant_client.scroll(
-                collection_name=ChatService.KCONTENT_COLLECTION,
-                limit=fetch_count,
-                offset=random.randint(0, 50),
-                with_payload=True,
-                with_vectors=False
-            )
-            
-            points = scroll_result[0]
-            if not points:
-                return []
-            
-            random.shuffle(points)
-            selected_points = points[:count]
+            # 🎲 메모리 저장소에서 균등 샘플링 (로드 전이면 기존 scroll)
+            metadatas = ChatService.search.sample("kcontent", count)
+            if metadatas is None:
+                metadatas = await ChatService._scroll_random_metadata("kcontent", count)
             
             kcontents = []
-            for point in selected_points:
-                kcontent_metadata = point.payload.get("metadata", {})
+            for kcontent_metadata in metadatas:
                 formatted_data = {
                     "content_id": kcontent_metadata.get("content_id"),
                     "drama_name": kcontent_metadata.get("drama_name_ko"),  # 🔄 변경
                     "location_name": kcontent_metadata.get("location_name_en"),  # 🔄 변경
                     "thumbnail": kcontent_metadata.get("thumbnail", ""),
-                    "latitude": float(kcontent_metadata.get("latitude", 0)),
-                    "longitude": float(kcontent_metadata.get("longitude", 0)),
+                    "latitude": float(kcontent_metadata.get("latitude") or 0),
+                    "longitude": float(kcontent_metadata.get("longitude") or 0),
                     "type": "kcontent"
                 }
                 kcontents.append(formatted_data)
@@ -706,11 +479,57 @@ class ChatService:
             return f"🎬 OMG! Here are {len(items)} amazing K-Drama filming locations in Seoul! Each spot is iconic and perfect for K-Drama fans! Ask me about any specific location for more details! 💕✨"
         return f"Yo! Hunters! 🔥💫 엄선한 {len(items)}개의 전설적인 장소들이야! 각 장소마다 특별한 빛의 에너지가 있으니까 직접 체크해봐! 궁금한 곳 있으면 말해줘! Let's explore! 🌙✨"
     
+    # ===== 장소 답변 프롬프트 =====
+    
+    @staticmethod
+    def _build_quick_prompt(result: Dict[str, Any], message: str) -> str:
+        """검색 결과 1개 → 타입별 답변 프롬프트"""
+        result_type = result.get('type', 'attraction')
+        
+        if result_type == 'festival':
+            return KPOP_FESTIVAL_QUICK_PROMPT.format(
+                title=result.get('title', ''),
+                start_date=result.get('start_date', ''),
+                end_date=result.get('end_date', ''),
+                description=result.get('description', '')[:500],
+                message=message
+            )
+        elif result_type == 'restaurant':
+            return RESTAURANT_QUICK_PROMPT.format(
+                restaurant_name=result.get('restaurant_name', ''),
+                location=result.get('place', ''),
+                description=result.get('description', ''),
+                message=message
+            )
+        elif result_type == 'kcontent':  # ✅ 추가
+            return KCONTENT_QUICK_PROMPT.format(
+                drama_name=result.get('drama_name', ''),
+                location_name=result.get('location_name', ''),
+                address=result.get('address', ''),
+                trip_tip=result.get('trip_tip', '')[:500],
+                keyword=result.get('keyword', ''),
+                message=message
+            )
+        else:  # attraction
+            return KPOP_ATTRACTION_QUICK_PROMPT.format(
+                title=result.get('title', ''),
+                address=result.get('address', ''),
+                hours_of_operation=result.get('hours_of_operation', '운영시간 정보 없음'),
+                description=result.get('description', '')[:500],
+                message=message
+            )
+    
+    @staticmethod
+    def _quick_stream(result: Dict[str, Any], message: str) -> AsyncIterator[str]:
+        """검색 결과 1개 → 답변 GPT 스트림"""
+        prompt = ChatService._build_quick_prompt(result, message)
+        return achat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6)
+    
     # ===== 메인 API 함수 (스트리밍 전용) =====
     
     @staticmethod
-    async def send_message_streaming(db: Session, user_id: int, message: str, is_kcontent_mode: bool = False):
-        """스트리밍 메시지 처리 (다중 검색 기능 추가)"""
+    async def send_message_streaming(user_id: int, message: str, is_kcontent_mode: bool = False) -> AsyncIterator[ChatEvent]:
+        """스트리밍 메시지 처리 (다중 검색 기능 추가) - ChatEvent를 yield"""
         try:
             # 분석
             analysis = ChatService._analyze_message_fast(message, is_kcontent_mode)
@@ -724,164 +543,86 @@ class ChatService:
             if is_kcontent_mode:
                 # 🆕 다중 검색 처리
                 if question_type == "multiple_kcontent_search":
-                    yield f"data: {json.dumps({'type': 'searching', 'message': '🔍 Finding all filming locations from this drama...'}, ensure_ascii=False)}\n\n"
-                    
-                    count = analysis.get('count', 20)
-                    multiple_kcontents = ChatService._search_multiple_kcontent(keyword, count)
-                    
-                    if not multiple_kcontents:
-                        yield f"data: {json.dumps({'type': 'error', 'message': 'Sorry, I could not find locations for this drama. 😅'}, ensure_ascii=False)}\n\n"
-                        return
-                    
-                    # AI 응답 생성
-                    ai_response = f"🎬 Amazing! I found {len(multiple_kcontents)} filming locations from this drama! Each place has its own special story. Tap any location card below for detailed information! 💕✨"
-                    
-                    # 대화 저장
-                    conversation = Conversation(user_id=user_id, question=message, response=ai_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
-                    
-                    # 🎨 카드 형태 데이터 준비
-                    location_cards = []
-                    for location in multiple_kcontents:
-                        card = {
-                            "content_id": location.get('content_id'),
-                            "location_name": location.get('location_name'),      # 📍 장소명
-                            "category": location.get('category'),                # 🏷️ 카테고리  
-                            "thumbnail": location.get('thumbnail'),              # 🖼️ 썸네일
-                            "drama_name": location.get('drama_name'),
-                            "clickable": True                                    # 클릭 가능 표시
-                        }
-                        location_cards.append(card)
-                    
-                    # 지도 마커 생성
-                    map_markers = []
-                    for location in multiple_kcontents:
-                        if location.get('latitude') and location.get('longitude'):
-                            marker = {
-                                "id": location.get('content_id'),
-                                "latitude": location.get('latitude'),
-                                "longitude": location.get('longitude'),
-                                "title": location.get('location_name'),
-                                "category": location.get('category'),
-                                "type": "kcontent"
-                            }
-                            map_markers.append(marker)
-                    
-                    # 🎯 최종 응답
-                    completion_data = {
-                        'type': 'multiple_locations',               # 🆕 새로운 응답 타입
-                        'full_response': ai_response,
-                        'convers_id': conversation.convers_id,
-                        'location_cards': location_cards,           # 🎨 카드 데이터 배열
-                        'total_count': len(multiple_kcontents),
-                        'drama_name': multiple_kcontents[0].get('drama_name') if multiple_kcontents else '',
-                        'has_kcontents': True,
-                        'map_markers': map_markers
-                    }
-                    
-                    yield f"data: {json.dumps(completion_data, ensure_ascii=False)}\n\n"
+                    async for event in ChatService._stream_multiple_kcontent(user_id, message, keyword, analysis):
+                        yield event
                     return
                 
                 # 비교 질문
                 elif question_type == "comparison":
-                    yield f"data: {json.dumps({'type': 'generating', 'message': '🤔 Comparing K-Drama locations...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('generating', '🤔 Comparing K-Drama locations...')
                     
-                    prompt = KCONTENT_COMPARISON_PROMPT.format(message=message)
-                    full_response = ""
-                    for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=300, temperature=0.7):
-                        full_response += chunk
-                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                        await asyncio.sleep(0.02)
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(acached_gpt_stream(KCONTENT_COMPARISON_PROMPT, message, max_tokens=300, temperature=0.7)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
                     
-                    conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
+                    convers_id = await asave_conversation(user_id, message, full_response)
                     
-                    yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'kcontents': [], 'has_kcontents': False}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'kcontents': [], 'has_kcontents': False})
                     return
                 
                 # 조언 질문
                 elif question_type == "general_advice":
-                    yield f"data: {json.dumps({'type': 'generating', 'message': '💡 Preparing K-Drama tips...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('generating', '💡 Preparing K-Drama tips...')
                     
-                    prompt = KCONTENT_ADVICE_PROMPT.format(message=message)
-                    full_response = ""
-                    for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=350, temperature=0.7):
-                        full_response += chunk
-                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                        await asyncio.sleep(0.02)
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(acached_gpt_stream(KCONTENT_ADVICE_PROMPT, message, max_tokens=350, temperature=0.7)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
                     
-                    conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
+                    convers_id = await asave_conversation(user_id, message, full_response)
                     
-                    yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'kcontents': [], 'has_kcontents': False}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'kcontents': [], 'has_kcontents': False})
                     return
                 
                 # 랜덤 추천
                 elif question_type == "recommendation":
-                    yield f"data: {json.dumps({'type': 'random', 'message': '🎲 Finding amazing K-Drama locations...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('random', '🎲 Finding amazing K-Drama locations...')
                     
                     count = analysis.get('count', 10)
-                    random_kcontents = ChatService._get_random_kcontents(count)
+                    random_kcontents = await ChatService._get_random_kcontents(count)
                     ai_response = ChatService._generate_random_response(random_kcontents, True)
                     
-                    conversation = Conversation(user_id=user_id, question=message, response=ai_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
+                    convers_id = await asave_conversation(user_id, message, ai_response)
                     
                     map_markers = ChatService._create_markers(random_kcontents)
                     
-                    yield f"data: {json.dumps({'type': 'done', 'full_response': ai_response, 'results': random_kcontents, 'kcontents': random_kcontents, 'convers_id': conversation.convers_id, 'has_kcontents': True, 'map_markers': map_markers}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent('done', {'full_response': ai_response, 'results': random_kcontents, 'kcontents': random_kcontents, 'convers_id': convers_id, 'has_kcontents': True, 'map_markers': map_markers})
                     return
                 
                 # K-Content 검색
                 else:
-                    yield f"data: {json.dumps({'type': 'searching', 'message': '🔍 Searching for K-Drama location...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('searching', '🔍 Searching for K-Drama location...')
                     
-                    kcontent = ChatService._search_best_kcontent(keyword)
+                    context = await ChatService.search.aretrieve(keyword, ["kcontent"])
+                    kcontent = ChatService._search_best_kcontent(keyword, context)
                     
                     if not kcontent:
-                        yield f"data: {json.dumps({'type': 'error', 'message': 'Sorry, I could not find that K-Drama location. 😅'}, ensure_ascii=False)}\n\n"
+                        yield ChatEvent.status('error', 'Sorry, I could not find that K-Drama location. 😅')
                         return
                     
                     kcontent['type'] = 'kcontent'
                     title = f"{kcontent['drama_name']} - {kcontent['location_name']}"
                     
-                    yield f"data: {json.dumps({'type': 'found', 'title': title, 'result': kcontent}, ensure_ascii=False)}\n\n"
-                    yield f"data: {json.dumps({'type': 'generating', 'message': '🎬 Preparing K-Drama info...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent('found', {'title': title, 'result': kcontent})
+                    yield ChatEvent.status('generating', '🎬 Preparing K-Drama info...')
                     
-                    prompt = KCONTENT_QUICK_PROMPT.format(
-                        drama_name=kcontent.get('drama_name', ''),
-                        location_name=kcontent.get('location_name', ''),
-                        address=kcontent.get('address', ''),
-                        trip_tip=kcontent.get('trip_tip', '')[:500],
-                        keyword=kcontent.get('keyword', ''),
-                        message=message
-                    )
+                    # 📝 "소개해줘" 수준 질문이면 미리 만든 소개를 바로 (GPT 호출 없음)
+                    blurb = await astored_blurb("lumi", kcontent, message, ChatService._build_quick_prompt)
                     
-                    full_response = ""
-                    for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6):
-                        full_response += chunk
-                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                        await asyncio.sleep(0.02)
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(areplay(blurb) if blurb else ChatService._quick_stream(kcontent, message)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
                     
-                    conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
+                    convers_id = await asave_conversation(user_id, message, full_response)
                     
                     map_markers = ChatService._create_markers([kcontent])
                     
                     completion_data = {
                         'type': 'done',
                         'full_response': full_response,
-                        'convers_id': conversation.convers_id,
+                        'convers_id': convers_id,
                         'result': kcontent,
                         'results': [kcontent],
                         'kcontents': [kcontent],
@@ -889,147 +630,74 @@ class ChatService:
                         'map_markers': map_markers
                     }
                     
-                    yield f"data: {json.dumps(completion_data, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.from_dict(completion_data)
                     return
             
             # 🎤 일반 모드에서도 다중 검색 허용
             elif question_type == "multiple_kcontent_search":
-                yield f"data: {json.dumps({'type': 'searching', 'message': '🔍 Finding all filming locations from this drama...'}, ensure_ascii=False)}\n\n"
-                
-                count = analysis.get('count', 20)
-                multiple_kcontents = ChatService._search_multiple_kcontent(keyword, count)
-                
-                if not multiple_kcontents:
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'Sorry, I could not find locations for this drama. 😅'}, ensure_ascii=False)}\n\n"
-                    return
-                
-                # AI 응답 생성
-                ai_response = f"🎬 Amazing! I found {len(multiple_kcontents)} filming locations from this drama! Each place has its own special story. Tap any location card below for detailed information! 💕✨"
-                
-                # 대화 저장
-                conversation = Conversation(user_id=user_id, question=message, response=ai_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
-                
-                # 🎨 카드 형태 데이터 준비
-                location_cards = []
-                for location in multiple_kcontents:
-                    card = {
-                        "content_id": location.get('content_id'),
-                        "location_name": location.get('location_name'),      # 📍 장소명
-                        "category": location.get('category'),                # 🏷️ 카테고리  
-                        "thumbnail": location.get('thumbnail'),              # 🖼️ 썸네일
-                        "drama_name": location.get('drama_name'),
-                        "clickable": True                                    # 클릭 가능 표시
-                    }
-                    location_cards.append(card)
-                
-                # 지도 마커 생성
-                map_markers = []
-                for location in multiple_kcontents:
-                    if location.get('latitude') and location.get('longitude'):
-                        marker = {
-                            "id": location.get('content_id'),
-                            "latitude": location.get('latitude'),
-                            "longitude": location.get('longitude'),
-                            "title": location.get('location_name'),
-                            "category": location.get('category'),
-                            "type": "kcontent"
-                        }
-                        map_markers.append(marker)
-                
-                # 🎯 최종 응답
-                completion_data = {
-                    'type': 'multiple_locations',               # 🆕 새로운 응답 타입
-                    'full_response': ai_response,
-                    'convers_id': conversation.convers_id,
-                    'location_cards': location_cards,           # 🎨 카드 데이터 배열
-                    'total_count': len(multiple_kcontents),
-                    'drama_name': multiple_kcontents[0].get('drama_name') if multiple_kcontents else '',
-                    'has_kcontents': True,
-                    'map_markers': map_markers
-                }
-                
-                yield f"data: {json.dumps(completion_data, ensure_ascii=False)}\n\n"
+                async for event in ChatService._stream_multiple_kcontent(user_id, message, keyword, analysis):
+                    yield event
                 return
             
             # 🎤 일반 모드 처리 (기존 로직)
             # 레스토랑 관련 처리
             if is_restaurant_query:
                 if question_type == "comparison":
-                    yield f"data: {json.dumps({'type': 'generating', 'message': '🤔 레스토랑 비교 분석 중...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('generating', '🤔 레스토랑 비교 분석 중...')
                     
-                    prompt = RESTAURANT_COMPARISON_PROMPT.format(message=message)
-                    full_response = ""
-                    for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=300, temperature=0.7):
-                        full_response += chunk
-                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                        await asyncio.sleep(0.02)
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(acached_gpt_stream(RESTAURANT_COMPARISON_PROMPT, message, max_tokens=300, temperature=0.7)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
                     
-                    conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
+                    convers_id = await asave_conversation(user_id, message, full_response)
                     
-                    yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False})
                     return
                 
                 elif question_type == "general_advice":
-                    yield f"data: {json.dumps({'type': 'generating', 'message': '💡 음식 문화 팁 준비 중...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('generating', '💡 음식 문화 팁 준비 중...')
                     
-                    prompt = RESTAURANT_ADVICE_PROMPT.format(message=message)
-                    full_response = ""
-                    for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=350, temperature=0.7):
-                        full_response += chunk
-                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                        await asyncio.sleep(0.02)
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(acached_gpt_stream(RESTAURANT_ADVICE_PROMPT, message, max_tokens=350, temperature=0.7)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
                     
-                    conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
+                    convers_id = await asave_conversation(user_id, message, full_response)
                     
-                    yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False})
                     return
                 
                 else:
                     # 레스토랑 검색
-                    yield f"data: {json.dumps({'type': 'searching', 'message': '🔍 맛집을 찾고 있어요...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.status('searching', '🔍 맛집을 찾고 있어요...')
                     
-                    restaurant = ChatService._search_best_restaurant(keyword)
+                    context = await ChatService.search.aretrieve(keyword, ["restaurant"])
+                    restaurant = ChatService._search_best_restaurant(keyword, context)
                     
                     if not restaurant:
-                        yield f"data: {json.dumps({'type': 'error', 'message': 'Hey Hunters! 😅 그 맛집을 찾을 수 없네... 다른 곳을 찾아보자! 🔥'}, ensure_ascii=False)}\n\n"
+                        yield ChatEvent.status('error', 'Hey Hunters! 😅 그 맛집을 찾을 수 없네... 다른 곳을 찾아보자! 🔥')
                         return
                     
-                    yield f"data: {json.dumps({'type': 'found', 'title': restaurant['restaurant_name'], 'result': restaurant}, ensure_ascii=False)}\n\n"
-                    yield f"data: {json.dumps({'type': 'generating', 'message': '💫 레스토랑 정보 생성 중...'}, ensure_ascii=False)}\n\n"
+                    yield ChatEvent('found', {'title': restaurant['restaurant_name'], 'result': restaurant})
+                    yield ChatEvent.status('generating', '💫 레스토랑 정보 생성 중...')
                     
-                    prompt = RESTAURANT_QUICK_PROMPT.format(
-                        restaurant_name=restaurant.get('restaurant_name', ''),
-                        location=restaurant.get('place', ''),
-                        description=restaurant.get('description', ''),
-                        message=message
-                    )
+                    # 📝 "소개해줘" 수준 질문이면 미리 만든 소개를 바로 (GPT 호출 없음)
+                    blurb = await astored_blurb("lumi", restaurant, message, ChatService._build_quick_prompt)
                     
-                    full_response = ""
-                    for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6):
-                        full_response += chunk
-                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                        await asyncio.sleep(0.02)
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(areplay(blurb) if blurb else ChatService._quick_stream(restaurant, message)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
                     
-                    conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                    db.add(conversation)
-                    db.commit()
-                    db.refresh(conversation)
+                    convers_id = await asave_conversation(user_id, message, full_response)
                     
                     map_markers = ChatService._create_markers([restaurant])
                     
                     completion_data = {
                         'type': 'done',
                         'full_response': full_response,
-                        'convers_id': conversation.convers_id,
+                        'convers_id': convers_id,
                         'result': restaurant,
                         'results': [restaurant],
                         'festivals': [],
@@ -1041,163 +709,106 @@ class ChatService:
                         'map_markers': map_markers
                     }
                     
-                    yield f"data: {json.dumps(completion_data, ensure_ascii=False)}\n\n"
+                    yield ChatEvent.from_dict(completion_data)
                     return
             
             # 비교 질문 처리
             elif question_type == "comparison":
-                yield f"data: {json.dumps({'type': 'generating', 'message': '🤔 비교 분석 중...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('generating', '🤔 비교 분석 중...')
                 
-                prompt = COMPARISON_PROMPT.format(message=message)
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=300, temperature=0.7):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                chunk_writer = ChunkWriter()
+                async for content in chunk_writer.stream(acached_gpt_stream(COMPARISON_PROMPT, message, max_tokens=300, temperature=0.7)):
+                    yield ChatEvent.chunk(content)
+                full_response = chunk_writer.text
                 
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False})
                 return
             
             # 일반 조언 질문 처리
             elif question_type == "general_advice":
-                yield f"data: {json.dumps({'type': 'generating', 'message': '💡 여행 팁 준비 중...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('generating', '💡 여행 팁 준비 중...')
                 
-                prompt = ADVICE_PROMPT.format(message=message)
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=350, temperature=0.7):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                chunk_writer = ChunkWriter()
+                async for content in chunk_writer.stream(acached_gpt_stream(ADVICE_PROMPT, message, max_tokens=350, temperature=0.7)):
+                    yield ChatEvent.chunk(content)
+                full_response = chunk_writer.text
                 
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': full_response, 'convers_id': conversation.convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': full_response, 'convers_id': convers_id, 'results': [], 'festivals': [], 'attractions': [], 'restaurants': [], 'has_festivals': False, 'has_attractions': False, 'has_restaurants': False})
                 return
             
             # 랜덤 추천 처리
             elif question_type == "recommendation":
-                yield f"data: {json.dumps({'type': 'random', 'message': '🎲 랜덤 추천 준비 중...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('random', '🎲 랜덤 추천 준비 중...')
                 
                 count = analysis.get('count', 10)
-                random_attractions = ChatService._get_random_attractions(count)
+                random_attractions = await ChatService._get_random_attractions(count)
                 ai_response = ChatService._generate_random_response(random_attractions, False)
                 
-                conversation = Conversation(user_id=user_id, question=message, response=ai_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, ai_response)
                 
-                yield f"data: {json.dumps({'type': 'done', 'full_response': ai_response, 'results': random_attractions, 'attractions': random_attractions, 'convers_id': conversation.convers_id, 'has_festivals': False, 'has_attractions': True, 'has_restaurants': False, 'map_markers': ChatService._create_markers(random_attractions)}, ensure_ascii=False)}\n\n"
+                yield ChatEvent('done', {'full_response': ai_response, 'results': random_attractions, 'attractions': random_attractions, 'convers_id': convers_id, 'has_festivals': False, 'has_attractions': True, 'has_restaurants': False, 'map_markers': ChatService._create_markers(random_attractions)})
                 return
             
             # ✅ 일반 장소 검색 (병렬 처리 - K-Content 추가!)
             else:
-                yield f"data: {json.dumps({'type': 'searching', 'message': '🔍 정보를 찾고 있어요...'}, ensure_ascii=False)}\n\n"
+                yield ChatEvent.status('searching', '🔍 정보를 찾고 있어요...')
+                
+                # 🧮 변형 계산 + 임베딩은 요청당 1회 (4개 컬렉션이 공유, 동점이면 이 순서 우선)
+                searchers = {
+                    "festival": ChatService._search_best_festival,
+                    "attraction": ChatService._search_best_attraction,
+                    "restaurant": ChatService._search_best_restaurant,
+                    "kcontent": ChatService._search_best_kcontent,  # ✅ 추가
+                }
                 
-                with ThreadPoolExecutor(max_workers=4) as executor:  # ✅ 3 → 4
-                    festival_future = executor.submit(ChatService._search_best_festival, keyword)
-                    attraction_future = executor.submit(ChatService._search_best_attraction, keyword)
-                    restaurant_future = executor.submit(ChatService._search_best_restaurant, keyword)
-                    kcontent_future = executor.submit(ChatService._search_best_kcontent, keyword)  # ✅ 추가
+                # 🚀 컬렉션이 끝나는 대로 지금까지의 최고 결과를 'found'로 전송 (마지막 것이 최종)
+                # ⚡ 추측 생성이 켜져 있으면 유사도 높은 선두 후보로 GPT 스트림을 미리 시작 (더 좋은 결과가 오면 취소)
+                speculator = Speculator(lambda best: ChatService._quick_stream(best, message))
+                try:
+                    result = None
+                    async for result in ChatService.search.aprogressive_best(keyword, searchers, early_score=settings.SEARCH_EARLY_START_SCORE):
+                        # 🎯 제목 생성 (f-string 중첩 방지)
+                        if result.get('restaurant_name'):
+                            title = result.get('restaurant_name')
+                        elif result.get('title'):
+                            title = result.get('title')
+                        else:
+                            title = f"{result.get('drama_name', 'Unknown')} - {result.get('location_name', 'Unknown')}"
+                        
+                        speculator.offer(result)
+                        yield ChatEvent('found', {'title': title, 'result': result})
                     
-                    festival = festival_future.result()
-                    attraction = attraction_future.result()
-                    restaurant = restaurant_future.result()
-                    kcontent = kcontent_future.result()  # ✅ 추가
-                
-                results = []
-                if festival:
-                    festival['type'] = 'festival'
-                    results.append(festival)
-                if attraction:
-                    attraction['type'] = 'attraction'
-                    results.append(attraction)
-                if restaurant:
-                    restaurant['type'] = 'restaurant'
-                    results.append(restaurant)
-                if kcontent:  # ✅ 추가
-                    kcontent['type'] = 'kcontent'
-                    results.append(kcontent)
-                
-                if not results:
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'Hey Hunters! 😅 그 장소를 찾을 수 없네... 🔥'}, ensure_ascii=False)}\n\n"
-                    return
-                
-                results.sort(key=lambda x: x['similarity_score'], reverse=True)
-                result = results[0]
-                
-                # 🎯 제목 생성 (f-string 중첩 방지)
-                if result.get('restaurant_name'):
-                    title = result.get('restaurant_name')
-                elif result.get('title'):
-                    title = result.get('title')
-                else:
-                    title = f"{result.get('drama_name', 'Unknown')} - {result.get('location_name', 'Unknown')}"
-                
-                yield f"data: {json.dumps({'type': 'found', 'title': title, 'result': result}, ensure_ascii=False)}\n\n"
-                yield f"data: {json.dumps({'type': 'generating', 'message': '💫 응답하는 중...'}, ensure_ascii=False)}\n\n"
-                
-                # 프롬프트 생성
-                result_type = result.get('type', 'attraction')
-                
-                if result_type == 'festival':
-                    prompt = KPOP_FESTIVAL_QUICK_PROMPT.format(
-                        title=result.get('title', ''),
-                        start_date=result.get('start_date', ''),
-                        end_date=result.get('end_date', ''),
-                        description=result.get('description', '')[:500],
-                        message=message
-                    )
-                elif result_type == 'restaurant':
-                    prompt = RESTAURANT_QUICK_PROMPT.format(
-                        restaurant_name=result.get('restaurant_name', ''),
-                        location=result.get('place', ''),
-                        description=result.get('description', ''),
-                        message=message
-                    )
-                elif result_type == 'kcontent':  # ✅ 추가
-                    prompt = KCONTENT_QUICK_PROMPT.format(
-                        drama_name=result.get('drama_name', ''),
-                        location_name=result.get('location_name', ''),
-                        address=result.get('address', ''),
-                        trip_tip=result.get('trip_tip', '')[:500],
-                        keyword=result.get('keyword', ''),
-                        message=message
-                    )
-                else:  # attraction
-                    prompt = KPOP_ATTRACTION_QUICK_PROMPT.format(
-                        title=result.get('title', ''),
-                        address=result.get('address', ''),
-                        hours_of_operation=result.get('hours_of_operation', '운영시간 정보 없음'),
-                        description=result.get('description', '')[:500],
-                        message=message
-                    )
-                
-                full_response = ""
-                for chunk in chat_with_gpt_stream([{"role": "user", "content": prompt}], max_tokens=250, temperature=0.6):
-                    full_response += chunk
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.02)
+                    if not result:
+                        yield ChatEvent.status('error', 'Hey Hunters! 😅 그 장소를 찾을 수 없네... 🔥')
+                        return
+                    
+                    yield ChatEvent.status('generating', '💫 응답하는 중...')
+                    
+                    result_type = result.get('type', 'attraction')
+                    
+                    # 📝 "소개해줘" 수준 질문이면 미리 만든 소개를 바로 (GPT 호출 없음)
+                    blurb = await astored_blurb("lumi", result, message, ChatService._build_quick_prompt)
+                    
+                    # ⚡ 미리 시작한 스트림이 최종 결과와 같으면 이어받고, 아니면 여기서 시작
+                    chunk_writer = ChunkWriter()
+                    async for content in chunk_writer.stream(areplay(blurb) if blurb else speculator.take(result)):
+                        yield ChatEvent.chunk(content)
+                    full_response = chunk_writer.text
+                finally:
+                    speculator.close()
                 
-                conversation = Conversation(user_id=user_id, question=message, response=full_response)
-                db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+                convers_id = await asave_conversation(user_id, message, full_response)
                 
                 map_markers = ChatService._create_markers([result])
                 
                 completion_data = {
                     'type': 'done',
                     'full_response': full_response,
-                    'convers_id': conversation.convers_id,
+                    'convers_id': convers_id,
                     'result': result,
                     'results': [result],
                     'festivals': [result] if result_type == 'festival' else [],
@@ -1211,46 +822,30 @@ class ChatService:
                     'map_markers': map_markers
                 }
                 
-                yield f"data: {json.dumps(completion_data, ensure_ascii=False)}\n\n"
+                yield ChatEvent.from_dict(completion_data)
             
         except Exception as e:
             print(f"❌ Streaming 오류: {e}")
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+            yield ChatEvent('error', {'message': str(e)})
     
     # ===== 호환성 함수 =====
     
-    @staticmethod  
-    def send_message(db: Session, user_id: int, message: str, is_kcontent_mode: bool = False) -> Dict[str, Any]:
-        """기존 호환성을 위한 동기 wrapper"""
-        import asyncio
-        
-        async def _collect_streaming_result():
-            result_data = None
-            async for chunk in ChatService.send_message_streaming(db, user_id, message, is_kcontent_mode):
-                if '"type": "done"' in chunk or '"type": "multiple_locations"' in chunk:
-                    try:
-                        data = json.loads(chunk.split('data: ')[1])
-                        return data
-                    except:
-                        pass
+    @staticmethod
+    async def send_message(user_id: int, message: str, is_kcontent_mode: bool = False) -> Dict[str, Any]:
+        """일반(비스트리밍) 응답 - 스트리밍과 같은 파이프라인의 마지막 이벤트를 반환"""
+        event = await final_event(ChatService.send_message_streaming(user_id, message, is_kcontent_mode))
+        if event is None or event.type == 'error':
             return {"response": "처리 중 오류가 발생했습니다.", "convers_id": None, "results": []}
-        
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        return loop.run_until_complete(_collect_streaming_result())
+        return event.to_dict()
     
     @staticmethod
     def get_conversation_history(db: Session, user_id: int, limit: int = 50) -> List[Dict]:
         """대화 히스토리 조회"""
         conversations = db.query(Conversation).filter(
             Conversation.user_id == user_id
-        ).order_by(Conversation.datetime.desc()).limit(limit).all()
+        ).order_by(Conversation.datetime.desc(), Conversation.convers_id.desc()).limit(limit).all()  # 같은 배치는 datetime이 같음
         
         return [
             {
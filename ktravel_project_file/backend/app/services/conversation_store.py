@@ -0,0 +1,395 @@
+# app/services/conversation_store.py
+"""
+💾 대화 저장 (write-behind 배치)
+
+- 스트림은 검색/생성 동안 DB 세션을 잡지 않고, 마지막 'done' 이벤트도 INSERT를 기다리지 않는다.
+- convers_id는 Redis 시퀀스(INCR)로 미리 발급 → 'done' 이벤트 계약 그대로 유지
+  (시퀀스는 프로세스 시작 시 MAX(convers_id)로 맞춤, Redis 재시작 / eviction 으로 키가 없어지면 발급 전에 다시 맞춤)
+- 행은 백그라운드 writer 스레드가 모아서 한 번에 bulk INSERT
+- 종료 시(shutdown 이벤트 / atexit) 큐를 비우고, 끝내 저장 못 한 행은 spill 파일에 남겨
+  다음 시작 때 다시 저장
+- Redis를 못 쓰면 기존처럼 짧은 세션으로 바로 저장 (save_conversation, AUTO_INCREMENT)
+  단, 그 전에 writer 큐를 먼저 비움 → 아직 큐에 있는 행의 id를 AUTO_INCREMENT가 가져가지 않도록
+- 그래도 id가 충돌하면 (다른 워커 큐에 있던 id 등) 새 id로 몰래 저장하지 않고 conflicts 파일에 남기고 오류 로그
+  (이미 'done' 이벤트로 보낸 convers_id가 다른 행을 가리키게 되므로)
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.database.connection import SessionLocal
+from app.models.conversation import Conversation
+
+CONVERS_ID_SEQ_KEY = "conversation:convers_id_seq"
+
+# 시퀀스를 DB 최대값 이상으로 맞추는 스크립트 (여러 워커가 동시에 실행해도 안전)
+_SEED_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current or tonumber(current) < tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+return redis.call('GET', KEYS[1])
+"""
+
+# 키가 있을 때만 INCR (없으면 nil → 다시 맞춘 뒤 재시도, 1부터 다시 발급하지 않도록)
+_ALLOCATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+return redis.call('INCR', KEYS[1])
+"""
+
+
+# writer 큐를 비우는 최대 대기 시간 (넘으면 AUTO_INCREMENT 저장 대신 오류)
+FLUSH_BEFORE_FALLBACK_TIMEOUT_SECONDS = 10.0
+
+
+# ===== 즉시 저장 (fallback) =====
+
+def save_conversation(user_id: int, question: str, response: str) -> int:
+    """대화 1건 저장 후 convers_id 반환 (세션은 이 함수 안에서만 사용)"""
+    db = SessionLocal()
+    try:
+        conversation = Conversation(user_id=user_id, question=question, response=response)
+        db.add(conversation)
+        db.flush()  # INSERT 후 PK 확보 (refresh 왕복 없이)
+        convers_id = conversation.convers_id
+        db.commit()
+        return convers_id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# ===== convers_id 사전 발급 =====
+
+_sequence_seeded = False
+_highest_issued = 0  # 이 프로세스가 발급한 최대 id (아직 writer 큐에 있어 DB에 없는 id 포함)
+
+
+def seed_convers_id_sequence():
+    """Redis 시퀀스를 MAX(convers_id) 이상으로 맞춤 (이 프로세스가 이미 발급한 id 이상)"""
+    global _sequence_seeded
+    from app.core.session import redis_client
+
+    db = SessionLocal()
+    try:
+        max_id = db.query(func.max(Conversation.convers_id)).scalar() or 0
+    finally:
+        db.close()
+
+    floor = max(max_id, _highest_issued)
+    current = redis_client.eval(_SEED_SCRIPT, 1, CONVERS_ID_SEQ_KEY, floor)
+    _sequence_seeded = True
+    print(f"✅ convers_id 시퀀스 준비: {current} (DB 최대값 {max_id}, 발급한 최대값 {_highest_issued})")
+
+
+def _issued(convers_id) -> int:
+    global _highest_issued
+    convers_id = int(convers_id)
+    _highest_issued = max(_highest_issued, convers_id)
+    return convers_id
+
+
+def allocate_convers_id() -> Optional[int]:
+    """convers_id 1개 발급 (실패 시 None → 즉시 저장으로 fallback)"""
+    from app.core.session import redis_client
+
+    try:
+        if not _sequence_seeded:
+            seed_convers_id_sequence()
+        convers_id = redis_client.eval(_ALLOCATE_SCRIPT, 1, CONVERS_ID_SEQ_KEY)
+        if convers_id is None:
+            print("⚠️ convers_id 시퀀스 키 없음 (Redis 재시작 / eviction) - 다시 맞춤")
+            seed_convers_id_sequence()
+            convers_id = redis_client.eval(_ALLOCATE_SCRIPT, 1, CONVERS_ID_SEQ_KEY)
+        return _issued(convers_id) if convers_id is not None else None
+    except Exception as e:
+        print(f"⚠️ convers_id 발급 실패: {e}")
+        return None
+
+
+async def aallocate_convers_id() -> Optional[int]:
+    """allocate_convers_id의 async 버전"""
+    from app.core.session import async_redis_client
+
+    try:
+        if not _sequence_seeded:
+            await run_in_threadpool(seed_convers_id_sequence)
+        convers_id = await async_redis_client.eval(_ALLOCATE_SCRIPT, 1, CONVERS_ID_SEQ_KEY)
+        if convers_id is None:
+            print("⚠️ convers_id 시퀀스 키 없음 (Redis 재시작 / eviction) - 다시 맞춤")
+            await run_in_threadpool(seed_convers_id_sequence)
+            convers_id = await async_redis_client.eval(_ALLOCATE_SCRIPT, 1, CONVERS_ID_SEQ_KEY)
+        return _issued(convers_id) if convers_id is not None else None
+    except Exception as e:
+        print(f"⚠️ convers_id 발급 실패: {e}")
+        return None
+
+
+# ===== 백그라운드 writer =====
+
+class ConversationWriter:
+    """Conversation 행을 모아서 bulk INSERT 하는 백그라운드 스레드"""
+
+    def __init__(self, batch_size: int = 100, flush_interval_ms: int = 200, spill_path: str = "", max_retries: int = 3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.spill_path = spill_path
+        self.max_retries = max_retries
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._settled = threading.Condition()
+        self._unsettled = 0  # 큐에 넣었지만 아직 저장 / spill 안 된 행 수
+        self._stats = {"enqueued": 0, "written": 0, "batches": 0, "conflicts": 0, "spilled": 0}
+
+    # ----- 수명 주기 -----
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """writer 스레드 시작 (이전 실행에서 남은 spill 행도 다시 큐에 넣음)"""
+        with self._lock:
+            if self.running:
+                return
+            self._replay_spill()
+            self._thread = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+            self._thread.start()
+            print(f"✅ 대화 저장 writer 시작 (batch={self.batch_size}, interval={self.flush_interval * 1000:.0f}ms)")
+
+    def stop(self, timeout: float = 10.0):
+        """큐를 모두 저장하고 종료 (남은 행은 spill 파일로)"""
+        with self._lock:
+            if not self.running:
+                return
+            self._queue.put(None)
+            self._thread.join(timeout)
+            leftover = self._drain()
+            if leftover:
+                self._spill(leftover)
+                self._settle(len(leftover))
+            print(f"🛑 대화 저장 writer 종료: {self.stats()}")
+
+    def enqueue(self, row: Dict[str, Any]):
+        """저장할 행 추가 (스레드 안전, 즉시 반환)"""
+        with self._settled:
+            self._unsettled += 1
+        self._queue.put(row)
+        self._stats["enqueued"] += 1
+
+    def flush(self, timeout: float) -> bool:
+        """지금까지 넣은 행이 모두 저장(또는 spill)될 때까지 대기 - 시간 안에 끝나면 True"""
+        with self._settled:
+            return self._settled.wait_for(lambda: self._unsettled == 0, timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "pending": self._queue.qsize()}
+
+    # ----- 내부 -----
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            item = self._queue.get()
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+
+            # 첫 행 이후 flush_interval 동안 batch_size까지 모음
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if stopping:
+                batch.extend(self._drain())
+            if batch:
+                self._flush(batch)
+                self._settle(len(batch))
+
+    def _settle(self, count: int):
+        with self._settled:
+            self._unsettled -= count
+            self._settled.notify_all()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if item is not None:
+                rows.append(item)
+
+    def _flush(self, rows: List[Dict[str, Any]]):
+        """bulk INSERT (재시도 후에도 실패하면 spill)"""
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self._insert(rows)
+                self._stats["written"] += len(rows)
+                self._stats["batches"] += 1
+                return
+            except IntegrityError:
+                # 발급한 id가 이미 쓰였으면 나머지 행은 저장하고 충돌한 행만 따로 남김
+                self._insert_one_by_one(rows)
+                return
+            except Exception as e:
+                print(f"⚠️ 대화 배치 저장 실패 ({attempt}/{self.max_retries}, {len(rows)}건): {e}")
+                time.sleep(0.5 * attempt)
+        self._spill(rows)
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(Conversation), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert_one_by_one(self, rows: List[Dict[str, Any]]):
+        failed, conflicts = [], []
+        for row in rows:
+            try:
+                self._insert([row])
+                self._stats["written"] += 1
+            except IntegrityError as e:
+                # 새 id로 다시 저장하지 않음 (클라이언트가 받은 convers_id가 다른 행을 가리키게 됨)
+                print(f"❌ convers_id {row.get('convers_id')} 충돌 - 저장하지 않고 conflicts 파일에 보관: {e}")
+                conflicts.append(row)
+            except Exception as e:
+                print(f"❌ 대화 저장 실패: {e}")
+                failed.append(row)
+        if failed:
+            self._spill(failed)
+        if conflicts:
+            self._stats["conflicts"] += len(conflicts)
+            self._spill(conflicts, path=f"{self.spill_path}.conflicts" if self.spill_path else "")
+
+    def _spill(self, rows: List[Dict[str, Any]], path: Optional[str] = None):
+        """저장 못 한 행을 JSON Lines 파일로 보관 (spill_path는 다음 start 때 재시도, conflicts 파일은 수동 확인용)"""
+        path = self.spill_path if path is None else path
+        if not path:
+            print(f"❌ 대화 {len(rows)}건 저장 실패 (spill 경로 없음)")
+            return
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            if path == self.spill_path:
+                self._stats["spilled"] += len(rows)
+            print(f"💾 대화 {len(rows)}건 파일에 보관: {path}")
+        except Exception as e:
+            print(f"❌ spill 파일 쓰기 실패: {e}")
+
+    def _replay_spill(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        replay_path = f"{self.spill_path}.replay"
+        try:
+            os.replace(self.spill_path, replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            for row in rows:
+                self.enqueue(row)
+            os.remove(replay_path)
+            print(f"♻️ spill 파일의 대화 {len(rows)}건 다시 저장 예정")
+        except Exception as e:
+            print(f"⚠️ spill 파일 재처리 실패: {e}")
+
+
+# 🚀 프로세스 전역 writer
+_writer: Optional[ConversationWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_conversation_writer() -> ConversationWriter:
+    """공유 writer 싱글톤 (첫 사용 시 시작)"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ConversationWriter(
+                    batch_size=settings.CONVERSATION_BATCH_SIZE,
+                    flush_interval_ms=settings.CONVERSATION_FLUSH_INTERVAL_MS,
+                    spill_path=settings.CONVERSATION_SPILL_PATH,
+                )
+                atexit.register(_writer.stop)
+    if not _writer.running:
+        _writer.start()
+    return _writer
+
+
+def stop_conversation_writer():
+    """앱 종료 시 호출 - 남은 대화 모두 저장"""
+    if _writer is not None:
+        _writer.stop()
+
+
+# ===== 공개 API =====
+
+def _save_after_flush(user_id: int, question: str, response: str) -> int:
+    """
+    Redis 발급 실패 시 AUTO_INCREMENT 저장 - 먼저 writer 큐를 비움
+
+    큐에 남은 행(Redis에서 발급한 id)이 DB에 들어간 뒤에야 AUTO_INCREMENT가 그보다 큰 id를 줌.
+    시간 안에 못 비우면 두 id 출처가 섞이지 않도록 저장하지 않고 오류.
+    """
+    if _writer is not None and not _writer.flush(FLUSH_BEFORE_FALLBACK_TIMEOUT_SECONDS):
+        raise RuntimeError("대화 저장 대기열을 비우지 못해 AUTO_INCREMENT 저장 불가 (convers_id 충돌 위험)")
+    return save_conversation(user_id, question, response)
+
+
+def queue_conversation(user_id: int, question: str, response: str) -> int:
+    """대화 저장 예약 후 convers_id 즉시 반환 (동기 경로용)"""
+    if settings.CONVERSATION_WRITE_BEHIND:
+        convers_id = allocate_convers_id()
+        if convers_id is not None:
+            get_conversation_writer().enqueue(
+                {"convers_id": convers_id, "user_id": user_id, "question": question, "response": response}
+            )
+            return convers_id
+        return _save_after_flush(user_id, question, response)
+    return save_conversation(user_id, question, response)
+
+
+async def asave_conversation(user_id: int, question: str, response: str) -> int:
+    """대화 저장 예약 후 convers_id 반환 (스트리밍 경로용, INSERT를 기다리지 않음)"""
+    if settings.CONVERSATION_WRITE_BEHIND:
+        convers_id = await aallocate_convers_id()
+        if convers_id is not None:
+            get_conversation_writer().enqueue(
+                {"convers_id": convers_id, "user_id": user_id, "question": question, "response": response}
+            )
+            return convers_id
+        return await run_in_threadpool(_save_after_flush, user_id, question, response)
+    return await run_in_threadpool(save_conversation, user_id, question, response)
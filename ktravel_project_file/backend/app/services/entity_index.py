@@ -0,0 +1,312 @@
+# app/services/entity_index.py
+"""
+🎯 엔티티 별칭 인덱스 - 이름이 정확히 나오면 벡터 검색 생략
+
+- MySQL 카탈로그(관광명소 / 레스토랑 / 축제 / K-Content 촬영지)의 한글·영어 이름 + 검색어 보정 테이블 → 별칭 사전
+- 메시지(키워드)가 알려진 엔티티 1개로 확실히 풀리면 SearchEngine이 임베딩 / Qdrant 검색 없이 바로 결과를 만든다
+  (점수 1.0의 ScoredPoint, point id / payload 는 로드 때 scroll 한 Qdrant 포인트 그대로
+   → 벡터 검색으로 찾은 같은 장소와 설명 / id / 저장된 소개 해시까지 같음)
+- MySQL은 별칭에만 사용, Qdrant에 포인트가 없는 행은 별칭에서 제외 (기존 벡터 검색)
+- 드라마 이름은 촬영지가 여러 곳이라 단일 결과로 쓰지 않고 resolve_drama 로만 조회
+- 시작 시 한 번 로드, 이후 백그라운드 스레드가 Redis 버전 키를 보고 다시 로드
+  (CRUD 엔드포인트는 notify_catalog_changed 호출 → 모든 워커가 다음 확인 때 갱신)
+- 같은 이름이 여러 타입에 있으면(관광명소 'N Seoul Tower' + 촬영지 'N Seoul Tower') 모호 → 기존 벡터 검색
+"""
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from qdrant_client import models
+
+from app.database.connection import SessionLocal
+from app.models.attraction import Attraction
+from app.models.festival import Festival
+from app.models.kcontent import KContent
+from app.models.restaurant import Restaurant
+
+ENTITY_INDEX_VERSION_KEY = "entity_index:version"
+
+# 별칭으로 쓰기엔 너무 짧은 이름 ('궁' 등)
+MIN_ALIAS_LENGTH = 3
+
+_PUNCTUATION = re.compile(r"[?!.,\"“”‘’()\[\]~]")
+
+
+def normalize_name(text: str) -> str:
+    """별칭 비교용 정규화 (소문자, 문장부호 제거, 공백 정리)"""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+class EntityHit:
+    """별칭으로 찾은 엔티티 1개 (search_type + Qdrant point id / payload)"""
+
+    __slots__ = ("search_type", "entity_id", "name", "payload", "point_id")
+
+    def __init__(self, search_type: str, entity_id, name: str, payload: Dict, point_id=None):
+        self.search_type = search_type
+        self.entity_id = entity_id
+        self.name = name
+        self.payload = payload
+        self.point_id = entity_id if point_id is None else point_id
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.search_type, str(self.entity_id)
+
+    def to_point(self, score: float = 1.0) -> models.ScoredPoint:
+        """벡터 검색 결과와 같은 모양 (best_match / _format_search_result 그대로 사용)"""
+        return models.ScoredPoint(id=self.point_id, version=0, score=score, payload=self.payload, vector=None)
+
+    def __repr__(self):
+        return f"<EntityHit({self.search_type}:{self.entity_id} '{self.name}')>"
+
+
+# search_type → (MySQL 모델, payload.metadata 의 id 필드)
+ENTITY_SOURCES = {
+    "attraction": (Attraction, "attr_id"),
+    "restaurant": (Restaurant, "restaurant_id"),
+    "festival": (Festival, "festival_id"),
+    "kcontent": (KContent, "content_id"),
+}
+
+
+def _names(search_type: str, row) -> Tuple[Optional[str], ...]:
+    """MySQL 행 → 별칭으로 쓸 이름들"""
+    if search_type == "restaurant":
+        return row.restaurant_name, row.restaurant_name_en
+    if search_type in ("festival", "attraction"):
+        return (row.title,)
+    return row.location_name, row.location_name_en
+
+
+def _row_id(search_type: str, row):
+    return getattr(row, ENTITY_SOURCES[search_type][1])
+
+
+class EntityIndex:
+    """
+    별칭 → 엔티티 사전 (프로세스 메모리)
+
+    사용법:
+        index = EntityIndex({"restaurant": "seoul-restaurant", ...}, corrections)
+        index.load(qdrant_client)                      # 시작 시 (동기, DB 조회 + Qdrant scroll)
+        hit = index.resolve("gyeongbokgung palace", ["festival", "attraction", "restaurant"])
+        if hit: point = hit.to_point()                 # 임베딩 / Qdrant 검색 없음
+    """
+
+    def __init__(
+        self,
+        collections: Dict[str, str],
+        corrections: Optional[Dict[str, str]] = None,
+        min_coverage: float = 0.8,
+        page_size: int = 1000,
+    ):
+        """
+        Args:
+            collections: {search_type: Qdrant 컬렉션} (ENTITY_SOURCES 에 있는 타입만 사용)
+            corrections: 검색어 보정 테이블 {틀린 구문: 고친 구문} (고친 구문이 엔티티 이름이면 틀린 구문도 별칭)
+            min_coverage: 키워드 중 별칭이 차지해야 하는 최소 비율 (글자 수 기준)
+            page_size: Qdrant scroll 페이지 크기
+        """
+        self.collections = {t: c for t, c in collections.items() if t in ENTITY_SOURCES}
+        self.corrections = dict(corrections or {})
+        self.min_coverage = min_coverage
+        self.page_size = page_size
+
+        self._aliases: Dict[str, List[EntityHit]] = {}
+        self._dramas: Dict[str, Tuple[str, str]] = {}
+        self._max_alias_words = 0
+        self._version: Optional[str] = None
+        self._loaded_at = 0.0
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"loads": 0, "lookups": 0, "hits": 0, "ambiguous": 0, "missing_points": 0}
+
+    # ----- 로드 -----
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at > 0
+
+    def _scroll_points(self, qdrant_client, search_type: str) -> Dict[str, models.Record]:
+        """컬렉션 전체 scroll → {str(payload.metadata 의 id): 포인트}"""
+        id_field = ENTITY_SOURCES[search_type][1]
+        points: Dict[str, models.Record] = {}
+        offset = None
+        while True:
+            page, offset = qdrant_client.scroll(
+                collection_name=self.collections[search_type],
+                limit=self.page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for point in page:
+                metadata = (point.payload or {}).get("metadata", {})
+                if metadata.get(id_field) not in (None, ""):
+                    points.setdefault(str(metadata[id_field]), point)
+            if offset is None or not page:
+                return points
+
+    def load(self, qdrant_client):
+        """MySQL 카탈로그 + Qdrant 포인트로 별칭 사전을 새로 만들어 교체 (실패하면 기존 사전 유지)"""
+        start = time.perf_counter()
+        version = self._current_version()
+
+        points = {search_type: self._scroll_points(qdrant_client, search_type) for search_type in self.collections}
+
+        db = SessionLocal()
+        try:
+            hits: List[Tuple[Iterable[str], EntityHit]] = []
+            missing = 0
+            dramas: Dict[str, Tuple[str, str]] = {}
+            for search_type, collection_points in points.items():
+                model = ENTITY_SOURCES[search_type][0]
+                for row in db.query(model).all():
+                    names = _names(search_type, row)
+                    if search_type == "kcontent" and row.drama_name:
+                        for name in (row.drama_name, row.drama_name_en):
+                            if name and len(normalize_name(name)) >= MIN_ALIAS_LENGTH:
+                                dramas[normalize_name(name)] = (row.drama_name, row.drama_name_en or "")
+
+                    point = collection_points.get(str(_row_id(search_type, row)))
+                    if point is None:
+                        missing += 1  # 아직 적재 전인 행 → 벡터 검색
+                        continue
+                    hit = EntityHit(search_type, _row_id(search_type, row), next((n for n in names if n), ""),
+                                    point.payload or {}, point_id=point.id)
+                    hits.append((names, hit))
+        finally:
+            db.close()
+
+        aliases: Dict[str, Dict[Tuple[str, str], EntityHit]] = {}
+        for names, hit in hits:
+            for name in names:
+                alias = normalize_name(name or "")
+                if len(alias) >= MIN_ALIAS_LENGTH:
+                    aliases.setdefault(alias, {})[hit.key] = hit
+
+        # 보정 테이블: 고친 구문이 엔티티/드라마 이름이면 틀린 구문도 같은 대상으로
+        for wrong, correct in self.corrections.items():
+            wrong, correct = normalize_name(wrong), normalize_name(correct)
+            if correct in aliases:
+                aliases.setdefault(wrong, {}).update(aliases[correct])
+            if correct in dramas:
+                dramas.setdefault(wrong, dramas[correct])
+
+        with self._lock:
+            self._aliases = {alias: list(targets.values()) for alias, targets in aliases.items()}
+            self._dramas = dramas
+            self._max_alias_words = max((len(alias.split()) for alias in self._aliases), default=0)
+            self._version = version
+            self._loaded_at = time.monotonic()
+            self._stats["loads"] += 1
+            self._stats["missing_points"] = missing
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"✅ 엔티티 별칭 인덱스 로드: 별칭 {len(self._aliases)}개, 드라마 {len(dramas)}개, "
+              f"Qdrant에 없는 행 {missing}개 ({elapsed_ms:.0f}ms)")
+
+    # ----- 조회 -----
+
+    def resolve(self, keyword: str, search_types: Iterable[str]) -> Optional[EntityHit]:
+        """
+        키워드가 search_types 중 엔티티 1개로 확실히 풀리면 반환
+
+        - 키워드 전체가 별칭이거나
+        - 키워드 안의 가장 긴 별칭이 키워드의 min_coverage 이상을 차지하고
+        - 그 별칭이 가리키는 엔티티가 1개일 때만 (여러 개면 기존 벡터 검색)
+        """
+        if not self.loaded:
+            return None
+        self._stats["lookups"] += 1
+
+        query = normalize_name(keyword)
+        if not query:
+            return None
+        allowed = set(search_types)
+
+        alias = self._longest_alias(query)
+        if alias is None or len(alias) / len(query) < self.min_coverage:
+            return None
+
+        targets = [hit for hit in self._aliases[alias] if hit.search_type in allowed]
+        if len(targets) != 1:
+            if targets:
+                self._stats["ambiguous"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        print(f"🎯 엔티티 바로 찾음: '{alias}' → {targets[0]}")
+        return targets[0]
+
+    def resolve_drama(self, keyword: str) -> Optional[Tuple[str, str]]:
+        """키워드 안의 드라마 이름 → (drama_name, drama_name_en) (DB 기준, 가장 긴 이름 우선)"""
+        query = normalize_name(keyword)
+        best = None
+        for alias, drama_name in self._dramas.items():
+            if alias in query and (best is None or len(alias) > len(best[0])):
+                best = (alias, drama_name)
+        return best[1] if best else None
+
+    def _longest_alias(self, query: str) -> Optional[str]:
+        """키워드의 단어 n-gram 중 가장 긴 별칭"""
+        if query in self._aliases:
+            return query
+        words = query.split()
+        for size in range(min(len(words), self._max_alias_words), 0, -1):
+            for start in range(len(words) - size + 1):
+                candidate = " ".join(words[start:start + size])
+                if candidate in self._aliases:
+                    return candidate
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "aliases": len(self._aliases), "dramas": len(self._dramas)}
+
+    # ----- 갱신 -----
+
+    def start(self, client_factory: Callable[[], Any], check_interval: float = 30.0, max_age: float = 3600.0):
+        """버전 키 확인 스레드 시작 (버전이 바뀌었거나 max_age 지나면 다시 로드)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(client_factory, check_interval, max_age), name="entity-index-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, client_factory: Callable[[], Any], check_interval: float, max_age: float):
+        while not self._stop.wait(check_interval):
+            try:
+                stale = time.monotonic() - self._loaded_at > max_age
+                if stale or self._current_version() != self._version:
+                    self.load(client_factory())
+            except Exception as e:
+                print(f"⚠️ 엔티티 인덱스 갱신 실패 (기존 인덱스 유지): {e}")
+
+    @staticmethod
+    def _current_version() -> Optional[str]:
+        from app.core.session import redis_client
+
+        try:
+            return redis_client.get(ENTITY_INDEX_VERSION_KEY)
+        except Exception:
+            return None
+
+
+def notify_catalog_changed():
+    """레스토랑 / 축제 / K-Content 행이 바뀌었을 때 호출 → 모든 워커의 인덱스가 다음 확인 때 다시 로드"""
+    from app.core.session import redis_client
+
+    try:
+        redis_client.incr(ENTITY_INDEX_VERSION_KEY)
+    except Exception as e:
+        print(f"⚠️ 엔티티 인덱스 버전 갱신 실패 (max_age 지나면 갱신): {e}")
@@ -0,0 +1,377 @@
+# app/services/place_cards.py
+"""
+🗂️ 장소 카드 (원본 테이블 일괄 조회 + 카드 캐시)
+
+- 추천 / LLM 추천 라우터가 Qdrant 결과마다 원본 행을 1개씩 조회하던 것 (요청당 최대 100번)
+  → place_type별로 reference_id를 모아서 IN (...) 쿼리 1번씩 (요청당 최대 3번)
+- 결과는 입력 순서(= 추천 순위) 그대로, 원본 행이 없으면 None (호출하는 쪽이 Qdrant payload로 대체)
+- 카드 dict: name / address / image_url / latitude / longitude / category / extra
+- 카드 캐시: (종류, place_type, id) → 직렬화된 카드 JSON (프로세스 LRU → Redis 2단계)
+  카탈로그 행은 거의 안 바뀌므로 캐시에 있으면 DB 조회 없이 메모리에서 바로
+- 무효화: 행을 쓰는 엔드포인트가 커밋 후 invalidate_place_cards(place_type, ids) 호출
+  → Redis 키 삭제 + 버전 키 증가 (다른 워커는 PLACE_CARD_VERSION_CHECK_SECONDS 안에 프로세스 LRU 비움)
+"""
+import json
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.festival import Festival
+from app.models.kcontent import KContent
+from app.models.restaurant import Restaurant
+from app.schemas.bookmarkschema import PlaceType
+
+
+def _float(value) -> Optional[float]:
+    return float(value) if value else None
+
+
+def _kcontent_image(item: KContent) -> Optional[str]:
+    """thumbnail → image_url → image_url_list 첫 번째 (JSON 문자열이면 파싱)"""
+    if item.thumbnail:
+        return item.thumbnail
+    if item.image_url:
+        return item.image_url
+    if not item.image_url_list:
+        return None
+    if isinstance(item.image_url_list, list):
+        return item.image_url_list[0] if item.image_url_list else None
+    try:
+        url_list = json.loads(item.image_url_list)
+    except (TypeError, ValueError):
+        return None
+    return url_list[0] if isinstance(url_list, list) and url_list else None
+
+
+def _kcontent_card(item: KContent) -> Dict[str, Any]:
+    return {
+        "name": item.location_name_en or item.location_name or item.drama_name_en or "Unknown",
+        "address": item.address_en or item.address or "",
+        "image_url": _kcontent_image(item),
+        "latitude": _float(item.latitude),
+        "longitude": _float(item.longitude),
+        "category": item.category_en or item.category or "",
+        "extra": {
+            "content_id": item.content_id,
+            "drama_name_en": item.drama_name_en,
+            "location_name_en": item.location_name_en,
+            "address_en": item.address_en,
+            "category_en": item.category_en,
+            "keyword_en": item.keyword_en,
+            "trip_tip_en": item.trip_tip_en,
+            "latitude": _float(item.latitude),
+            "longitude": _float(item.longitude),
+        },
+    }
+
+
+def _restaurant_card(item: Restaurant) -> Dict[str, Any]:
+    return {
+        "name": item.restaurant_name_en or item.restaurant_name or "Unknown",
+        "address": item.place_en or item.place or "",
+        "image_url": item.image_path,
+        "latitude": _float(item.Latitude),
+        "longitude": _float(item.Longitude),
+        "category": item.type_en or item.type or "",
+        "extra": {
+            "restaurant_id": item.restaurant_id,
+            "restaurant_name": item.restaurant_name,
+            "cuisine_type": item.type_en or item.type,
+            "address": item.place_en or item.place,
+        },
+    }
+
+
+def _festival_card(item: Festival) -> Dict[str, Any]:
+    return {
+        "name": item.title or "Unknown",
+        "address": "",
+        "image_url": item.image_url,
+        "latitude": _float(item.latitude),
+        "longitude": _float(item.longitude),
+        "category": "festival",
+        "extra": {
+            "festival_id": item.festival_id,
+            "festival_name": item.title,
+            "start_date": str(item.start_date) if item.start_date else None,
+            "end_date": str(item.end_date) if item.end_date else None,
+        },
+    }
+
+
+# place_type → (모델, ID 컬럼, 카드 함수) - 명소는 원본 테이블이 없어서 payload 사용
+CARD_SOURCES: Dict[int, Tuple[Any, Any, Callable[[Any], Dict[str, Any]]]] = {
+    PlaceType.KCONTENT: (KContent, KContent.content_id, _kcontent_card),
+    PlaceType.RESTAURANT: (Restaurant, Restaurant.restaurant_id, _restaurant_card),
+    PlaceType.FESTIVAL: (Festival, Festival.festival_id, _festival_card),
+}
+
+
+PLACE_CARD_VERSION_KEY = "place_cards:version"
+
+_UNCHECKED = object()  # 아직 버전 키를 읽지 않음 (키가 없는 None 과 구분)
+
+# 카드 종류 (같은 행이라도 화면마다 모양이 다름) - 무효화는 종류 전부
+CARD_KINDS = ("recommend", "kcontent")
+
+
+class PlaceCardCache:
+    """
+    (종류, place_type, id) → 직렬화된 카드 (프로세스 LRU → Redis)
+
+    사용법:
+        cache = PlaceCardCache(redis=redis_client)
+        cards = cache.get_many("recommend", PlaceType.KCONTENT, [1, 2], load)   # load(미스 ID) → {str(id): 카드}
+        cache.invalidate(PlaceType.KCONTENT, [1])
+
+    카드는 JSON 문자열로 보관해서 꺼낼 때마다 새 dict (호출하는 쪽이 고쳐도 캐시는 그대로).
+    없는 행(load 결과에 없음)은 저장하지 않음.
+    """
+
+    KEY_PREFIX = "card"
+
+    def __init__(self, max_size: int = 5000, ttl_seconds: int = 86400, version_check_seconds: float = 5.0, redis=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+        self.redis = redis
+
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Any = _UNCHECKED
+        self._checked_at = 0.0
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def _key(self, kind: str, place_type: int, reference_id) -> str:
+        return f"{self.KEY_PREFIX}:{kind}:{int(place_type)}:{reference_id}"
+
+    # ===== 1단계: 프로세스 LRU =====
+
+    def _local_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return raw
+
+    def _local_set(self, key: str, raw: str):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl_seconds, raw)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _sync_version(self):
+        """다른 워커가 무효화했으면 (버전 키가 바뀜) 프로세스 LRU 비우기 - 주기마다 1번만 확인"""
+        now = time.monotonic()
+        if self.redis is None or now - self._checked_at < self.version_check_seconds:
+            return
+        self._checked_at = now
+        try:
+            version = self.redis.get(PLACE_CARD_VERSION_KEY)
+        except Exception as e:
+            print(f"⚠️ 장소 카드 캐시 버전 확인 실패: {e}")
+            return
+        if self._version is not _UNCHECKED and version != self._version:
+            with self._lock:
+                self._local.clear()
+        self._version = version
+
+    # ===== 2단계: Redis =====
+
+    def _redis_get_many(self, keys: List[str]) -> List[Optional[str]]:
+        if self.redis is None or not keys:
+            return [None] * len(keys)
+        try:
+            return self.redis.mget(keys)
+        except Exception as e:
+            print(f"⚠️ 장소 카드 캐시 Redis 조회 실패: {e}")
+            return [None] * len(keys)
+
+    def _redis_set_many(self, items: Dict[str, str]):
+        if self.redis is None or not items:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, raw in items.items():
+                pipe.setex(key, self.ttl_seconds, raw)
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ 장소 카드 캐시 Redis 저장 실패: {e}")
+
+    # ===== 공개 API =====
+
+    def get_many(
+        self,
+        kind: str,
+        place_type: int,
+        reference_ids: Iterable[Any],
+        load: Callable[[List[Any]], Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        카드 여러 개 - 캐시 미스만 load(미스 ID 목록)로 한 번에 조회
+
+        Returns:
+            {str(reference_id): 카드} (없는 행은 빠짐)
+        """
+        self._sync_version()
+        ids = {str(reference_id): reference_id for reference_id in reference_ids}
+        raws: Dict[str, str] = {}
+
+        # 1) 프로세스 LRU
+        for id_key in ids:
+            raw = self._local_get(self._key(kind, place_type, id_key))
+            if raw is not None:
+                raws[id_key] = raw
+                self._stats["local_hits"] += 1
+
+        # 2) Redis
+        pending = [id_key for id_key in ids if id_key not in raws]
+        for id_key, raw in zip(pending, self._redis_get_many([self._key(kind, place_type, k) for k in pending])):
+            if raw is not None:
+                raws[id_key] = raw
+                self._local_set(self._key(kind, place_type, id_key), raw)
+                self._stats["redis_hits"] += 1
+
+        # 3) DB (미스만 한 번에)
+        missing = [ids[id_key] for id_key in ids if id_key not in raws]
+        if missing:
+            self._stats["misses"] += len(missing)
+            fresh = {}
+            for id_key, card in load(missing).items():
+                raw = json.dumps(card, ensure_ascii=False, default=str)
+                raws[id_key] = raw
+                fresh[self._key(kind, place_type, id_key)] = raw
+                self._local_set(self._key(kind, place_type, id_key), raw)
+            self._redis_set_many(fresh)
+
+        return {id_key: json.loads(raw) for id_key, raw in raws.items()}
+
+    def invalidate(self, place_type: int, reference_ids: Iterable[Any]):
+        """행이 바뀜 - 모든 종류의 카드 삭제 (이 워커는 바로, 다른 워커는 버전 확인 때)"""
+        keys = [self._key(kind, place_type, reference_id) for reference_id in reference_ids for kind in CARD_KINDS]
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+        self._stats["invalidations"] += len(keys) // len(CARD_KINDS)
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            if keys:
+                pipe.delete(*keys)
+            pipe.incr(PLACE_CARD_VERSION_KEY)
+            self._version = str(pipe.execute()[-1])
+        except Exception as e:
+            print(f"⚠️ 장소 카드 캐시 무효화 실패 (TTL 지나면 갱신): {e}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            local_size = len(self._local)
+        hits = self._stats["local_hits"] + self._stats["redis_hits"]
+        total = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "local_size": local_size,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
+
+
+# 🚀 프로세스 전역 캐시
+_place_card_cache: Optional[PlaceCardCache] = None
+_place_card_cache_lock = threading.Lock()
+
+
+def get_place_card_cache() -> Optional[PlaceCardCache]:
+    """공유 장소 카드 캐시 싱글톤 (PLACE_CARD_CACHE 꺼져 있으면 None)"""
+    global _place_card_cache
+    if _place_card_cache is None and settings.PLACE_CARD_CACHE:
+        with _place_card_cache_lock:
+            if _place_card_cache is None:
+                from app.core.session import redis_client
+
+                _place_card_cache = PlaceCardCache(
+                    max_size=settings.PLACE_CARD_CACHE_SIZE,
+                    ttl_seconds=settings.PLACE_CARD_CACHE_TTL_SECONDS,
+                    version_check_seconds=settings.PLACE_CARD_VERSION_CHECK_SECONDS,
+                    redis=redis_client,
+                )
+    return _place_card_cache
+
+
+def invalidate_place_cards(place_type: int, reference_ids: Iterable[Any]):
+    """
+    KContent / Restaurant / Festival 행을 쓴 뒤 (커밋 후) 호출 - 그 행의 카드 캐시 삭제
+
+    관리자 쓰기 경로를 새로 만들면 notify_catalog_changed 와 같이 호출할 것.
+    """
+    cache = get_place_card_cache()
+    if cache is not None:
+        cache.invalidate(place_type, reference_ids)
+
+
+def _cached_cards(kind: str, place_type: int, reference_ids: List[Any], load) -> Dict[str, Dict[str, Any]]:
+    cache = get_place_card_cache()
+    if cache is None:
+        return load(reference_ids)
+    return cache.get_many(kind, place_type, reference_ids, load)
+
+
+def _load_cards(db: Session, place_type: int, reference_ids: List[Any]) -> Dict[str, Dict[str, Any]]:
+    """place_type 1개의 원본 행을 IN 쿼리 1번으로 → {str(reference_id): 카드}"""
+    model, id_column, build_card = CARD_SOURCES[place_type]
+    try:
+        rows = db.query(model).filter(id_column.in_(reference_ids)).all()
+    except Exception as e:
+        print(f"❌ 원본 데이터 일괄 조회 실패 (place_type={place_type}, {len(reference_ids)}개): {e}")
+        traceback.print_exc()
+        return {}
+    return {str(getattr(row, id_column.key)): build_card(row) for row in rows}
+
+
+def hydrate_places(db: Session, refs: Sequence[Tuple[int, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    (place_type, reference_id) 목록 → 같은 순서의 카드 dict 목록
+
+    Args:
+        db: DB 세션 (스레드풀에서 호출)
+        refs: 추천 순위대로의 (place_type, reference_id)
+
+    Returns:
+        refs와 같은 길이, 원본 행이 없거나 원본 테이블이 없는 타입이면 None
+    """
+    grouped: Dict[int, List[Any]] = {}
+    for place_type, reference_id in refs:
+        if place_type in CARD_SOURCES:
+            grouped.setdefault(place_type, []).append(reference_id)
+
+    cards = {
+        place_type: _cached_cards(
+            "recommend", place_type, list(dict.fromkeys(reference_ids)),
+            lambda missing, place_type=place_type: _load_cards(db, place_type, missing),
+        )
+        for place_type, reference_ids in grouped.items()
+    }
+    return [cards.get(place_type, {}).get(str(reference_id)) for place_type, reference_id in refs]
+
+
+def kcontent_card(db: Session, content_id: int) -> Optional[Dict[str, Any]]:
+    """K-Content 상세 (프론트엔드 카드 형식, 캐시 우선) - 없으면 None"""
+    from app.services.kcontent_data_transform import transform_kcontent_to_frontend_schema
+
+    def _load(content_ids: List[Any]) -> Dict[str, Dict[str, Any]]:
+        rows = db.query(KContent).filter(KContent.content_id.in_(content_ids)).all()
+        return {str(row.content_id): transform_kcontent_to_frontend_schema(row) for row in rows}
+
+    return _cached_cards("kcontent", PlaceType.KCONTENT, [content_id], _load).get(str(content_id))
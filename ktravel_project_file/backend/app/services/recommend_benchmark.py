@@ -0,0 +1,145 @@
+# app/services/recommend_benchmark.py
+"""
+📏 북마크 추천 방식 비교 (지연 시간 + 결과 겹침)
+
+- loop: 예전 방식 - 북마크마다 recommend 1번씩 순서대로, 먼저 나온 것 우선 중복 제거 후 점수순
+- per_bookmark: 컬렉션별 recommend_batch (북마크마다 positive 1개, 점수가 높은 중복 우선)
+- centroid: 컬렉션별 북마크 전체를 positive로 recommend 1번 (평균 벡터)
+- 북마크가 많은 유저부터 N명, 방식마다 repeat번 실행 → p50 / p95 지연, 상위 K개의 loop 대비 겹침(Jaccard)
+- 저장된 추천 목록(user_recommendations)은 거치지 않음
+
+실행:
+    python -m app.services.recommend_benchmark                 # 북마크 많은 유저 20명
+    python -m app.services.recommend_benchmark --users 50 --repeat 5 --top 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Sequence
+
+from app.api.endpoints.recommend import PLACE_TYPE_COLLECTION_MAP, recommend_for_bookmarks
+from app.core.qdrant_client import arecommend
+
+MODES = ("loop", "per_bookmark", "centroid")
+
+
+async def _loop_recommend(bookmarks, limit: int) -> List[tuple]:
+    """예전 엔드포인트와 같은 순서 / 중복 제거 (비교 기준)"""
+    merged: Dict[str, tuple] = {}
+    for b in bookmarks:
+        collection_name = PLACE_TYPE_COLLECTION_MAP.get(b.place_type)
+        if not collection_name:
+            continue
+        try:
+            results = await arecommend(collection_name, [b.reference_id], limit)
+        except Exception as e:
+            print(f"⚠️ recommend 실패 (reference_id={b.reference_id}): {e}")
+            continue
+        for r in results:
+            payload = r.payload or {}
+            rec_reference_id = payload.get("content_id") or payload.get("id") or r.id
+            merged.setdefault(f"{b.place_type}_{rec_reference_id}", (b.place_type, rec_reference_id, r))
+    return sorted(merged.values(), key=lambda item: item[2].score, reverse=True)
+
+
+async def _run_mode(mode: str, bookmarks, limit: int) -> List[tuple]:
+    if mode == "loop":
+        return await _loop_recommend(bookmarks, limit)
+    return await recommend_for_bookmarks(bookmarks, limit, mode=mode)
+
+
+def _top_keys(results: Sequence[tuple], top: int) -> set:
+    return {(place_type, str(reference_id)) for place_type, reference_id, _ in results[:top]}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _load_users(user_count: int, bookmark_limit: int) -> Dict[int, list]:
+    """북마크가 많은 유저 → 최근 북마크 (엔드포인트와 같은 개수)"""
+    from sqlalchemy import func
+
+    from app.database.connection import SessionLocal
+    from app.models.bookmark import Bookmark
+
+    db = SessionLocal()
+    try:
+        user_ids = [
+            user_id for user_id, _ in
+            db.query(Bookmark.user_id, func.count(Bookmark.bookmark_id))
+            .group_by(Bookmark.user_id)
+            .order_by(func.count(Bookmark.bookmark_id).desc())
+            .limit(user_count)
+            .all()
+        ]
+        return {
+            user_id: db.query(Bookmark)
+            .filter(Bookmark.user_id == user_id)
+            .order_by(Bookmark.created_at.desc())
+            .limit(bookmark_limit)
+            .all()
+            for user_id in user_ids
+        }
+    finally:
+        db.close()
+
+
+async def run_benchmark(users: int = 20, repeat: int = 3, top_k_per_bookmark: int = 5,
+                        top: int = 10, bookmark_limit: int = 10) -> Dict[str, Dict[str, float]]:
+    """
+    방식별 지연 시간 / loop 대비 겹침
+
+    Returns:
+        {mode: {"p50_ms", "p95_ms", "avg_results", "overlap_vs_loop"}}
+    """
+    user_bookmarks = _load_users(users, bookmark_limit)
+    latencies: Dict[str, List[float]] = {mode: [] for mode in MODES}
+    counts: Dict[str, List[int]] = {mode: [] for mode in MODES}
+    overlaps: Dict[str, List[float]] = {mode: [] for mode in MODES}
+
+    for user_id, bookmarks in user_bookmarks.items():
+        tops = {}
+        for mode in MODES:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results = await _run_mode(mode, bookmarks, top_k_per_bookmark)
+                latencies[mode].append((time.perf_counter() - start) * 1000)
+            counts[mode].append(len(results))
+            tops[mode] = _top_keys(results, top)
+        for mode in MODES:
+            overlaps[mode].append(_jaccard(tops[mode], tops["loop"]))
+        print(f"👤 user_id={user_id} 북마크 {len(bookmarks)}개 - "
+              + ", ".join(f"{mode} 겹침 {overlaps[mode][-1]:.2f}" for mode in MODES[1:]))
+
+    report = {}
+    for mode in MODES:
+        if not latencies[mode]:
+            continue
+        report[mode] = {
+            "p50_ms": round(statistics.median(latencies[mode]), 1),
+            "p95_ms": round(_percentile(latencies[mode], 0.95), 1),
+            "avg_results": round(statistics.mean(counts[mode]), 1),
+            "overlap_vs_loop": round(statistics.mean(overlaps[mode]), 3),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="북마크 추천 방식 비교 (loop / per_bookmark / centroid)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=5, help="북마크당 추천 개수 (top_k_per_bookmark)")
+    parser.add_argument("--top", type=int, default=10, help="겹침을 비교할 상위 개수")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.users, args.repeat, args.top_k, args.top))
+    print(f"\n{'mode':<14}{'p50_ms':>10}{'p95_ms':>10}{'results':>10}{'overlap@' + str(args.top):>14}")
+    for mode, row in report.items():
+        print(f"{mode:<14}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['avg_results']:>10}{row['overlap_vs_loop']:>14}")
@@ -0,0 +1,124 @@
+# app/services/reservoir.py
+"""
+🎲 랜덤 추천용 포인트 저장소 (프로세스 메모리)
+
+- 컬렉션별로 point ID + 카드에 필요한 최소 필드(제목, 좌표, 썸네일)만 컬럼 배열로 보관
+- "recommend 10 places" 는 메모리에서 균등 샘플링 → Qdrant 호출 없음
+  (기존: 임의 offset부터 payload 전체 100개 scroll 후 shuffle → 전송량 5배, 균등하지도 않음)
+- 로드: payload 필드만 골라서(with_payload=[...]) 전체 scroll, 백그라운드 스레드가 주기적으로 다시 로드
+- 아직 로드 전이면 sample()이 None → 호출하는 쪽이 기존 scroll로 처리
+"""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class PointReservoir:
+    """
+    컬렉션 1개의 ID + 최소 필드 (컬럼 배열)
+
+    사용법:
+        reservoir = PointReservoir("seoul-attraction", ("attr_id", "title", "latitude", "longitude"))
+        reservoir.load(qdrant_client)
+        reservoir.sample(10)   # [{'attr_id': ..., 'title': ..., ...}, ...] (payload.metadata 와 같은 키)
+    """
+
+    def __init__(self, collection_name: str, fields: Tuple[str, ...], page_size: int = 1000):
+        self.collection_name = collection_name
+        self.fields = fields
+        self.page_size = page_size
+
+        # (ids, {필드: 값 리스트}) - 통째로 교체해서 읽는 쪽은 잠금 없이 사용
+        self._snapshot: Tuple[List[Any], Dict[str, List[Any]]] = ([], {})
+        self._loaded_at = 0.0
+
+    def __len__(self):
+        return len(self._snapshot[0])
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at > 0
+
+    def load(self, qdrant_client):
+        """컬렉션 전체를 필요한 필드만 scroll 해서 교체"""
+        start = time.perf_counter()
+        ids: List[Any] = []
+        columns: Dict[str, List[Any]] = {field: [] for field in self.fields}
+
+        offset = None
+        while True:
+            points, offset = qdrant_client.scroll(
+                collection_name=self.collection_name,
+                limit=self.page_size,
+                offset=offset,
+                with_payload=[f"metadata.{field}" for field in self.fields],
+                with_vectors=False,
+            )
+            for point in points:
+                metadata = (point.payload or {}).get("metadata", {})
+                ids.append(point.id)
+                for field in self.fields:
+                    columns[field].append(metadata.get(field))
+            if offset is None or not points:
+                break
+
+        self._snapshot = (ids, columns)
+        self._loaded_at = time.monotonic()
+        print(f"✅ 랜덤 추천 저장소 로드: {self.collection_name} {len(ids)}개 ({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    def sample(self, count: int) -> Optional[List[Dict[str, Any]]]:
+        """중복 없이 균등하게 count개 (로드 전이면 None)"""
+        ids, columns = self._snapshot
+        if not ids:
+            return None
+        picked = random.sample(range(len(ids)), min(count, len(ids)))
+        # 없는 필드는 빼서 호출하는 쪽의 .get(field, 기본값)이 그대로 동작하게
+        return [
+            {field: columns[field][i] for field in self.fields if columns[field][i] is not None}
+            for i in picked
+        ]
+
+
+class ReservoirSet:
+    """search_type → PointReservoir + 주기적 재로드 스레드"""
+
+    def __init__(self, reservoirs: Dict[str, PointReservoir]):
+        self.reservoirs = reservoirs
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats = {"samples": 0, "fallbacks": 0}
+
+    def sample(self, search_type: str, count: int) -> Optional[List[Dict[str, Any]]]:
+        """search_type에서 count개 (저장소가 없거나 비어 있으면 None)"""
+        reservoir = self.reservoirs.get(search_type)
+        items = reservoir.sample(count) if reservoir is not None else None
+        self._stats["samples" if items is not None else "fallbacks"] += 1
+        return items
+
+    def load_all(self, client_factory: Callable[[], Any]):
+        """모든 저장소 로드 (실패한 저장소는 기존 내용 유지)"""
+        for search_type, reservoir in self.reservoirs.items():
+            try:
+                reservoir.load(client_factory())
+            except Exception as e:
+                print(f"⚠️ 랜덤 추천 저장소 로드 실패 ({search_type}, 기존 내용 유지): {e}")
+
+    def start(self, client_factory: Callable[[], Any], refresh_seconds: float = 600.0):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(client_factory, refresh_seconds), name="reservoir-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, client_factory: Callable[[], Any], refresh_seconds: float):
+        while not self._stop.wait(refresh_seconds):
+            self.load_all(client_factory)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, **{f"{t}_size": len(r) for t, r in self.reservoirs.items()}}
@@ -0,0 +1,1070 @@
+# app/services/search.py
+"""
+🔍 검색 공통 모듈 - 채팅 서비스 3종(ChatService / ChatRestService / ChatKContentsService) 공용 검색 엔진
+
+- SearchEngine / get_search_engine: Qdrant 클라이언트(sync/async) 1벌 + 임베딩 캐시 + 컬렉션 프로필
+  검색 관련 캐싱 / 배치 / 지표는 모두 여기에 추가한다.
+- CollectionProfile: 컬렉션별 설정 (제목 필드, 임계값, 보정 테이블, 변형 규칙)
+- SearchQueryContext: 요청 단위 검색어 컨텍스트
+  (검색어 정리/확장은 한 번만, 모든 변형은 embed_documents 한 번으로 임베딩)
+- batch_search: (변형 × 컬렉션) 검색을 컬렉션당 search_batch 1회로 전송
+- abatch_search / SearchQueryContext.aembed: 같은 작업의 네이티브 async 버전
+  (AsyncQdrantClient + asyncio.gather, SSE 제너레이터 안에서 이벤트 루프를 막지 않음)
+- abatch_search_iter / SearchEngine.aprogressive_best: 컬렉션이 끝나는 대로 결과를 내보냄
+  (가장 느린 컬렉션을 기다리지 않고 'found' 전송, 확실한 결과면 나머지 취소 후 바로 생성 시작)
+- 엔티티 바로가기: 키워드가 알려진 이름 1개로 풀리면(app.services.entity_index) 그 타입은 임베딩 / Qdrant 생략
+  (다른 타입은 그대로 검색 - 진행형 검색에서는 고정된 결과가 먼저 나가고, 확실하면 나머지 검색은 바로 취소)
+- 드라마 촬영지 목록: resolve_drama → ascroll_drama (payload 인덱스 필터 scroll, 벡터 검색 없음)
+- 랜덤 추천: sample → 메모리 저장소(app.services.reservoir)에서 균등 샘플링 (Qdrant 호출 없음)
+- 변형 예산: SearchBudget (변형 개수 / 시간 / 확실한 점수) + VariantYield (변형 종류별 채택률 → 기대 수확 순 정렬)
+  첫 변형 묶음만 먼저 임베딩 / 검색하고, 확실하지 않을 때만 나머지 변형을 임베딩 / 검색 (카드 목록 경로는 한 번에)
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from app.core.config import settings
+from app.core.embedding_cache import get_embedding_cache
+from app.services.entity_index import EntityHit, EntityIndex
+from app.services.reservoir import PointReservoir, ReservoirSet
+from app.utils.patterns import PhraseReplacer
+
+load_dotenv()
+
+# 🎯 컬렉션 이름
+FESTIVAL_COLLECTION = "seoul-festival"
+ATTRACTION_COLLECTION = "seoul-attraction"
+RESTAURANT_COLLECTION = "seoul-restaurant"
+KCONTENT_COLLECTION = "seoul-kcontents"
+
+# 드라마 촬영지 필터 scroll 에 쓰는 payload 필드 (keyword 인덱스)
+DRAMA_NAME_FIELDS = ("metadata.drama_name_ko", "metadata.drama_name_en")
+
+# 랜덤 추천 저장소에 보관하는 payload.metadata 필드 (카드 / 마커에 필요한 것만)
+RANDOM_ATTRACTION_FIELDS = ("attr_id", "title", "latitude", "longitude")
+RANDOM_KCONTENT_FIELDS = (
+    "content_id", "drama_name_ko", "drama_name", "location_name_en", "location_name",
+    "thumbnail", "latitude", "longitude",
+)
+
+# 점수 = 벡터 유사도 * 0.8 + 키워드 겹침 * 0.2
+VECTOR_WEIGHT = 0.8
+KEYWORD_WEIGHT = 0.2
+
+
+class SearchQueryContext:
+    """
+    요청 단위 검색어 컨텍스트
+
+    한 메시지에서 여러 컬렉션(festival/attraction/restaurant/kcontent)을 검색할 때
+    타입별 변형을 미리 계산하고, 중복 없는 변형 전체를 한 번의 배치로 임베딩한다.
+    각 컬렉션 검색은 여기서 벡터를 꺼내 재사용한다.
+    """
+
+    def __init__(self, keyword: str, processed: Dict[str, Tuple[str, List[str]]]):
+        """
+        Args:
+            keyword: 원본 키워드
+            processed: {search_type: (정리된 검색어, 검색 변형 리스트)}
+        """
+        self.keyword = keyword
+        self._processed = processed
+        self._vectors: Dict[str, List[float]] = {}
+        self._results: Dict[str, Dict[str, list]] = {}
+        self.exact_hit: Optional[EntityHit] = None
+        self.deadline: Optional[float] = None  # perf_counter 기준 (None이면 시간 예산 없음)
+        self.budget_events = {"early_stops": 0, "budget_timeouts": 0, "variants_unsent": 0}
+
+    def cleaned_query(self, search_type: str) -> str:
+        """타입별 정리된 검색어 (키워드 점수 계산용)"""
+        return self._processed[search_type][0]
+
+    def variants(self, search_type: str) -> List[str]:
+        """타입별 검색 변형들"""
+        return self._processed[search_type][1]
+
+    def all_variants(self, search_types: Optional[List[str]] = None) -> List[str]:
+        """모든 타입(search_types를 주면 그 타입들)의 변형 (중복 제거, 순서 유지)"""
+        return self.head_variants(None, search_types)
+
+    def head_variants(self, first_stage: Optional[int], search_types: Optional[List[str]] = None) -> List[str]:
+        """타입별 앞쪽 first_stage개 변형 (None이면 전부, 중복 제거, 순서 유지)"""
+        unique = {}
+        for search_type, (_, variants) in self._processed.items():
+            if search_types is not None and search_type not in search_types:
+                continue
+            for variant in variants[:first_stage]:
+                unique[variant] = True
+        return list(unique)
+
+    def unsearched(self, search_types: List[str]) -> List[str]:
+        """아직 결과가 없는 타입 (별칭으로 고정된 타입 제외)"""
+        return [search_type for search_type in search_types if search_type not in self._results]
+
+    def pinned(self, search_type: str) -> bool:
+        """이 타입의 결과가 별칭으로 고정된 엔티티인지"""
+        return self.exact_hit is not None and self.exact_hit.search_type == search_type
+
+    def embed(self, embedding_model, variants: Optional[List[str]] = None) -> "SearchQueryContext":
+        """모든 변형(variants를 주면 그 변형만)을 한 번의 embed_documents 호출로 임베딩"""
+        variants = [v for v in (self.all_variants() if variants is None else variants) if v not in self._vectors]
+        if not variants:
+            return self
+        try:
+            vectors = embedding_model.embed_documents(variants)
+            self._vectors.update(zip(variants, vectors))
+            print(f"🧮 변형 {len(variants)}개 배치 임베딩 완료")
+        except Exception as e:
+            print(f"⚠️ 배치 임베딩 실패: {e}")
+        return self
+
+    async def aembed(self, embedding_model, variants: Optional[List[str]] = None) -> "SearchQueryContext":
+        """embed()의 async 버전 (aembed_documents 사용, variants를 주면 그 변형만)"""
+        variants = [v for v in (self.all_variants() if variants is None else variants) if v not in self._vectors]
+        if not variants:
+            return self
+        try:
+            vectors = await embedding_model.aembed_documents(variants)
+            self._vectors.update(zip(variants, vectors))
+            print(f"🧮 변형 {len(variants)}개 배치 임베딩 완료 (async)")
+        except Exception as e:
+            print(f"⚠️ 배치 임베딩 실패: {e}")
+        return self
+
+    def searchable_variants(self, search_type: str, variants: Optional[List[str]] = None) -> List[str]:
+        """임베딩이 있는 변형만 (없는 변형은 경고 후 제외, variants를 주면 그 중에서)"""
+        searchable = []
+        for variant in self.variants(search_type) if variants is None else variants:
+            if self.vector(variant) is None:
+                print(f"⚠️ 변형 '{variant}' 임베딩 없음 - 건너뜀")
+                continue
+            searchable.append(variant)
+        return searchable
+
+    def search_requests(self, variants: List[str], limit: int, score_threshold: float) -> List[models.SearchRequest]:
+        """변형별 SearchRequest 목록 (search_batch 입력)"""
+        return [
+            models.SearchRequest(
+                vector=self.vector(variant),
+                limit=limit,
+                score_threshold=score_threshold,
+                with_payload=True,
+                with_vector=False,
+            )
+            for variant in variants
+        ]
+
+    def remaining(self) -> Optional[float]:
+        """시간 예산 남은 초 (예산 없으면 None)"""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.perf_counter(), 0.0)
+
+    def vector(self, variant: str) -> Optional[List[float]]:
+        """변형의 임베딩 벡터 (없으면 None)"""
+        return self._vectors.get(variant)
+
+    def results(self, search_type: str) -> Optional[Dict[str, list]]:
+        """타입별 검색 결과 {변형: [ScoredPoint, ...]} (아직 검색 전이면 None)"""
+        return self._results.get(search_type)
+
+    def set_results(self, search_type: str, variant_results: Dict[str, list]):
+        self._results[search_type] = variant_results
+
+    def pin(self, hit: EntityHit) -> "SearchQueryContext":
+        """별칭으로 찾은 엔티티를 그 타입의 검색 결과로 고정 (다른 타입은 그대로 검색)"""
+        self.exact_hit = hit
+        self._results[hit.search_type] = {self.keyword: [hit.to_point()]}
+        return self
+
+
+def batch_search(
+    qdrant_client,
+    context: SearchQueryContext,
+    collections: Dict[str, str],
+    limit: int = 5,
+    score_threshold: float = 0.3,
+) -> SearchQueryContext:
+    """
+    (변형 × 컬렉션) 검색을 컬렉션당 search_batch 한 번으로 실행하고 결과를 context에 저장
+
+    Args:
+        qdrant_client: Qdrant 클라이언트
+        context: 임베딩이 끝난 SearchQueryContext
+        collections: {search_type: collection_name}
+        limit: 변형당 결과 개수
+        score_threshold: 벡터 유사도 하한
+
+    Returns:
+        결과가 채워진 context (context.results(search_type)로 조회)
+    """
+    def _search_collection(search_type: str, collection_name: str):
+        variants = context.searchable_variants(search_type)
+        if not variants:
+            return search_type, {}
+
+        requests = context.search_requests(variants, limit, score_threshold)
+        try:
+            responses = qdrant_client.search_batch(collection_name=collection_name, requests=requests)
+        except Exception as e:
+            print(f"⚠️ '{collection_name}' 배치 검색 실패: {e}")
+            return search_type, {}
+
+        return search_type, dict(zip(variants, responses))
+
+    if len(collections) == 1:
+        search_type, collection_name = next(iter(collections.items()))
+        context.set_results(*_search_collection(search_type, collection_name))
+        return context
+
+    # 컬렉션별 배치 요청은 병렬로 (왕복 횟수 = 컬렉션 수)
+    with ThreadPoolExecutor(max_workers=len(collections)) as executor:
+        futures = [
+            executor.submit(_search_collection, search_type, collection_name)
+            for search_type, collection_name in collections.items()
+        ]
+        for future in futures:
+            context.set_results(*future.result())
+
+    return context
+
+
+async def _asearch_variants(
+    async_qdrant_client,
+    context: SearchQueryContext,
+    search_type: str,
+    collection_name: str,
+    variants: List[str],
+    limit: int,
+    score_threshold: float,
+) -> Dict[str, list]:
+    """변형 묶음 1개를 search_batch 1회로 (임베딩 없는 변형은 제외, 실패하면 빈 결과)"""
+    variants = context.searchable_variants(search_type, variants)
+    if not variants:
+        return {}
+    try:
+        responses = await async_qdrant_client.search_batch(
+            collection_name=collection_name, requests=context.search_requests(variants, limit, score_threshold)
+        )
+    except Exception as e:
+        print(f"⚠️ '{collection_name}' 배치 검색 실패: {e}")
+        return {}
+    return dict(zip(variants, responses))
+
+
+async def _asearch_collection(
+    async_qdrant_client,
+    context: SearchQueryContext,
+    search_type: str,
+    collection_name: str,
+    limit: int,
+    score_threshold: float,
+    stop_when: Optional[Callable[[str, Dict[str, list]], bool]] = None,
+    first_stage: int = 1,
+    embedding_model=None,
+) -> Tuple[str, Dict[str, list]]:
+    """
+    컬렉션 1개의 변형을 search_batch로 (실패하면 빈 결과)
+
+    stop_when이 있으면 앞쪽 first_stage개 변형만 먼저 검색하고, stop_when이 참이면 나머지 변형은
+    임베딩도 검색 요청도 하지 않는다. 아니면 나머지 변형을 (embedding_model이 있으면 그때 임베딩해서)
+    한 번 더 search_batch - context의 시간 예산 안에 끝난 경우에만 사용.
+    """
+    variants = context.variants(search_type)
+    if stop_when is None or len(variants) <= first_stage:
+        if embedding_model is not None:
+            await context.aembed(embedding_model, variants)
+        return search_type, await _asearch_variants(
+            async_qdrant_client, context, search_type, collection_name, variants, limit, score_threshold
+        )
+
+    head, rest = variants[:first_stage], variants[first_stage:]
+    if embedding_model is not None:
+        await context.aembed(embedding_model, head)
+    results = await _asearch_variants(
+        async_qdrant_client, context, search_type, collection_name, head, limit, score_threshold
+    )
+    if results and stop_when(search_type, results):
+        context.budget_events["early_stops"] += 1
+        context.budget_events["variants_unsent"] += len(rest)
+        print(f"⚡ '{collection_name}' 확실한 결과 - 나머지 변형 {len(rest)}개 검색 안 함")
+        return search_type, results
+
+    if context.remaining() == 0:
+        context.budget_events["budget_timeouts"] += 1
+        context.budget_events["variants_unsent"] += len(rest)
+        print(f"⏱️ '{collection_name}' 시간 예산 소진 - 나머지 변형 {len(rest)}개 검색 안 함")
+        return search_type, results
+
+    async def _search_rest() -> Dict[str, list]:
+        if embedding_model is not None:
+            await context.aembed(embedding_model, rest)
+        return await _asearch_variants(
+            async_qdrant_client, context, search_type, collection_name, rest, limit, score_threshold
+        )
+
+    try:
+        results.update(await asyncio.wait_for(_search_rest(), context.remaining()))
+    except asyncio.TimeoutError:
+        context.budget_events["budget_timeouts"] += 1
+        print(f"⏱️ '{collection_name}' 시간 예산 초과 - 나머지 변형 {len(rest)}개 결과 버림")
+    return search_type, results
+
+
+async def abatch_search(
+    async_qdrant_client,
+    context: SearchQueryContext,
+    collections: Dict[str, str],
+    limit: int = 5,
+    score_threshold: float = 0.3,
+    stop_when: Optional[Callable[[str, Dict[str, list]], bool]] = None,
+    first_stage: int = 1,
+    embedding_model=None,
+) -> SearchQueryContext:
+    """
+    batch_search의 async 버전 - 컬렉션별 search_batch를 asyncio.gather로 동시에 실행
+
+    호출한 태스크가 취소되면(클라이언트 연결 끊김 등) gather가 진행 중인
+    컬렉션 요청도 함께 취소한다. 개별 컬렉션 실패는 빈 결과로 처리.
+
+    Args:
+        async_qdrant_client: AsyncQdrantClient
+        context: 임베딩이 끝난 SearchQueryContext
+        collections: {search_type: collection_name}
+        limit: 변형당 결과 개수
+        score_threshold: 벡터 유사도 하한
+        stop_when: (search_type, 앞쪽 변형 결과) → 참이면 나머지 변형은 검색 안 함 (None이면 한 번에 검색)
+        first_stage: stop_when을 확인할 앞쪽 변형 개수
+        embedding_model: 있으면 아직 임베딩 안 된 변형을 검색 직전에 임베딩 (나머지 변형은 필요할 때만)
+    """
+    results = await asyncio.gather(*(
+        _asearch_collection(
+            async_qdrant_client, context, search_type, collection_name, limit, score_threshold, stop_when, first_stage,
+            embedding_model,
+        )
+        for search_type, collection_name in collections.items()
+    ))
+    for search_type, variant_results in results:
+        context.set_results(search_type, variant_results)
+
+    return context
+
+
+async def abatch_search_iter(
+    async_qdrant_client,
+    context: SearchQueryContext,
+    collections: Dict[str, str],
+    limit: int = 5,
+    score_threshold: float = 0.3,
+    stop_when: Optional[Callable[[str, Dict[str, list]], bool]] = None,
+    first_stage: int = 1,
+    embedding_model=None,
+) -> AsyncIterator[str]:
+    """
+    abatch_search와 같지만 컬렉션이 끝나는 순서대로 search_type을 yield (as_completed)
+
+    yield 시점에 그 컬렉션 결과는 이미 context에 들어 있다.
+    중간에 그만 받으면(aclose) 아직 진행 중인 컬렉션 요청은 취소한다.
+    """
+    tasks = [
+        asyncio.ensure_future(_asearch_collection(
+            async_qdrant_client, context, search_type, collection_name, limit, score_threshold, stop_when, first_stage,
+            embedding_model,
+        ))
+        for search_type, collection_name in collections.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            search_type, variant_results = await next_done
+            context.set_results(search_type, variant_results)
+            yield search_type
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+# ===== 검색어 처리 =====
+
+# 불용어 (너무 많이 빼면 장소명이 깨져서 최소한만)
+STOPWORDS = frozenset({"a", "an", "the", "me", "to", "introduce"})
+
+# 일반 관광지/축제/레스토랑 보정
+PLACE_CORRECTIONS = {
+    # 일반 장소명
+    "namsan tower": "namsan seoul tower",
+    "n tower": "namsan seoul tower",
+    "seoul tower": "namsan seoul tower",
+    "63 building": "63빌딩",
+    "lotte tower": "lotte world tower",
+    "dongdaemun": "dongdaemun design plaza",
+    "myeongdong": "myeongdong shopping street",
+    "gangnam": "gangnam district",
+    "hongdae": "hongik university area",
+    "bukchon": "bukchon hanok village",
+    "insadong": "insadong cultural street",
+    "itaewon": "itaewon global village",
+
+    # 음식 종류
+    "korean bbq": "korean barbecue",
+    "korean food": "korean restaurant",
+    "chinese food": "chinese restaurant",
+    "japanese food": "japanese restaurant",
+    "italian food": "italian restaurant",
+
+    # 지역명 + 음식점
+    "hongdae food": "hongik university restaurant",
+    "hongdae food scene": "hongik university dining",
+    "gangnam food": "gangnam district restaurant",
+    "gangnam korean bbq": "gangnam barbecue",
+    "myeongdong food": "myeongdong restaurant",
+    "itaewon food": "itaewon international restaurant",
+    "itaewon restaurants": "itaewon global dining",
+    "insadong food": "insadong traditional restaurant",
+    "yeouido food": "yeouido business district restaurant",
+}
+
+# K-Drama/K-Content 보정 (영어 제목 → 한글)
+KCONTENT_CORRECTIONS = {
+    "crash landing on you": "사랑의 불시착",
+    "itaewon class": "이태원 클라쓰",
+    "kingdom": "킹덤",
+    "goblin": "도깨비",
+    "descendants of the sun": "태양의 후예",
+    "my love from the star": "별에서 온 그대",
+    "mom's friend's son": "엄마친구아들",
+    "divorce insurance": "이혼보험",
+
+    # 일반 용어
+    "filming location": "촬영지",
+    "drama location": "드라마 촬영지",
+    "kdrama": "한국 드라마",
+    "k-drama": "한국 드라마",
+}
+
+# 장소 변형용 영어 → 한글
+PLACE_TRANSLATIONS = {
+    "tower": "타워", "palace": "궁", "temple": "사",
+    "market": "시장", "park": "공원", "restaurant": "맛집", "food": "음식"
+}
+
+
+def expand_place_terms(query: str) -> List[str]:
+    """관광지/축제/레스토랑 검색어 변형 (서울 붙이기 + 영어→한글)"""
+    variants = [query]
+    query_lower = query.lower()
+
+    if "seoul" not in query_lower and len(query.split()) <= 2:
+        variants.extend([f"{query} seoul", f"seoul {query}"])
+
+    for english, korean in PLACE_TRANSLATIONS.items():
+        if english in query_lower:
+            variants.append(query.replace(english, korean).replace(english.title(), korean))
+
+    return list(dict.fromkeys(variants))
+
+
+def expand_kcontent_terms(query: str) -> List[str]:
+    """K-Content 검색어 변형 (촬영지/드라마 한글화)"""
+    variants = [query]
+    query_lower = query.lower()
+
+    if "filming" in query_lower or "location" in query_lower:
+        variants.append(query.replace("filming location", "촬영지"))
+        variants.append(query.replace("location", "장소"))
+    if "drama" in query_lower:
+        variants.append(query.replace("drama", "드라마"))
+
+    return list(dict.fromkeys(variants))
+
+
+def keyword_overlap(query: str, title: str) -> float:
+    """키워드 겹치는 정도 (Jaccard)"""
+    query_words = set(query.lower().split())
+    title_words = set(title.lower().split())
+
+    total = len(query_words | title_words)
+    return len(query_words & title_words) / total if total > 0 else 0
+
+
+def variant_kind(query: str, variant: str) -> str:
+    """변형 종류 (채택률 집계 단위): original / seoul_suffix / seoul_prefix / rewrite(번역·치환)"""
+    if variant == query:
+        return "original"
+    if variant == f"{query} seoul":
+        return "seoul_suffix"
+    if variant == f"seoul {query}":
+        return "seoul_prefix"
+    return "rewrite"
+
+
+class SearchBudget:
+    """
+    요청 1개의 변형 검색 예산 (0 / None이면 해당 제한 없음)
+
+    Args:
+        max_variants: 타입별 최대 변형 수 (기대 수확 순으로 자름 → 임베딩 / 검색 모두 줄어듦)
+        first_stage: 먼저 확인할 앞쪽 변형 수
+        certain_score: 앞쪽 변형의 결합 점수가 이 값 이상이면 나머지 변형 취소
+        max_ms: 요청 시작부터 나머지 변형을 기다리는 최대 시간
+    """
+
+    def __init__(self, max_variants: int = 0, first_stage: int = 1, certain_score: float = 0.0, max_ms: int = 0):
+        self.max_variants = max_variants
+        self.first_stage = max(first_stage, 1)
+        self.certain_score = certain_score
+        self.max_ms = max_ms
+
+
+class VariantYield:
+    """
+    (search_type, 변형 종류)별 검색 / 채택 횟수 → 기대 수확(채택률) 순 정렬
+
+    - 채택률 = (채택 + 1) / (검색 + 2) → 처음엔 모두 같아서 확장 함수 순서 그대로 (원본 검색어 먼저)
+    - winner_rank: 채택된 변형의 순위 분포 (max_variants 조정용 - 뒤쪽 순위가 거의 없으면 줄여도 됨)
+    """
+
+    def __init__(self):
+        self._tried: Dict[Tuple[str, str], int] = {}
+        self._wins: Dict[Tuple[str, str], int] = {}
+        self._winner_rank: Dict[int, int] = {}
+
+    def expected(self, search_type: str, kind: str) -> float:
+        key = (search_type, kind)
+        return (self._wins.get(key, 0) + 1) / (self._tried.get(key, 0) + 2)
+
+    def order(self, search_type: str, query: str, variants: List[str]) -> List[str]:
+        """기대 수확 높은 순 (같으면 원래 순서)"""
+        return sorted(variants, key=lambda v: -self.expected(search_type, variant_kind(query, v)))
+
+    def record(self, search_type: str, query: str, searched: List[str], winner: str):
+        """검색한 변형들 중 winner가 채택됨"""
+        for variant in searched:
+            key = (search_type, variant_kind(query, variant))
+            self._tried[key] = self._tried.get(key, 0) + 1
+        key = (search_type, variant_kind(query, winner))
+        self._wins[key] = self._wins.get(key, 0) + 1
+        if winner in searched:
+            rank = searched.index(winner)
+            self._winner_rank[rank] = self._winner_rank.get(rank, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "variant_yield": {
+                f"{search_type}:{kind}": f"{self._wins.get((search_type, kind), 0)}/{tried}"
+                for (search_type, kind), tried in sorted(self._tried.items())
+            },
+            "winner_rank": dict(sorted(self._winner_rank.items())),
+        }
+
+
+class CollectionProfile:
+    """
+    컬렉션별 검색 설정
+
+    Args:
+        search_type: 'festival' / 'attraction' / 'restaurant' / 'kcontent'
+        collection_name: Qdrant 컬렉션
+        title_fields: 키워드 점수에 쓰는 payload.metadata 필드들 (공백으로 이어 붙임)
+        threshold: 단일 결과 채택 임계값 (결합 점수)
+        multi_threshold: 다중 결과(카드 목록) 임계값
+        corrections: 검색어 보정 테이블
+        expand: 검색어 변형 함수
+    """
+
+    def __init__(
+        self,
+        search_type: str,
+        collection_name: str,
+        title_fields: Tuple[str, ...],
+        threshold: float,
+        corrections: Dict[str, str],
+        expand: Callable[[str], List[str]],
+        multi_threshold: Optional[float] = None,
+        stopwords: frozenset = STOPWORDS,
+    ):
+        self.search_type = search_type
+        self.collection_name = collection_name
+        self.title_fields = title_fields
+        self.threshold = threshold
+        self.multi_threshold = threshold if multi_threshold is None else multi_threshold
+        self.corrections = corrections
+        self._replacer = PhraseReplacer(corrections)  # 보정 테이블은 한 번만 컴파일
+        self.expand = expand
+        self.stopwords = stopwords
+
+    def normalize(self, query: str) -> str:
+        """불용어 제거 + 보정 테이블 적용"""
+        words = [w for w in query.lower().split() if w not in self.stopwords]
+        cleaned_query = " ".join(words) if words else query
+
+        return self._replacer.replace(cleaned_query, log=True)
+
+    def title(self, result) -> str:
+        """검색 결과의 제목 (키워드 점수용)"""
+        metadata = (result.payload or {}).get("metadata", {})
+        return " ".join(str(metadata.get(field) or "") for field in self.title_fields).strip()
+
+    def score(self, cleaned_query: str, result) -> float:
+        """결합 점수 (벡터 + 키워드)"""
+        return result.score * VECTOR_WEIGHT + keyword_overlap(cleaned_query, self.title(result)) * KEYWORD_WEIGHT
+
+
+SEARCH_PROFILES: Dict[str, CollectionProfile] = {
+    "festival": CollectionProfile(
+        "festival", FESTIVAL_COLLECTION, ("title",),
+        threshold=0.5, corrections=PLACE_CORRECTIONS, expand=expand_place_terms,
+    ),
+    "attraction": CollectionProfile(
+        "attraction", ATTRACTION_COLLECTION, ("title",),
+        threshold=0.5, corrections=PLACE_CORRECTIONS, expand=expand_place_terms,
+    ),
+    "restaurant": CollectionProfile(
+        "restaurant", RESTAURANT_COLLECTION, ("name",),
+        threshold=0.5, corrections=PLACE_CORRECTIONS, expand=expand_place_terms,
+    ),
+    "kcontent": CollectionProfile(
+        "kcontent", KCONTENT_COLLECTION, ("drama_name_ko", "location_name_en"),
+        threshold=0.4, multi_threshold=0.35,  # 다중 검색은 조금 낮은 임계값
+        corrections=KCONTENT_CORRECTIONS, expand=expand_kcontent_terms,
+    ),
+}
+
+
+# ===== 검색 엔진 =====
+
+class SearchEngine:
+    """
+    채팅 서비스 공용 검색 엔진
+
+    - Qdrant 클라이언트(sync/async)는 프로세스당 1개씩 (커넥션 풀 공유)
+    - 요청 단위: context() → (a)retrieve() → best_match() / matches()
+    """
+
+    def __init__(
+        self,
+        profiles: Dict[str, CollectionProfile],
+        qdrant_url: str,
+        qdrant_api_key: Optional[str] = None,
+        entities: Optional[EntityIndex] = None,
+        reservoirs: Optional[ReservoirSet] = None,
+        budget: Optional[SearchBudget] = None,
+    ):
+        self.profiles = profiles
+        self.qdrant_url = qdrant_url
+        self.qdrant_api_key = qdrant_api_key or None
+        self.entities = entities
+        self.reservoirs = reservoirs
+        self.budget = budget or SearchBudget()
+        self.variant_yield = VariantYield()
+        self._client: Optional[QdrantClient] = None
+        self._async_client: Optional[AsyncQdrantClient] = None
+        self._lock = threading.Lock()
+        self._stats = {"retrieves": 0, "collection_searches": 0, "matches": 0, "misses": 0, "exact_hits": 0, "drama_scrolls": 0, "early_starts": 0, "variants_skipped": 0, "early_stops": 0, "budget_timeouts": 0, "variants_unsent": 0, "retrieve_ms": 0.0}
+
+    # ----- 클라이언트 -----
+
+    @property
+    def client(self) -> QdrantClient:
+        """QdrantClient 싱글톤 - 클라우드(API 키)/로컬 자동 선택"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = QdrantClient(url=self.qdrant_url, api_key=self.qdrant_api_key, timeout=60, prefer_grpc=False)
+                    print(f"✅ Qdrant {'Cloud' if self.qdrant_api_key else 'Local'} 연결: {self.qdrant_url}")
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """AsyncQdrantClient 싱글톤 (스트리밍 경로용)"""
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(url=self.qdrant_url, api_key=self.qdrant_api_key, timeout=60, prefer_grpc=False)
+            print(f"✅ Qdrant Async 연결: {self.qdrant_url}")
+        return self._async_client
+
+    async def aclose(self):
+        """앱 종료 시 AsyncQdrantClient 커넥션 풀 정리"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    @property
+    def embedding_model(self):
+        """임베딩 모델 (공유 2단계 캐시)"""
+        return get_embedding_cache()
+
+    def collection_name(self, search_type: str) -> str:
+        return self.profiles[search_type].collection_name
+
+    def collections(self, search_types: List[str]) -> Dict[str, str]:
+        return {t: self.profiles[t].collection_name for t in search_types}
+
+    # ----- 요청 단위 검색 -----
+
+    def context(self, keyword: str, search_types: List[str], exact: bool = True) -> SearchQueryContext:
+        """
+        타입별 검색어 정리 + 변형 계산 (임베딩 전)
+
+        변형은 기대 수확 순으로 정렬 후 budget.max_variants개까지만 (나머지는 임베딩도 안 함).
+        exact=True 이고 키워드가 알려진 엔티티 1개로 풀리면 결과를 바로 채운다 (context.exact_hit).
+        카드 목록(다중 결과)처럼 여러 개가 필요한 경로는 exact=False.
+        """
+        processed = {}
+        for search_type in search_types:
+            profile = self.profiles[search_type]
+            cleaned_query = profile.normalize(keyword)
+            variants = self.variant_yield.order(search_type, cleaned_query, profile.expand(cleaned_query))
+            if self.budget.max_variants and len(variants) > self.budget.max_variants:
+                self._stats["variants_skipped"] += len(variants) - self.budget.max_variants
+                variants = variants[:self.budget.max_variants]
+            processed[search_type] = (cleaned_query, variants)
+        context = SearchQueryContext(keyword, processed)
+        if self.budget.max_ms:
+            context.deadline = time.perf_counter() + self.budget.max_ms / 1000
+
+        if exact and self.entities is not None:
+            hit = self.entities.resolve(keyword, search_types)
+            if hit is not None:
+                self._stats["exact_hits"] += 1
+                context.pin(hit)
+        return context
+
+    def retrieve(
+        self,
+        keyword: str,
+        search_types: List[str],
+        limit: int = 5,
+        context: Optional[SearchQueryContext] = None,
+        exact: bool = True,
+    ) -> SearchQueryContext:
+        """배치 임베딩 1회 + 컬렉션당 search_batch 1회 (컬렉션끼리는 병렬)"""
+        start = time.perf_counter()
+        context = context or self.context(keyword, search_types, exact=exact)
+        pending = context.unsearched(search_types)
+        if not pending:
+            return context
+        context.embed(self.embedding_model, context.all_variants(pending))
+        batch_search(self.client, context, self.collections(pending), limit=limit)
+        self._record_retrieve(context, len(pending), start)
+        return context
+
+    async def aretrieve(self, keyword: str, search_types: List[str], limit: int = 5, exact: bool = True) -> SearchQueryContext:
+        """
+        async 검색: 변형 계산 → aembed_documents → 컬렉션별 search_batch (asyncio.gather)
+
+        결과가 채워진 context를 반환하므로 이후 best_match / matches 는 점수 계산만 한다.
+        엔티티 바로가기에 걸린 타입은 임베딩 / Qdrant 호출 없이 채우고, 나머지 타입만 검색.
+        """
+        start = time.perf_counter()
+        context = self.context(keyword, search_types, exact=exact)
+        pending = context.unsearched(search_types)
+        if not pending:
+            return context
+        # 카드 목록(exact=False)은 여러 개가 필요 → 앞쪽 변형이 확실해도 나머지까지 검색
+        stop_when = self._certainty(context) if exact else None
+        await context.aembed(
+            self.embedding_model, context.head_variants(self.budget.first_stage if stop_when else None, pending)
+        )
+        await abatch_search(
+            self.async_client, context, self.collections(pending), limit=limit,
+            stop_when=stop_when, first_stage=self.budget.first_stage, embedding_model=self.embedding_model,
+        )
+        self._record_retrieve(context, len(pending), start)
+        return context
+
+    async def aiter_retrieve(
+        self, keyword: str, search_types: List[str], limit: int = 5
+    ) -> AsyncIterator[Tuple[str, SearchQueryContext]]:
+        """
+        aretrieve와 같지만 컬렉션이 끝나는 순서대로 (search_type, context)를 yield
+
+        별칭으로 고정된 타입은 임베딩 전에 먼저 yield (확실하면 호출한 쪽이 그만 받아서 나머지 검색 취소)
+        """
+        start = time.perf_counter()
+        context = self.context(keyword, search_types)
+        pending = context.unsearched(search_types)
+        for search_type in search_types:
+            if search_type not in pending:
+                yield search_type, context
+        if not pending:
+            return
+
+        stop_when = self._certainty(context)
+        await context.aembed(
+            self.embedding_model, context.head_variants(self.budget.first_stage if stop_when else None, pending)
+        )
+        stream = abatch_search_iter(
+            self.async_client, context, self.collections(pending), limit=limit,
+            stop_when=stop_when, first_stage=self.budget.first_stage, embedding_model=self.embedding_model,
+        )
+        try:
+            async for search_type in stream:
+                yield search_type, context
+        finally:
+            await stream.aclose()
+            self._record_retrieve(context, len(pending), start)
+
+    async def aprogressive_best(
+        self,
+        keyword: str,
+        searchers: Dict[str, Callable[[str, SearchQueryContext], Optional[Dict[str, Any]]]],
+        early_score: float = 0.0,
+        limit: int = 5,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        컬렉션이 끝날 때마다 지금까지의 최고 결과가 바뀌면 yield (마지막으로 yield한 것이 최종 결과)
+
+        Args:
+            keyword: 검색 키워드
+            searchers: {search_type: (keyword, context) → 포맷된 결과 dict 또는 None}
+                       순서는 동점일 때 우선순위 (기존 results.sort 와 같음)
+            early_score: 최고 결과의 similarity_score가 이 값 이상이면 나머지 컬렉션을 취소하고 종료 (0이면 끔)
+        """
+        order = list(searchers)
+        best_key = None
+        stream = self.aiter_retrieve(keyword, order, limit=limit)
+        try:
+            async for search_type, context in stream:
+                result = searchers[search_type](keyword, context)
+                if not result:
+                    continue
+                key = (result["similarity_score"], -order.index(search_type))
+                if best_key is not None and key <= best_key:
+                    continue
+                best_key = key
+                yield result
+                if early_score and result["similarity_score"] >= early_score:
+                    self._stats["early_starts"] += 1
+                    print(f"⚡ 확실한 결과 ({search_type}, {result['similarity_score']:.3f}) - 나머지 컬렉션 취소")
+                    break
+        finally:
+            await stream.aclose()
+
+    def _certainty(self, context: SearchQueryContext) -> Optional[Callable[[str, Dict[str, list]], bool]]:
+        """앞쪽 변형 결과 중 결합 점수가 budget.certain_score 이상인 것이 있는지 (끄면 None)"""
+        if not self.budget.certain_score:
+            return None
+
+        def stop_when(search_type: str, variant_results: Dict[str, list]) -> bool:
+            profile = self.profiles[search_type]
+            cleaned_query = context.cleaned_query(search_type)
+            return any(
+                profile.score(cleaned_query, result) >= self.budget.certain_score
+                for search_results in variant_results.values()
+                for result in search_results
+            )
+
+        return stop_when
+
+    def _ensure_results(
+        self, keyword: str, search_type: str, context: Optional[SearchQueryContext], limit: int, exact: bool = True
+    ) -> SearchQueryContext:
+        """context에 해당 타입 결과가 없으면 (sync) 검색해서 채움"""
+        if context is None:
+            context = self.context(keyword, [search_type], exact=exact)
+        if context.results(search_type) is None:
+            self.retrieve(keyword, [search_type], limit=limit, context=context)
+        return context
+
+    def best_match(self, keyword: str, search_type: str, context: Optional[SearchQueryContext] = None) -> Optional[Any]:
+        """
+        변형별 결과 중 결합 점수가 가장 높은 1개 (임계값 미만이면 None)
+
+        context에 이미 결과가 있으면 점수 계산만 한다.
+        """
+        try:
+            print(f"🔍 검색 시작: '{keyword}' (타입: {search_type})")
+            profile = self.profiles[search_type]
+            context = self._ensure_results(keyword, search_type, context, limit=5)
+            cleaned_query = context.cleaned_query(search_type)
+            print(f"🔧 검색 변형들: {context.variants(search_type)}")
+
+            best_result = None
+            best_score = 0
+            best_variant = None
+            variant_results = context.results(search_type)
+            for variant, search_results in variant_results.items():
+                for result in search_results:
+                    combined_score = profile.score(cleaned_query, result)
+                    if combined_score > best_score:
+                        best_score = combined_score
+                        best_result = result
+                        best_variant = variant
+                        print(f"✅ 더 좋은 결과: '{variant}' → 점수: {combined_score:.3f}")
+
+            if best_result and best_score > profile.threshold:
+                self._stats["matches"] += 1
+                if not context.pinned(search_type):
+                    searched = [v for v in context.variants(search_type) if v in variant_results]
+                    self.variant_yield.record(search_type, cleaned_query, searched, best_variant)
+                return best_result
+
+            self._stats["misses"] += 1
+            print(f"❌ 유효한 결과 없음 (최고 점수: {best_score:.3f})")
+            return None
+
+        except Exception as e:
+            print(f"❌ 검색 오류: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def matches(
+        self,
+        keyword: str,
+        search_type: str,
+        context: Optional[SearchQueryContext] = None,
+        limit: int = 20,
+        dedupe_field: str = "content_id",
+    ) -> List[Tuple[float, Any]]:
+        """
+        다중 결과 (카드 목록용) - 다중 임계값을 넘은 결과를 점수순으로
+
+        Returns:
+            [(결합 점수, ScoredPoint), ...] (payload.metadata[dedupe_field] 기준 중복 제거)
+        """
+        profile = self.profiles[search_type]
+        context = self._ensure_results(keyword, search_type, context, limit=30, exact=False)  # 더 많이 가져와서 선별
+        cleaned_query = context.cleaned_query(search_type)
+
+        scored = []
+        seen = set()
+        for search_results in context.results(search_type).values():
+            for result in search_results:
+                key = (result.payload or {}).get("metadata", {}).get(dedupe_field, result.id)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                combined_score = profile.score(cleaned_query, result)
+                if combined_score > profile.multi_threshold:
+                    scored.append((combined_score, result))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:limit]
+
+    # ----- 드라마 촬영지 (필터 scroll) -----
+
+    def resolve_drama(self, keyword: str) -> Optional[Tuple[str, str]]:
+        """키워드 안의 드라마 이름 → (drama_name_ko, drama_name_en) (별칭 인덱스가 없거나 못 찾으면 None)"""
+        if self.entities is None:
+            return None
+        return self.entities.resolve_drama(keyword)
+
+    def ensure_payload_indexes(self):
+        """K-Content 컬렉션에 드라마 이름 keyword 인덱스 생성 (이미 있으면 그대로)"""
+        collection_name = self.collection_name("kcontent")
+        for field_name in DRAMA_NAME_FIELDS:
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                )
+                print(f"✅ payload 인덱스 확인: {collection_name}.{field_name}")
+            except Exception as e:
+                print(f"⚠️ payload 인덱스 생성 실패 ({field_name}): {e}")
+
+    async def ascroll_drama(
+        self, drama: Tuple[str, str], limit: Optional[int] = None, page_size: int = 32
+    ) -> AsyncIterator[List[Any]]:
+        """
+        드라마 촬영지 전체를 필터 scroll로 (벡터 점수 계산 없음) - 페이지 단위로 yield
+
+        Args:
+            drama: (drama_name_ko, drama_name_en)
+            limit: 최대 개수 (None이면 전부)
+            page_size: 한 번에 가져올 개수 (카드가 이 단위로 스트리밍됨)
+        """
+        conditions = [
+            models.FieldCondition(key=field_name, match=models.MatchValue(value=name))
+            for field_name, name in zip(DRAMA_NAME_FIELDS, drama)
+            if name
+        ]
+        scroll_filter = models.Filter(should=conditions)
+
+        start = time.perf_counter()
+        offset = None
+        fetched = 0
+        while limit is None or fetched < limit:
+            size = page_size if limit is None else min(page_size, limit - fetched)
+            points, offset = await self.async_client.scroll(
+                collection_name=self.collection_name("kcontent"),
+                scroll_filter=scroll_filter,
+                limit=size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            fetched += len(points)
+            if points:
+                yield points
+            if offset is None or not points:
+                break
+
+        self._stats["drama_scrolls"] += 1
+        print(f"🎬 드라마 필터 scroll: {drama[0]} → {fetched}개 ({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    # ----- 랜덤 추천 -----
+
+    def sample(self, search_type: str, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        search_type 컬렉션에서 균등하게 count개 (payload.metadata 와 같은 키의 최소 필드만)
+
+        저장소가 꺼져 있거나 아직 로드 전이면 None → 호출하는 쪽이 기존 scroll로 처리
+        """
+        if self.reservoirs is None:
+            return None
+        return self.reservoirs.sample(search_type, count)
+
+    # ----- 지표 -----
+
+    def _record_retrieve(self, context: SearchQueryContext, collection_count: int, start: float):
+        for name, count in context.budget_events.items():
+            self._stats[name] += count
+        self._stats["retrieves"] += 1
+        self._stats["collection_searches"] += collection_count
+        self._stats["retrieve_ms"] += (time.perf_counter() - start) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        """검색 지표 (retrieve 평균 지연, 변형 종류별 채택 / 검색 횟수 포함)"""
+        retrieves = self._stats["retrieves"]
+        avg_ms = self._stats["retrieve_ms"] / retrieves if retrieves else 0.0
+        return {**self._stats, "avg_retrieve_ms": round(avg_ms, 1), **self.variant_yield.stats()}
+
+
+# 🚀 프로세스 전역 엔진
+_search_engine: Optional[SearchEngine] = None
+
+
+def get_search_engine() -> SearchEngine:
+    """공유 검색 엔진 싱글톤"""
+    global _search_engine
+    if _search_engine is None:
+        _search_engine = SearchEngine(
+            SEARCH_PROFILES,
+            qdrant_url=os.getenv("QDRANT_URL", "http://172.17.0.1:6333"),
+            qdrant_api_key=os.getenv("QDRANT_API_KEY"),
+            entities=EntityIndex(
+                {search_type: profile.collection_name for search_type, profile in SEARCH_PROFILES.items()},
+                corrections={**PLACE_CORRECTIONS, **KCONTENT_CORRECTIONS},
+                min_coverage=settings.ENTITY_FASTPATH_MIN_COVERAGE,
+            ) if settings.ENTITY_FASTPATH else None,
+            reservoirs=ReservoirSet({
+                "attraction": PointReservoir(ATTRACTION_COLLECTION, RANDOM_ATTRACTION_FIELDS),
+                "kcontent": PointReservoir(KCONTENT_COLLECTION, RANDOM_KCONTENT_FIELDS),
+            }) if settings.RANDOM_RESERVOIR else None,
+            budget=SearchBudget(
+                max_variants=settings.SEARCH_MAX_VARIANTS,
+                first_stage=settings.SEARCH_FIRST_STAGE_VARIANTS,
+                certain_score=settings.SEARCH_CERTAIN_SCORE,
+                max_ms=settings.SEARCH_BUDGET_MS,
+            ),
+        )
+    return _search_engine
@@ -0,0 +1,153 @@
+# app/services/speculation.py
+"""
+⚡ 추측 생성 - 검색이 끝나기 전에 선두 후보로 GPT 스트리밍 시작
+
+- aprogressive_best 가 지금까지의 최고 결과를 넘길 때마다 offer()
+  유사도가 SPECULATIVE_START_SCORE 이상이면 그 결과의 프롬프트로 GPT 스트림을 미리 시작 (청크는 버퍼에 보관)
+- 더 좋은 결과가 오면 진행 중인 스트림 취소 (빗나감) → 새 결과가 기준 이상이면 다시 시작
+- 검색이 끝나면 take(최종 결과): 미리 시작한 스트림이 같은 결과면 그대로 이어받고 (적중), 아니면 새로 시작
+- 통계: 시작 / 적중 / 빗나감 횟수, 적중률, 첫 청크까지 앞당긴 시간(TTFT 단축), 버린 청크 수
+- 기본 꺼짐 (SPECULATIVE_GENERATION) - 빗나가면 그만큼 토큰을 더 쓰기 때문
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+_DONE = object()
+
+_stats = {
+    "started": 0,
+    "adopted": 0,
+    "cancelled": 0,
+    "wasted_chunks": 0,
+    "ttft_samples": 0,
+    "ttft_saved_ms_total": 0.0,
+}
+
+
+def speculation_stats() -> Dict[str, Any]:
+    """프로세스 전체 추측 생성 통계"""
+    decided = _stats["adopted"] + _stats["cancelled"]
+    samples = _stats["ttft_samples"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["adopted"] / decided, 3) if decided else 0.0,
+        "ttft_saved_ms_avg": round(_stats["ttft_saved_ms_total"] / samples, 1) if samples else 0.0,
+    }
+
+
+class SpeculativeStream:
+    """결과 1개에 대해 미리 시작한 GPT 스트림 (백그라운드 task가 청크를 큐에 쌓음)"""
+
+    def __init__(self, result: Dict[str, Any], chunks: AsyncIterator[str]):
+        self.result = result
+        self.started_at = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+        self.received = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.ensure_future(self._pump(chunks))
+
+    async def _pump(self, chunks: AsyncIterator[str]):
+        try:
+            async for chunk in chunks:
+                if self.first_chunk_at is None:
+                    self.first_chunk_at = time.perf_counter()
+                self.received += 1
+                self._queue.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._queue.put_nowait(e)  # 이어받은 쪽에서 다시 raise
+        finally:
+            self._queue.put_nowait(_DONE)
+
+    def cancel(self):
+        """빗나감 - GPT 스트림 닫기 (async for 안에서 CancelledError → 응답 close)"""
+        self._task.cancel()
+
+    async def adopt(self) -> AsyncIterator[str]:
+        """적중 - 쌓인 청크부터 이어서 yield (첫 청크 시점에 TTFT 단축 기록)"""
+        decided_at = time.perf_counter()
+        recorded = False
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                if not recorded:
+                    recorded = True
+                    # 검색이 끝난 뒤 시작했다면 첫 청크는 decided_at + TTFT → 앞당긴 시간 = min(TTFT, 미리 시작한 시간)
+                    ttft = self.first_chunk_at - self.started_at
+                    saved_ms = min(ttft, decided_at - self.started_at) * 1000
+                    _stats["ttft_samples"] += 1
+                    _stats["ttft_saved_ms_total"] += saved_ms
+                    print(f"⚡ 추측 생성 적중: TTFT {saved_ms:.0f}ms 단축")
+                yield item
+        finally:
+            self._task.cancel()  # 클라이언트 연결이 끊겨 중간에 닫혀도 GPT 스트림 정리
+
+
+class Speculator:
+    """
+    요청 1개의 추측 생성 관리
+
+    사용법:
+        speculator = Speculator(lambda r: achat_with_gpt_stream([{"role": "user", "content": build_prompt(r)}]))
+        try:
+            async for result in search.aprogressive_best(...):
+                speculator.offer(result)
+                yield ChatEvent('found', ...)
+            async for content in ChunkWriter().stream(speculator.take(result)):
+                ...
+        finally:
+            speculator.close()
+    """
+
+    def __init__(self, start_stream: Callable[[Dict[str, Any]], AsyncIterator[str]],
+                 start_score: Optional[float] = None, enabled: Optional[bool] = None):
+        """
+        Args:
+            start_stream: 결과 → GPT 청크 스트림 (프롬프트 생성 포함)
+            start_score: 이 유사도 이상인 선두 후보부터 미리 시작 (기본: settings.SPECULATIVE_START_SCORE)
+            enabled: 기본 settings.SPECULATIVE_GENERATION
+        """
+        self.start_stream = start_stream
+        self.start_score = settings.SPECULATIVE_START_SCORE if start_score is None else start_score
+        self.enabled = settings.SPECULATIVE_GENERATION if enabled is None else enabled
+        self._current: Optional[SpeculativeStream] = None
+
+    def offer(self, result: Dict[str, Any]):
+        """새 선두 후보 - 진행 중인 스트림은 취소, 기준 이상이면 이 결과로 시작"""
+        if not self.enabled or (self._current is not None and self._current.result is result):
+            return
+        self._discard()
+        if result.get('similarity_score', 0.0) >= self.start_score:
+            self._current = SpeculativeStream(result, self.start_stream(result))
+            _stats["started"] += 1
+
+    def take(self, result: Dict[str, Any]) -> AsyncIterator[str]:
+        """최종 결과의 청크 스트림 (미리 시작한 것이 같은 결과면 이어받기)"""
+        current, self._current = self._current, None
+        if current is not None and current.result is result:
+            _stats["adopted"] += 1
+            return current.adopt()
+        if current is not None:
+            self._current = current
+            self._discard()
+        return self.start_stream(result)
+
+    def close(self):
+        """요청 종료 / 오류 시 남은 스트림 정리"""
+        self._discard()
+
+    def _discard(self):
+        if self._current is None:
+            return
+        self._current.cancel()
+        _stats["cancelled"] += 1
+        _stats["wasted_chunks"] += self._current.received
+        self._current = None
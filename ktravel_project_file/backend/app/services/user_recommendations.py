@@ -0,0 +1,180 @@
+# app/services/user_recommendations.py
+"""
+⭐ 유저별 추천 목록 미리 계산 (Redis, 버전 도장)
+
+- 북마크 기반 추천은 북마크가 바뀔 때만 결과가 바뀜
+  → 매 요청마다 북마크 조회 + Qdrant 추천 + 카드 채우기 + 정렬을 다시 하지 않고 저장된 목록을 바로 응답
+- 버전: 유저별 Redis 카운터 (Bookmark.add_bookmark / delete_bookmark 가 커밋 후 INCR)
+  저장된 목록에는 계산을 시작할 때의 버전을 같이 기록 → 버전이 다르면 (그 사이 북마크가 바뀜) 쓰지 않음
+- 조회: MGET 1번 (버전 키 + 목록 키), 없거나 버전이 다르면 호출하는 쪽이 바로 계산 후 저장
+- 다시 계산: 북마크가 바뀌면 이벤트 루프의 백그라운드 task가 기본 요청 형태의 목록을 미리 계산
+  (연달아 바뀌면 REFRESH_DELAY 동안 모아서 유저당 1번)
+- 카탈로그 / Qdrant 변경은 TTL 지나면 반영
+"""
+import asyncio
+import json
+import time
+import traceback
+from typing import Any, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+VERSION_KEY = "user_reco:version:{user_id}"
+ENTRY_KEY = "user_reco:{user_id}:{endpoint}:{mode}:{place_type}:{top_k}"
+
+
+def _entry_key(user_id: int, endpoint: str, place_type: Optional[int], top_k: int, mode: str) -> str:
+    return ENTRY_KEY.format(
+        user_id=user_id, endpoint=endpoint, mode=mode,
+        place_type="all" if place_type is None else place_type, top_k=top_k,
+    )
+
+
+async def aload_recommendations(
+    user_id: int, endpoint: str, place_type: Optional[int], top_k: int, mode: str = "per_bookmark"
+) -> Tuple[Optional[List[dict]], Optional[str]]:
+    """
+    저장된 추천 목록 조회
+
+    Returns:
+        (목록 또는 None, 현재 버전) - 버전은 astore_recommendations 에 그대로 넘김
+        (Redis 오류면 (None, None) → 계산만 하고 저장 안 함)
+    """
+    if not settings.USER_RECOMMENDATIONS_MATERIALIZED:
+        return None, None
+    from app.core.session import async_redis_client
+
+    try:
+        version, raw = await async_redis_client.mget(
+            [VERSION_KEY.format(user_id=user_id), _entry_key(user_id, endpoint, place_type, top_k, mode)]
+        )
+    except Exception as e:
+        print(f"⚠️ 저장된 추천 조회 실패 (바로 계산): {e}")
+        return None, None
+
+    version = version or "0"
+    if raw:
+        entry = json.loads(raw)
+        if entry.get("version") == version:
+            print(f"⭐ 저장된 추천 사용: user_id={user_id} ({endpoint}, {len(entry['items'])}개)")
+            return entry["items"], version
+    return None, version
+
+
+async def astore_recommendations(
+    user_id: int, endpoint: str, place_type: Optional[int], top_k: int, version: Optional[str], items: List[Any],
+    mode: str = "per_bookmark",
+):
+    """계산한 추천 목록 저장 (version = 계산 시작 전에 읽은 버전)"""
+    if version is None or not items or not settings.USER_RECOMMENDATIONS_MATERIALIZED:
+        return
+    from app.core.session import async_redis_client
+
+    raw = json.dumps(
+        {"version": version, "computed_at": time.time(), "items": jsonable_encoder(items)}, ensure_ascii=False
+    )
+    try:
+        await async_redis_client.setex(
+            _entry_key(user_id, endpoint, place_type, top_k, mode), settings.USER_RECOMMENDATIONS_TTL_SECONDS, raw
+        )
+    except Exception as e:
+        print(f"⚠️ 추천 목록 저장 실패: {e}")
+
+
+async def acurrent_version(user_id: int) -> Optional[str]:
+    from app.core.session import async_redis_client
+
+    try:
+        return await async_redis_client.get(VERSION_KEY.format(user_id=user_id)) or "0"
+    except Exception as e:
+        print(f"⚠️ 추천 버전 조회 실패: {e}")
+        return None
+
+
+class RecommendationRefresher:
+    """북마크가 바뀐 유저의 추천 목록을 이벤트 루프에서 다시 계산하는 백그라운드 task"""
+
+    def __init__(self, delay_ms: int = 500):
+        self.delay = delay_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """앱 startup 에서 호출 (실행 중인 이벤트 루프에 task 생성)"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._run())
+        print(f"✅ 추천 목록 갱신 task 시작 (delay={self.delay * 1000:.0f}ms)")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        print("🛑 추천 목록 갱신 task 종료")
+
+    def enqueue(self, user_id: int):
+        """다시 계산 예약 (어느 스레드에서든, 즉시 반환) - 시작 전이면 다음 요청 때 바로 계산"""
+        if not self.running or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, user_id)
+
+    async def _run(self):
+        from app.api.endpoints.recommend import materialize_recommendations
+
+        while True:
+            user_ids = {await self._queue.get()}
+            await asyncio.sleep(self.delay)  # 연달아 바뀌는 북마크는 모아서 1번
+            while not self._queue.empty():
+                user_ids.add(self._queue.get_nowait())
+
+            for user_id in user_ids:
+                start = time.perf_counter()
+                try:
+                    await materialize_recommendations(user_id)
+                    print(f"⭐ 추천 목록 다시 계산: user_id={user_id} ({(time.perf_counter() - start) * 1000:.0f}ms)")
+                except Exception as e:
+                    print(f"❌ 추천 목록 다시 계산 실패 (다음 요청 때 바로 계산): user_id={user_id}, {e}")
+                    traceback.print_exc()
+
+
+# 🚀 프로세스 전역 task
+_refresher: Optional[RecommendationRefresher] = None
+
+
+def get_recommendation_refresher() -> RecommendationRefresher:
+    global _refresher
+    if _refresher is None:
+        _refresher = RecommendationRefresher(delay_ms=settings.USER_RECOMMENDATIONS_REFRESH_DELAY_MS)
+    return _refresher
+
+
+def notify_bookmarks_changed(user_id: int):
+    """
+    북마크 추가 / 삭제 커밋 후 호출 (동기, 스레드풀 어디서든)
+    - 버전 증가 → 저장된 목록은 바로 무효
+    - 다시 계산 예약
+    """
+    if not settings.USER_RECOMMENDATIONS_MATERIALIZED:
+        return
+    from app.core.session import redis_client
+
+    try:
+        redis_client.incr(VERSION_KEY.format(user_id=user_id))
+    except Exception as e:
+        print(f"⚠️ 추천 버전 갱신 실패 (TTL 지나면 갱신): {e}")
+        return
+    get_recommendation_refresher().enqueue(user_id)
@@ -0,0 +1,61 @@
+"""
+지연 시간 히스토그램 - 🚀 튜닝용 지표
+
+- LatencyHistogram: 고정 버킷(ms) 누적 개수 + 버킷 기준 p50 / p95 추정
+- 프로세스 메모리에만 보관 (워커별), /api/chat/stats 로 조회
+"""
+import bisect
+import threading
+from typing import Dict, Optional, Sequence
+
+# 버킷 상한 (ms) - 마지막은 그 이상 전부
+DEFAULT_BUCKETS_MS = (100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    사용법:
+        hist = LatencyHistogram()
+        hist.observe(elapsed_ms)
+        hist.snapshot()   # {'count': ..., 'p50_ms': ..., 'p95_ms': ..., 'buckets': {'<=100': 3, ...}}
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ms: float):
+        index = bisect.bisect_left(self.buckets_ms, elapsed_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._total_ms += elapsed_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 분위가 들어 있는 버킷의 상한 (마지막 버킷이면 None)"""
+        with self._lock:
+            counts = list(self._counts)
+        total = sum(counts)
+        if not total:
+            return None
+        running = 0
+        for index, count in enumerate(counts):
+            running += count
+            if running >= q * total:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else None
+        return None
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = list(self._counts)
+            total_ms = self._total_ms
+        total = sum(counts)
+        labels = [f"<={bound}" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}"]
+        return {
+            "count": total,
+            "avg_ms": round(total_ms / total, 1) if total else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "buckets": dict(zip(labels, counts)),
+        }
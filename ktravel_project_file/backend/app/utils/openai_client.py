@@ -1,13 +1,59 @@
 """
 OpenAI API 클라이언트 - 🚀 최적화 버전 (Streaming 지원)
+
+- chat_with_gpt / chat_with_gpt_stream: 동기 클라이언트
+- achat_with_gpt_stream: AsyncOpenAI 기반 스트리밍 (SSE 경로용, 이벤트 루프 블로킹 없음)
+  첫 토큰이 OPENAI_HEDGE_AFTER_MS 안에 안 오면 헤지 요청 (대체 모델 가능), 모델별 TTFT / 전체 지연 히스토그램
 """
-from openai import OpenAI
+import asyncio
+import time
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
 from app.core.config import settings
-from typing import Generator
+from app.utils.latency import LatencyHistogram
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
 # OpenAI 클라이언트 초기화
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
+# 🚀 async 클라이언트 - 프로세스 전체가 커넥션 풀 하나를 공유
+_async_client: Optional[AsyncOpenAI] = None
+
+# 📊 모델별 지연 히스토그램 (ttft / total) + 헤지 카운터
+_latency: Dict[str, Dict[str, LatencyHistogram]] = {}
+_hedge_stats = {"requests": 0, "hedged": 0, "fallbacks_on_error": 0, "hedge_wins": 0, "failures": 0}
+
+
+def get_async_client() -> AsyncOpenAI:
+    """AsyncOpenAI 싱글톤 (keep-alive 풀 + 연결/읽기 타임아웃)"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    settings.OPENAI_READ_TIMEOUT_SECONDS,
+                    connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            ),
+        )
+    return _async_client
+
+
+async def close_async_client():
+    """앱 종료 시 async 커넥션 풀 정리"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+
 def chat_with_gpt(messages: list, model: str = None, temperature: float = 0.7, max_tokens: int = 350, stream: bool = False) -> str:
     """
     🚀 최적화된 GPT 채팅
@@ -96,6 +142,131 @@ def chat_with_gpt_stream(messages: list, model: str = None, temperature: float =
         raise Exception(f"OpenAI API 오류: {str(e)}")
 
 
+class _OpenedStream:
+    """첫 토큰까지 받은 스트림 (나머지는 iterator로 이어서 읽음)"""
+
+    def __init__(self, model: str, response, iterator, first_chunk: Optional[str], started_at: float):
+        self.model = model
+        self.response = response
+        self.iterator = iterator
+        self.first_chunk = first_chunk
+        self.started_at = started_at
+
+
+def _histograms(model: str) -> Dict[str, LatencyHistogram]:
+    return _latency.setdefault(model, {"ttft": LatencyHistogram(), "total": LatencyHistogram()})
+
+
+def llm_latency_stats() -> Dict[str, Any]:
+    """모델별 TTFT / 전체 지연 히스토그램 + 헤지 카운터 (OPENAI_HEDGE_AFTER_MS 조정용)"""
+    return {
+        "hedge": dict(_hedge_stats),
+        "models": {
+            model: {name: histogram.snapshot() for name, histogram in histograms.items()}
+            for model, histograms in _latency.items()
+        },
+    }
+
+
+async def _aopen_stream(model: str, messages: list, temperature: float, max_tokens: int) -> _OpenedStream:
+    """요청 1개를 보내고 첫 토큰(내용 있는 청크)까지 기다림 - 도중에 취소되면 스트림 닫음"""
+    started_at = time.perf_counter()
+    response = await get_async_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    iterator = response.__aiter__()
+    try:
+        async for chunk in iterator:
+            if chunk.choices and chunk.choices[0].delta.content:
+                _histograms(model)["ttft"].observe((time.perf_counter() - started_at) * 1000)
+                return _OpenedStream(model, response, iterator, chunk.choices[0].delta.content, started_at)
+        return _OpenedStream(model, response, iterator, None, started_at)  # 내용 없이 끝남
+    except BaseException:
+        await response.close()
+        raise
+
+
+async def _aopen_hedged(model: str, messages: list, temperature: float, max_tokens: int) -> _OpenedStream:
+    """
+    헤지 요청: OPENAI_HEDGE_AFTER_MS 안에 첫 토큰이 없거나 첫 요청이 실패하면
+    두 번째 요청(OPENAI_FALLBACK_MODEL, 없으면 같은 모델)을 보내고 먼저 첫 토큰이 온 쪽을 사용 (나머지 취소)
+    """
+    hedge_after = settings.OPENAI_HEDGE_AFTER_MS / 1000
+    primary = asyncio.ensure_future(_aopen_stream(model, messages, temperature, max_tokens))
+    tasks = [primary]
+    winner = None
+    try:
+        if hedge_after:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done or primary.exception() is not None:
+                backup_model = settings.OPENAI_FALLBACK_MODEL or model
+                _hedge_stats["fallbacks_on_error" if done else "hedged"] += 1
+                print(f"🛟 OpenAI {'요청 실패' if done else f'첫 토큰 {settings.OPENAI_HEDGE_AFTER_MS}ms 초과'} → {backup_model} 추가 요청")
+                tasks.append(asyncio.ensure_future(_aopen_stream(backup_model, messages, temperature, max_tokens)))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in (t for t in tasks if t in done):
+                if task.exception() is None:
+                    winner = task
+                    break
+                error = task.exception()
+        if winner is None:
+            _hedge_stats["failures"] += 1
+            raise error
+
+        if winner is not primary:
+            _hedge_stats["hedge_wins"] += 1
+        return winner.result()
+    finally:
+        for task in tasks:
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is None:
+                await task.result().response.close()  # 같이 도착한 쪽 정리
+
+
+async def achat_with_gpt_stream(messages: list, model: str = None, temperature: float = 0.7, max_tokens: int = 350) -> AsyncGenerator[str, None]:
+    """
+    🌊 async 스트리밍 GPT 채팅 (SSE 제너레이터용)
+    
+    chat_with_gpt_stream과 같은 청크를 yield하지만 청크를 기다리는 동안 이벤트 루프를 양보한다.
+    클라이언트 연결이 끊겨 제너레이터가 닫히면 OpenAI 스트림도 바로 닫는다.
+    첫 토큰이 늦거나 요청이 실패하면 헤지 요청을 보낸다 (_aopen_hedged).
+    
+    Yields:
+        응답 청크 (한 글자 또는 단어씩)
+    """
+    if model is None:
+        model = settings.OPENAI_MODEL
+    
+    _hedge_stats["requests"] += 1
+    try:
+        opened = await _aopen_hedged(model, messages, temperature, max_tokens)
+    except Exception as e:
+        raise Exception(f"OpenAI API 오류: {str(e)}")
+    
+    try:
+        if opened.first_chunk is not None:
+            yield opened.first_chunk
+            async for chunk in opened.iterator:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        _histograms(opened.model)["total"].observe((time.perf_counter() - opened.started_at) * 1000)
+    except Exception as e:
+        raise Exception(f"OpenAI API 오류: {str(e)}")
+    finally:
+        await opened.response.close()
+
+
 def extract_destinations_from_text(text: str) -> list:
     """
     텍스트에서 여행지 추출
@@ -0,0 +1,261 @@
+"""
+키워드 패턴 매칭 - 🚀 질문 분석 / 검색어 보정 공용
+
+- PatternSet: 그룹별 키워드 테이블을 Aho-Corasick 오토마톤 하나로 컴파일 → 한 번 훑어서 맞은 그룹 전부 반환
+  (pyahocorasick 없으면 공통 접두사를 트라이로 묶은 정규식 하나로 대체, 겹치는 키워드도 모두 잡음)
+- PhraseReplacer: 보정 테이블을 한 번에 치환 (긴 구문 우선, 치환 결과를 다시 치환하지 않음)
+- 채팅 서비스 3종이 같이 쓰는 키워드 테이블
+
+벤치마크:
+    python -m app.utils.patterns
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, Optional
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick 없으면 정규식 사용
+    ahocorasick = None
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """리터럴 목록 → 공통 접두사를 묶은 정규식 (긴 매치 우선)"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True  # 단어 끝
+
+    def _build(node: Dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + _build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if is_end:
+            # 여기서 끝나는 단어도 있음 → 더 긴 쪽을 먼저 시도
+            return "(?:" + body + ")?"
+        return body
+
+    return _build(trie)
+
+
+class PatternSet:
+    """
+    그룹별 키워드 테이블 → 컴파일된 다중 패턴 매처
+
+    사용법:
+        patterns = PatternSet({"comparison": [" vs ", "compare"], "advice": ["tip", "how to"]})
+        hits = patterns.scan("any tips to compare?")   # frozenset({"comparison", "advice"})
+
+    `any(p in text for p in table)` 를 테이블마다 반복한 것과 같은 결과를 한 번의 스캔으로 낸다.
+    """
+
+    def __init__(self, tables: Dict[str, Iterable[str]]):
+        self.tables = {group: tuple(patterns) for group, patterns in tables.items()}
+
+        groups_by_pattern: Dict[str, set] = {}
+        for group, patterns in self.tables.items():
+            for pattern in patterns:
+                groups_by_pattern.setdefault(pattern, set()).add(group)
+
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, groups in groups_by_pattern.items():
+                self._automaton.add_word(pattern, frozenset(groups))
+            self._automaton.make_automaton()
+            return
+
+        # 위치마다 가장 긴 키워드만 잡히므로, 그 키워드의 접두사인 키워드 그룹도 같이 기록
+        # (예: 'tips' 매치 → 'tip' 그룹도 히트)
+        self._hits: Dict[str, FrozenSet[str]] = {}
+        for pattern in groups_by_pattern:
+            groups = set()
+            for other, other_groups in groups_by_pattern.items():
+                if pattern.startswith(other):
+                    groups |= other_groups
+            self._hits[pattern] = frozenset(groups)
+
+        # lookahead 라서 겹치는 위치의 키워드도 모두 찾음
+        self._regex = re.compile("(?=(" + _trie_regex(groups_by_pattern) + "))")
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """text(소문자)에서 맞은 그룹 전부"""
+        hits = set()
+        if self._automaton is not None:
+            for _, groups in self._automaton.iter(text):
+                hits |= groups
+            return frozenset(hits)
+        for match in self._regex.finditer(text):
+            hits |= self._hits[match.group(1)]
+        return frozenset(hits)
+
+
+class PhraseReplacer:
+    """
+    보정 테이블 {틀린 구문: 고친 구문} → 한 번에 치환
+
+    긴 구문이 우선이고 치환 결과를 다시 치환하지 않는다. 이미 고친 구문('namsan seoul tower')은
+    그대로 두어서 안쪽의 'seoul tower'가 또 바뀌지 않게 한다.
+    """
+
+    def __init__(self, corrections: Dict[str, str]):
+        self.corrections = dict(corrections)
+        targets = {correct: correct for correct in self.corrections.values() if correct not in self.corrections}
+        self._table = {**targets, **self.corrections}
+        self._regex = re.compile(_trie_regex(self._table)) if self._table else None
+
+    def replace(self, text: str, log: bool = False) -> str:
+        if self._regex is None:
+            return text
+
+        def _sub(match: "re.Match") -> str:
+            wrong = match.group(0)
+            correct = self._table[wrong]
+            if log and wrong != correct:
+                print(f"🔧 검색어 보정: '{wrong}' → '{correct}'")
+            return correct
+
+        return self._regex.sub(_sub, text)
+
+
+# ===== 수량 추출 =====
+
+COUNT_PATTERN = re.compile(r"(\d+)(?:곳|개|가지|\s*places?|\s*spots?|\s*locations?)")
+
+
+def extract_count(message_lower: str) -> Optional[int]:
+    """'5곳', '3 places' 같은 수량 (없으면 None)"""
+    match = COUNT_PATTERN.search(message_lower)
+    if match:
+        count = int(match.group(1))
+        print(f"   ✅ 수량 발견: {count}개")
+        return count
+    return None
+
+
+# ===== 공용 키워드 테이블 =====
+
+COMPARISON_PATTERNS = (' vs ', 'vs.', ' versus ', 'which one', 'which is better', 'compare')
+
+ADVICE_PATTERNS = (
+    'tip', 'tips', 'advice', '팁', '조언', 'how to', '어떻게', '방법',
+    'what should i know', '알아야', '준비', 'etiquette', '에티켓'
+)
+
+# 다중 촬영지 검색 의도
+MULTIPLE_PATTERNS = (
+    'places that appeared', 'locations that appeared', 'places from',
+    'all places', 'all locations', 'filming locations',
+    'places in', 'locations in', 'where', 'appeared',
+    'show me', 'tell me where', 'what are the places',
+    'places of', 'locations of', 'spots from', 'spots in',
+    '모든 장소', '전체 촬영지', '나온 장소', '등장한 장소', '촬영 장소들',
+    'drama', 'divorce insurance', 'places'
+)
+
+# 다중 검색을 허용할 만큼 드라마 얘기인지
+DRAMA_CONTEXT_KEYWORDS = ('drama', 'divorce insurance', "mom's friend's son", 'appeared', 'filming', 'locations', 'places')
+
+# K-Content 모드에서 조언 질문이 아닌 드라마 질문인지
+DRAMA_SCENE_KEYWORDS = ('drama', 'filming', 'location', 'scene', '드라마', '촬영지', '장면', '장소')
+
+PLACE_KEYWORDS = (
+    'palace', 'temple', 'tower', 'museum', 'park', '궁', '사찰', '타워', '박물관', '공원',
+    'gangnam', 'hongdae', 'myeongdong', 'itaewon', 'culture', '문화', 'transportation', '교통', 'weather', '날씨'
+)
+
+RESTAURANT_KEYWORDS = (
+    'restaurant', 'food', 'eat', 'dining', 'meal', 'cuisine', 'dish',
+    '레스토랑', '음식', '먹', '식당', '맛집', '요리', '음식점'
+)
+
+RECOMMENDATION_PATTERNS = (
+    'recommend', 'suggestion', 'suggest', '추천', 'places to visit', 'where to go', '가볼',
+    'best places', 'top places', '명소'
+)
+POPULARITY_PATTERNS = ('best', 'top', 'popular', '인기')
+
+
+# ===== 서비스별 매처 (import 시 한 번 컴파일) =====
+
+# ChatService (K-pop Lumi + K-Content 모드)
+CHAT_PATTERNS = PatternSet({
+    "multiple": MULTIPLE_PATTERNS,
+    "drama_context": DRAMA_CONTEXT_KEYWORDS,
+    "comparison": COMPARISON_PATTERNS,
+    "advice": ADVICE_PATTERNS,
+    "drama_scene": DRAMA_SCENE_KEYWORDS,
+    "place": PLACE_KEYWORDS,
+    "recommendation": RECOMMENDATION_PATTERNS + POPULARITY_PATTERNS,
+})
+
+# ChatRestService (Restaurant + Festival + Attraction)
+REST_PATTERNS = PatternSet({
+    "comparison": COMPARISON_PATTERNS,
+    "advice": ADVICE_PATTERNS + ('culture', '문화'),
+    "place": ('palace', 'temple', 'tower', 'museum', 'park', '궁', '사찰', '타워', '박물관', '공원',
+              'restaurant', 'food', '레스토랑', '음식', '맛집'),
+    "recommendation": RECOMMENDATION_PATTERNS,
+})
+
+# ChatKContentsService
+KCONTENT_PATTERNS = PatternSet({
+    "comparison": COMPARISON_PATTERNS,
+    "advice": ADVICE_PATTERNS + ('visit', '방문'),
+    "drama_scene": DRAMA_SCENE_KEYWORDS,
+    "recommendation": ('recommend', 'suggestion', 'suggest', '추천') + POPULARITY_PATTERNS,
+})
+
+RESTAURANT_PATTERNS = PatternSet({"restaurant": RESTAURANT_KEYWORDS})
+
+
+def has_restaurant_keyword(message: str) -> bool:
+    """레스토랑 관련 질문인지"""
+    return bool(RESTAURANT_PATTERNS.scan(message.lower()))
+
+
+# ===== 마이크로 벤치마크 =====
+
+if __name__ == "__main__":
+    import timeit
+
+    samples = [
+        "Show me all places that appeared in Divorce Insurance",
+        "namsan tower vs lotte world tower which is better?",
+        "Any tips for visiting Gyeongbokgung palace at night?",
+        "recommend 5 places to visit in hongdae",
+        "Tell me about the best korean bbq restaurant in gangnam",
+        "where was crash landing on you filmed",
+        "서울에서 가볼 만한 명소 3곳 추천해줘",
+        "What should I know about subway etiquette in Seoul?",
+    ] * 4
+    lowered = [s.lower().strip() for s in samples]
+
+    def legacy():
+        """기존 방식: 테이블마다 any(p in text) 반복"""
+        for text in lowered:
+            for table in CHAT_PATTERNS.tables.values():
+                any(p in text for p in table)
+
+    def compiled():
+        for text in lowered:
+            CHAT_PATTERNS.scan(text)
+
+    # 결과가 기존 방식과 같은지 먼저 확인
+    for text in lowered:
+        expected = {g for g, table in CHAT_PATTERNS.tables.items() if any(p in text for p in table)}
+        assert CHAT_PATTERNS.scan(text) == expected, (text, expected, CHAT_PATTERNS.scan(text))
+
+    places = PhraseReplacer({"namsan tower": "namsan seoul tower", "seoul tower": "namsan seoul tower"})
+    assert places.replace("namsan seoul tower") == "namsan seoul tower"
+    assert places.replace("seoul tower view") == "namsan seoul tower view"
+
+    number = 2000
+    for name, fn in (("legacy any()", legacy), ("PatternSet.scan", compiled)):
+        seconds = min(timeit.repeat(fn, number=number, repeat=5))
+        per_message_us = seconds / (number * len(lowered)) * 1e6
+        print(f"{name:>16}: {per_message_us:6.2f} µs / message ({len(lowered)} messages × {number})")
+    print(f"backend: {'pyahocorasick' if ahocorasick is not None else 'regex'}")
@@ -0,0 +1,153 @@
+"""
+SSE(Server-Sent Events) 프레임 유틸 - 🚀 채팅 스트리밍 공용
+
+- sse_event: 이벤트 dict → "data: {...}\\n\\n" (orjson 있으면 orjson, 없으면 json)
+- ChunkWriter: GPT 토큰 청크를 시간 창 + 바이트 예산 기준으로 묶음 (묶음 1개 = chunk 이벤트 1개)
+- 채팅 이벤트 객체는 app.services.chat_events.ChatEvent
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # orjson 없으면 표준 json 사용
+    orjson = None
+
+
+def encode_json(payload: Dict[str, Any]) -> str:
+    """이벤트 payload JSON 인코딩 (한글 그대로)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # orjson이 못 다루는 타입은 json으로
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def sse_event(payload: Dict[str, Any]) -> str:
+    """SSE data 프레임 생성"""
+    return f"data: {encode_json(payload)}\n\n"
+
+
+class FlushPolicy:
+    """
+    청크 묶음 전송 기준
+
+    Args:
+        window_ms: 버퍼의 첫 청크 이후 이 시간이 지나면 전송 (새 청크가 없어도)
+        max_bytes: 버퍼가 이 크기(UTF-8)를 넘으면 바로 전송
+        flush_first: 첫 청크는 기다리지 않고 바로 전송 (체감 첫 응답 속도 유지)
+    """
+
+    def __init__(self, window_ms: int = None, max_bytes: int = None, flush_first: bool = True):
+        self.window_ms = settings.SSE_COALESCE_WINDOW_MS if window_ms is None else window_ms
+        self.max_bytes = settings.SSE_COALESCE_MAX_BYTES if max_bytes is None else max_bytes
+        self.flush_first = flush_first
+
+
+class ChunkWriter:
+    """
+    GPT 청크 스트림 → 묶음 텍스트 스트림
+
+    사용법:
+        writer = ChunkWriter()
+        async for content in writer.stream(achat_with_gpt_stream(...)):
+            yield ChatEvent.chunk(content)
+        full_response = writer.text
+    """
+
+    def __init__(self, policy: Optional[FlushPolicy] = None):
+        self.policy = policy or FlushPolicy()
+        self._parts: List[str] = []
+        self._buffer: List[str] = []
+        self._buffer_bytes = 0
+        self._buffer_started = 0.0
+        self._flushed_any = False
+        self.frames = 0
+
+    @property
+    def text(self) -> str:
+        """지금까지 받은 전체 응답"""
+        return "".join(self._parts)
+
+    def add(self, chunk: str) -> Optional[str]:
+        """청크 추가 - 전송 기준을 넘으면 묶음 텍스트 반환"""
+        if not chunk:
+            return None
+        self._parts.append(chunk)
+        if not self._buffer:
+            self._buffer_started = time.monotonic()
+        self._buffer.append(chunk)
+        self._buffer_bytes += len(chunk.encode("utf-8"))
+
+        if self.policy.flush_first and not self._flushed_any:
+            return self.flush()
+        if self._buffer_bytes >= self.policy.max_bytes or self._remaining() <= 0:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """버퍼 전송 (비어 있으면 None)"""
+        if not self._buffer:
+            return None
+        content = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffer_bytes = 0
+        self._flushed_any = True
+        self.frames += 1
+        return content
+
+    def _remaining(self) -> float:
+        """현재 버퍼의 시간 창 남은 시간 (초)"""
+        return self.policy.window_ms / 1000 - (time.monotonic() - self._buffer_started)
+
+    async def stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        청크 스트림을 묶음 텍스트 스트림으로 변환
+
+        다음 청크가 늦게 와도 시간 창이 끝나면 버퍼를 먼저 내보낸다.
+        소비자가 중간에 닫으면 원본 스트림도 닫는다.
+        """
+        iterator = chunks.__aiter__()
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+
+                timeout = max(self._remaining(), 0) if self._buffer else None
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                if not done:
+                    content = self.flush()
+                    if content:
+                        yield content
+                    continue
+
+                finished, pending = pending, None
+                try:
+                    chunk = finished.result()
+                except StopAsyncIteration:
+                    break
+
+                content = self.add(chunk)
+                if content:
+                    yield content
+
+            content = self.flush()
+            if content:
+                yield content
+        finally:
+            if pending is not None:
+                # 진행 중인 __anext__ 가 끝나야 aclose 가능
+                pending.cancel()
+                try:
+                    await pending
+                except (asyncio.CancelledError, Exception):
+                    pass
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,60 @@
+# tests/conftest.py
+"""
+테스트 공통 fixture
+
+- MySQL / Redis 없이 돌도록 SessionLocal 을 크기가 작은 sqlite 풀로 바꿔 끼움
+- 로그인 세션(Redis)은 고정 유저 1명으로 대체
+"""
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.models.conversation import Conversation  # noqa: E402
+from app.models.users import User  # noqa: E402
+
+TEST_USER_ID = 1
+POOL_SIZE = 2
+
+
+@pytest.fixture
+def pool_engine(tmp_path, monkeypatch):
+    """크기 POOL_SIZE 풀의 sqlite 엔진 (users / conversations 테이블 + 유저 1명)"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=1,  # 풀이 모자라면 멈추지 않고 바로 실패
+        connect_args={"check_same_thread": False},
+    )
+    User.__table__.create(engine)
+    Conversation.__table__.create(engine)
+    test_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = test_session()
+    db.add(User(user_id=TEST_USER_ID, username="tester", email="tester@example.com", password="x", name="Tester"))
+    db.commit()
+    db.close()
+
+    from app.core import deps
+    from app.database import connection
+    from app.services import conversation_store
+
+    monkeypatch.setattr(connection, "SessionLocal", test_session)
+    monkeypatch.setattr(conversation_store, "SessionLocal", test_session)
+    monkeypatch.setattr(settings, "CONVERSATION_WRITE_BEHIND", False)
+    monkeypatch.setattr(deps.session_manager, "get_session", lambda session_id: {"user_id": TEST_USER_ID})
+    monkeypatch.setattr(deps.session_manager, "refresh_session", lambda session_id: None)
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def auth_headers():
+    return {"Authorization": "Bearer test-session"}
@@ -0,0 +1,96 @@
+# tests/test_chat_db_pool.py
+"""
+채팅 엔드포인트가 스트림 / GPT 호출 동안 DB 풀 커넥션을 잡지 않는지 확인
+
+- 풀 크기(POOL_SIZE)보다 많은 스트림을 동시에 열어 둔 상태에서 checkedout() == 0
+- 저장(INSERT) 때만 잠깐 빌리므로 전체 최대값도 풀 크기 이하
+"""
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services.chat_events import ChatEvent
+from app.services.chat_rest import ChatRestService
+from app.services.chat_service import ChatService
+from app.services.conversation_store import asave_conversation
+from tests.conftest import POOL_SIZE
+
+STREAMS = POOL_SIZE * 5
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(app=app, base_url="http://test", timeout=10)
+
+
+@pytest.mark.asyncio
+async def test_streams_do_not_hold_pool_connections(pool_engine, auth_headers, monkeypatch):
+    gate = asyncio.Event()
+    started = 0
+
+    async def fake_streaming(user_id: int, message: str, is_kcontent_mode: bool = False):
+        nonlocal started
+        yield ChatEvent.status("searching", "검색 중...")
+        started += 1
+        await gate.wait()  # 검색 / GPT 생성 중인 스트림
+        yield ChatEvent.chunk("Hey ")
+        convers_id = await asave_conversation(user_id, message, "Hey")
+        yield ChatEvent("done", {"full_response": "Hey", "convers_id": convers_id})
+
+    monkeypatch.setattr(ChatService, "send_message_streaming", staticmethod(fake_streaming))
+
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, pool_engine.pool.checkedout())
+            await asyncio.sleep(0.005)
+
+    async with _client() as client:
+        watcher = asyncio.create_task(watch())
+        requests = [
+            asyncio.create_task(client.post("/api/chat/send/stream", json={"message": f"q{i}"}, headers=auth_headers))
+            for i in range(STREAMS)
+        ]
+        try:
+            for _ in range(500):  # 모든 스트림이 생성 단계에 들어갈 때까지 (최대 5초)
+                if started == STREAMS or any(r.done() for r in requests):
+                    break
+                await asyncio.sleep(0.01)
+            assert started == STREAMS
+            assert pool_engine.pool.checkedout() == 0
+        finally:
+            gate.set()
+            responses = await asyncio.gather(*requests)
+            watcher.cancel()
+
+    assert all(r.status_code == 200 for r in responses)
+    convers_ids = [json.loads(r.text.strip().rsplit("data: ", 1)[1])["convers_id"] for r in responses]
+    assert len(set(convers_ids)) == STREAMS
+    assert peak <= POOL_SIZE
+
+
+@pytest.mark.asyncio
+async def test_restaurant_send_does_not_hold_pool_connection(pool_engine, auth_headers, monkeypatch):
+    checked_out = []
+    in_gpt_call = threading.Barrier(STREAMS, timeout=5)
+
+    def fake_send_message(user_id: int, message: str):
+        in_gpt_call.wait()  # 모든 요청이 동기 GPT 호출 중인 시점
+        checked_out.append(pool_engine.pool.checkedout())
+        return {"response": "ok", "convers_id": None}
+
+    monkeypatch.setattr(ChatRestService, "send_message", staticmethod(fake_send_message))
+
+    async with _client() as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/chat/restaurant/send", json={"message": f"q{i}"}, headers=auth_headers)
+            for i in range(STREAMS)
+        ))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert checked_out == [0] * STREAMS
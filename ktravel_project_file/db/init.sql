@@ -544,6 +544,24 @@ INSERT INTO `musical` VALUES
 /*!40000 ALTER TABLE `musical` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `place_blurbs`
+--
+
+DROP TABLE IF EXISTS `place_blurbs`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8mb4 */;
+CREATE TABLE `place_blurbs` (
+  `persona` varchar(20) NOT NULL COMMENT 'lumi / guide',
+  `search_type` varchar(20) NOT NULL COMMENT 'festival / attraction / restaurant / kcontent',
+  `entity_id` varchar(64) NOT NULL COMMENT 'festival_id / attr_id / restaurant id / content_id',
+  `source_hash` varchar(40) NOT NULL COMMENT '생성에 쓴 프롬프트 해시',
+  `blurb` text NOT NULL COMMENT '미리 생성한 소개 답변',
+  `updated_at` timestamp NULL DEFAULT current_timestamp() ON UPDATE current_timestamp(),
+  PRIMARY KEY (`persona`,`search_type`,`entity_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `plan_destinations`
 --
@@ -249,6 +249,19 @@ function KDH_ChatbotPage() {
                                     ));
                                     break;
 
+                                case 'location_cards':  // 🎬 촬영지 카드 먼저 도착한 만큼 표시
+                                    setMessages(prev => prev.map(msg =>
+                                        msg.id === aiMessageId
+                                            ? {
+                                                ...msg,
+                                                locationCards: [...(msg.locationCards || []), ...data.location_cards],
+                                                dramaName: data.drama_name,
+                                                hasKcontents: true
+                                              }
+                                            : msg
+                                    ));
+                                    break;
+
                                 case 'multiple_locations':  // 🆕 다중 위치 검색 케이스
                                     setMessages(prev => prev.map(msg => 
                                         msg.id === aiMessageId 